@@ -1,18 +1,86 @@
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
 from intentguard.app.intentguard import IntentGuard
 from intentguard.app.intentguard_options import IntentGuardOptions
+from intentguard.domain.aggregation_mode import AggregationMode
 from intentguard.domain.evaluation import Evaluation as _Evaluation
-from intentguard.infrastructure.fs_judgement_cache import FsJudgementCache
+from intentguard.infrastructure.judgement_cache_config import (
+    JudgementCacheConfig,
+    PersistentJudgementCache,
+    create_persistent_cache,
+    load_judgement_cache_config,
+    prune_in_background,
+)
 from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_daemon import WARMUP_ENV_VAR
 from intentguard.infrastructure.llamafile_prompt_factory import LlamafilePromptFactory
+from intentguard.infrastructure.tiered_judgement_cache import TieredJudgementCache
+
+# The default providers below are built on first use rather than at import, so
+# that importing a submodule such as intentguard.cli neither reads the cache
+# settings, prunes the cache nor constructs a model server.
+cache_config: JudgementCacheConfig
+persistent_cache: PersistentJudgementCache
+judgement_cache: TieredJudgementCache
+llamafile: Llamafile
+prompt_factory: LlamafilePromptFactory
+
+_defaults_lock = threading.RLock()
+
+
+def _build_cache() -> None:
+    config = load_judgement_cache_config()
+    persistent = create_persistent_cache(config)
+    prune_in_background(persistent, config)
+    globals().update(
+        cache_config=config,
+        persistent_cache=persistent,
+        judgement_cache=TieredJudgementCache(persistent),
+    )
+
+
+def _build_llamafile() -> None:
+    globals()["llamafile"] = Llamafile()
+
+
+def _build_prompt_factory() -> None:
+    globals()["prompt_factory"] = LlamafilePromptFactory()
 
-judgement_cache = FsJudgementCache()
-IntentGuard.set_judgement_cache_provider(judgement_cache)
 
-llamafile = Llamafile()
-IntentGuard.set_inference_provider(llamafile)
+_BUILDERS = {
+    "cache_config": _build_cache,
+    "persistent_cache": _build_cache,
+    "judgement_cache": _build_cache,
+    "llamafile": _build_llamafile,
+    "prompt_factory": _build_prompt_factory,
+}
 
-prompt_factory = LlamafilePromptFactory()
-IntentGuard.set_prompt_factory(prompt_factory)
+
+def __getattr__(name: str) -> Any:
+    builder = _BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _defaults_lock:
+        if name not in globals():
+            builder()
+    return globals()[name]
+
+
+def _install_default_providers() -> None:
+    # Providers set explicitly before first use, e.g. by tests, are kept.
+    if getattr(IntentGuard, "_judgement_cache_provider", None) is None:
+        IntentGuard.set_judgement_cache_provider(__getattr__("judgement_cache"))
+    if getattr(IntentGuard, "_inference_provider", None) is None:
+        IntentGuard.set_inference_provider(__getattr__("llamafile"))
+    if getattr(IntentGuard, "_prompt_factory", None) is None:
+        IntentGuard.set_prompt_factory(__getattr__("prompt_factory"))
+
+
+IntentGuard.set_default_provider_installer(_install_default_providers)
 
 
 def test_code(
@@ -31,14 +99,59 @@ def assert_code(
     IntentGuard().assert_code(expectation, params, options)
 
 
+def test_many(
+    cases: list[tuple[str, dict[str, object]]],
+    options: IntentGuardOptions | None = None,
+) -> list[_Evaluation]:
+    return IntentGuard().test_many(cases, options)
+
+
+async def test_code_async(
+    expectation: str,
+    params: dict[str, object],
+    options: IntentGuardOptions | None = None,
+) -> _Evaluation:
+    return await IntentGuard().test_code_async(expectation, params, options)
+
+
+async def assert_code_async(
+    expectation: str,
+    params: dict[str, object],
+    options: IntentGuardOptions | None = None,
+) -> None:
+    await IntentGuard().assert_code_async(expectation, params, options)
+
+
 def set_default_options(options: IntentGuardOptions) -> None:
     IntentGuard.set_default_options(options)
 
 
+def warmup() -> None:
+    IntentGuard.warmup()
+
+
+def _running_cli() -> bool:
+    """Whether this process is the intentguard command, which never runs the model."""
+    argv = getattr(sys, "orig_argv", sys.argv)
+    return Path(sys.argv[0]).stem == "intentguard" or "intentguard.cli" in argv
+
+
+if (
+    os.environ.get(WARMUP_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+    and not _running_cli()
+):
+    warmup()
+
+
 __all__ = [
+    "AggregationMode",
     "IntentGuard",
     "IntentGuardOptions",
     "assert_code",
+    "assert_code_async",
     "set_default_options",
     "test_code",
+    "test_code_async",
+    "test_many",
+    "warmup",
 ]
@@ -0,0 +1,5 @@
+import sys
+
+from intentguard.cli import main
+
+sys.exit(main())
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.message import Message
+from intentguard.domain.evaluation import Evaluation
+
+
+class AsyncInferenceProvider(ABC):
+    """
+    Abstract base class for Language Model inference providers with native asyncio support.
+
+    This class is the asynchronous counterpart of InferenceProvider. Implementations
+    perform inference without blocking the event loop, so that a single loop can keep
+    many requests in flight at once. Providers implement it alongside
+    InferenceProvider; IntentGuard.test_code_async() uses the native coroutine
+    when it is available and falls back to running predict() in a worker thread.
+    """
+
+    @abstractmethod
+    async def predict_async(
+        self, prompt: List[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        """
+        Generate an evaluation prediction using the language model, asynchronously.
+
+        Args:
+            prompt: A list of messages forming the input prompt for the model
+            inference_options: Configuration options for controlling inference behavior
+
+        Returns:
+            An Evaluation object containing the model's assessment and explanation
+
+        Note:
+            Implementations must not block the event loop. Cancelling the returned
+            coroutine should abandon the underlying request.
+        """
+        pass
@@ -0,0 +1,62 @@
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class CancellationToken:
+    """
+    Signals that the inferences started for a judgement are no longer needed.
+
+    Providers that can abort a running inference register a callback that is
+    invoked when the token is cancelled, e.g. to close the connection the
+    inference is waiting on.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called."""
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Cancel the token and run the registered callbacks."""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning("Cancellation callback failed: %s", e)
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run a callback when the token is cancelled.
+
+        If the token is already cancelled, the callback runs immediately.
+
+        Args:
+            callback: The function to call on cancellation
+
+        Returns:
+            A function that unregisters the callback
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
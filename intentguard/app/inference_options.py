@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -13,6 +14,16 @@ class InferenceOptions:
         temperature: A float value controlling randomness in model outputs.
             Higher values (e.g., 1.0) make output more random and creative.
             Lower values (e.g., 0.1) make output more focused and deterministic.
+        logprobs: Whether the provider should report the probability that the
+            result is true, derived from token log-probabilities, in the
+            "true_probability" metadata of each Evaluation.
+        verdict_first: Whether the model should emit the result before, or
+            instead of, its reasoning. Providers that stream may stop the
+            generation once the verdict is known.
+        max_tokens: Maximum number of tokens to generate, or None for no limit.
     """
 
     temperature: float
+    logprobs: bool = False
+    verdict_first: bool = False
+    max_tokens: Optional[int] = None
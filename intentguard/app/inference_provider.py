@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+from intentguard.app.cancellation import CancellationToken
 from intentguard.app.inference_options import InferenceOptions
 from intentguard.app.message import Message
 from intentguard.domain.evaluation import Evaluation
@@ -35,3 +36,50 @@ class InferenceProvider(ABC):
             interaction, and response parsing specific to their LLM backend.
         """
         pass
+
+    def predict_cancellable(
+        self,
+        prompt: List[Message],
+        inference_options: InferenceOptions,
+        cancellation: CancellationToken,
+    ) -> Evaluation:
+        """
+        Generate an evaluation that can be aborted while it is running.
+
+        Used for votes that run concurrently, so that votes which can no longer
+        change the verdict stop using the model. Providers that can abort a
+        running inference should override this and raise
+        concurrent.futures.CancelledError once the token is cancelled. The
+        default ignores the token and calls predict().
+
+        Args:
+            prompt: A list of messages forming the input prompt for the model
+            inference_options: Configuration options for controlling inference behavior
+            cancellation: Cancelled when the result is no longer needed
+
+        Returns:
+            An Evaluation object containing the model's assessment and explanation
+        """
+        return self.predict(prompt, inference_options)
+
+    def model_id(self) -> str:
+        """
+        Identify the model, for the judgement cache key.
+
+        Must change whenever the model changes, e.g. to the checksum of its
+        weights, so that judgements of another model are not reused.
+        Implementations should override it; the default is the class name.
+
+        Returns:
+            A string identifying the model
+        """
+        return type(self).__qualname__
+
+    def warmup(self) -> None:
+        """
+        Start preparing the provider for inference in the background.
+
+        Providers with expensive startup, such as a local model server, can
+        override this to begin that work before the first prediction. It must
+        return without waiting for the work to finish. The default does nothing.
+        """
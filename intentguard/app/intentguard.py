@@ -1,11 +1,19 @@
+import asyncio
 import logging
-from typing import Optional, Dict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Optional, Dict, List, Sequence, Tuple
 
+from intentguard.app.async_inference_provider import AsyncInferenceProvider
+from intentguard.app.cancellation import CancellationToken
 from intentguard.app.inference_options import InferenceOptions
 from intentguard.app.inference_provider import InferenceProvider
 from intentguard.app.intentguard_options import IntentGuardOptions
 from intentguard.app.judgement_cache import JudgementCache
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.app.message import Message
 from intentguard.app.prompt_factory import PromptFactory
+from intentguard.app.sampling_options import SamplingOptions
 from intentguard.domain.code_object import CodeObject
 from intentguard.domain.evaluation import Evaluation
 from intentguard.domain.judge import Judge
@@ -13,6 +21,9 @@ from intentguard.domain.judgement_options import JudgementOptions
 
 logger = logging.getLogger(__name__)
 
+# Token cap for the verdict votes of two-phase mode, unless max_tokens is set.
+TWO_PHASE_VERDICT_MAX_TOKENS = 64
+
 
 class IntentGuard:
     """
@@ -27,6 +38,35 @@ class IntentGuard:
     _prompt_factory: PromptFactory
     _judgement_cache_provider: JudgementCache
     _default_options = IntentGuardOptions()
+    _default_provider_installer: Optional[Callable[[], None]] = None
+    _default_provider_lock = threading.Lock()
+
+    @classmethod
+    def set_default_provider_installer(cls, installer: Callable[[], None]) -> None:
+        """
+        Register a callback that installs the default providers on first use.
+
+        Lets the package defer building its default model server and cache until
+        an evaluation or warm-up needs them, so importing the package stays cheap.
+        The callback runs at most once.
+
+        Args:
+            installer: Callable that sets any providers that are still unset
+        """
+        with cls._default_provider_lock:
+            cls._default_provider_installer = installer
+
+    @classmethod
+    def _install_default_providers(cls) -> None:
+        """Run the registered default provider installer if it has not run yet."""
+        if cls._default_provider_installer is None:
+            return
+        with cls._default_provider_lock:
+            installer = cls._default_provider_installer
+            if installer is None:
+                return
+            installer()
+            cls._default_provider_installer = None
 
     @classmethod
     def set_default_options(cls, options: IntentGuardOptions) -> None:
@@ -79,6 +119,19 @@ class IntentGuard:
         )
         cls._judgement_cache_provider = judgement_cache_provider
 
+    @classmethod
+    def warmup(cls) -> None:
+        """
+        Start preparing the inference provider in the background.
+
+        Lets expensive startup, such as downloading the model or booting a local
+        server, overlap with other work like test collection. Returns
+        immediately. Later evaluations wait for whatever work remains.
+        """
+        cls._install_default_providers()
+        logger.info("Warming up inference provider")
+        cls._inference_provider.warmup()
+
     def __init__(self, options: Optional[IntentGuardOptions] = None) -> None:
         """
         Initialize the IntentGuard instance.
@@ -86,9 +139,118 @@ class IntentGuard:
         Args:
             options: Configuration options for assertions. Uses default options if None.
         """
+        IntentGuard._install_default_providers()
         self.options: IntentGuardOptions = options or IntentGuard._default_options
         logger.debug("Initialized IntentGuard with options: %s", self.options)
 
+    @staticmethod
+    def _inference_options(options: IntentGuardOptions) -> InferenceOptions:
+        """Derive the inference configuration of the votes from assertion options."""
+        max_tokens = options.max_tokens
+        if options.two_phase and max_tokens is None:
+            max_tokens = TWO_PHASE_VERDICT_MAX_TOKENS
+        return InferenceOptions(
+            temperature=options.temperature,
+            logprobs=options.logprob_threshold is not None,
+            verdict_first=options.fast_mode or options.two_phase,
+            max_tokens=max_tokens,
+        )
+
+    @staticmethod
+    def _judgement_options(options: IntentGuardOptions) -> JudgementOptions:
+        """Derive the judgement configuration from assertion options."""
+        return JudgementOptions(
+            aggregation_mode=options.aggregation_mode,
+            probability_threshold=options.logprob_threshold,
+        )
+
+    @staticmethod
+    def _sampling_options(options: IntentGuardOptions) -> SamplingOptions:
+        """Derive the vote budget and stopping rules from assertion options."""
+        adaptive = options.target_confidence is not None
+        return SamplingOptions(
+            evaluation_budget=options.evaluation_budget,
+            early_exit=options.early_exit,
+            target_confidence=options.target_confidence,
+            min_evaluations=options.min_evaluations if adaptive else 1,
+        )
+
+    @staticmethod
+    def _create_prompt(
+        expectation: str, code_objects: List[CodeObject], options: IntentGuardOptions
+    ) -> List[Message]:
+        """Build the voting prompt, using the verdict-first variant when requested."""
+        if options.fast_mode or options.two_phase:
+            return IntentGuard._prompt_factory.create_fast_prompt(
+                expectation, code_objects
+            )
+        return IntentGuard._prompt_factory.create_prompt(expectation, code_objects)
+
+    @staticmethod
+    def _cache_key(
+        expectation: str,
+        code_objects: List[CodeObject],
+        inference_options: InferenceOptions,
+        judgement_options: JudgementOptions,
+        options: IntentGuardOptions,
+    ) -> JudgementCacheKey:
+        """
+        Build the judgement cache key of an evaluation request.
+
+        The vote budget and stopping rules are part of the key, so changing
+        them samples more votes instead of returning the judgement of fewer.
+        """
+        return JudgementCacheKey.create(
+            template_version=IntentGuard._prompt_factory.template_version(),
+            model_id=IntentGuard._inference_provider.model_id(),
+            expectation=expectation,
+            code_objects=code_objects,
+            inference_options=inference_options,
+            judgement_options=judgement_options,
+            sampling_options=IntentGuard._sampling_options(options),
+        )
+
+    @staticmethod
+    def _vote_keys(
+        cache_key: JudgementCacheKey,
+        inference_options: InferenceOptions,
+        options: IntentGuardOptions,
+    ) -> List[JudgementCacheKey]:
+        """Derive the cache keys of the votes an evaluation may sample."""
+        return [
+            cache_key.vote_key(inference_options, sample)
+            for sample in range(options.evaluation_budget)
+        ]
+
+    @staticmethod
+    def _split_votes(
+        vote_keys: List[JudgementCacheKey], cached: List[Optional[Evaluation]]
+    ) -> Tuple[List[Evaluation], List[JudgementCacheKey]]:
+        """
+        Separate the cached votes from the keys of the votes not sampled yet.
+
+        Args:
+            vote_keys: The keys of the votes of one evaluation
+            cached: The cache lookup result for each vote key
+
+        Returns:
+            The cached votes, and the keys under which new votes are stored
+        """
+        votes = [vote for vote in cached if vote is not None]
+        free_keys = [key for key, vote in zip(vote_keys, cached) if vote is None]
+        if votes:
+            logger.info("Reusing %d cached votes", len(votes))
+        return votes, free_keys
+
+    @staticmethod
+    def _needs_votes(
+        evaluations: List[Evaluation], options: IntentGuardOptions, judge: Judge
+    ) -> bool:
+        """Check whether more votes must be sampled to reach a judgement."""
+        return len(evaluations) < options.evaluation_budget and not (
+            IntentGuard._is_settled(evaluations, options, judge)
+        )
+
     def test_code(
         self,
         expectation: str,
@@ -100,6 +262,8 @@ class IntentGuard:
 
         Performs multiple LLM inferences and uses a judge to determine consensus on whether
         the code meets the specified expectation. Results are cached for performance.
+        The individual votes are cached as well, so a run with a larger vote budget
+        or another aggregation mode samples only the votes that are missing.
 
         Args:
             expectation: The condition to evaluate, expressed in natural language
@@ -110,41 +274,551 @@ class IntentGuard:
             Evaluation object containing the test result and explanation
         """
         options = options or self.options
-        inference_options = InferenceOptions(temperature=options.temperature)
-        judgement_options = JudgementOptions()
+        inference_options = self._inference_options(options)
+        judgement_options = self._judgement_options(options)
 
         code_objects = CodeObject.from_dict(params)
-        prompt = IntentGuard._prompt_factory.create_prompt(expectation, code_objects)
+        cache_key = self._cache_key(
+            expectation, code_objects, inference_options, judgement_options, options
+        )
 
         logger.debug("Testing code with expectation: %s", expectation)
         logger.debug("Code objects: %s", code_objects)
 
-        cached_judgement = IntentGuard._judgement_cache_provider.get(
-            prompt, inference_options, judgement_options
-        )
-        if cached_judgement:
+        cache = IntentGuard._judgement_cache_provider
+        judgement = cache.get(cache_key)
+        if judgement:
             logger.info("Using cached judgement for prompt")
-            return cached_judgement
-
-        logger.info("Performing %d evaluations", options.num_evaluations)
-        evaluations = []
-        for i in range(options.num_evaluations):
-            logger.debug("Running evaluation %d/%d", i + 1, options.num_evaluations)
-            evaluation = IntentGuard._inference_provider.predict(
-                prompt, inference_options
+        else:
+            judge = Judge(judgement_options)
+            vote_keys = self._vote_keys(cache_key, inference_options, options)
+            cached_votes, free_keys = self._split_votes(
+                vote_keys, cache.get_many(vote_keys)
+            )
+            evaluations = cached_votes
+            if self._needs_votes(evaluations, options, judge):
+                prompt = self._create_prompt(expectation, code_objects, options)
+                evaluations = self._collect_evaluations(
+                    prompt, inference_options, options, judge, cached_votes
+                )
+            judgement = self._make_judgement(judge, evaluations, options)
+
+            new_votes = evaluations[len(cached_votes) :]
+            logger.debug("Caching judgement result and %d new votes", len(new_votes))
+            cache.put_many(
+                free_keys[: len(new_votes)] + [cache_key], new_votes + [judgement]
+            )
+
+        if self._needs_explanation(judgement, options):
+            judgement = self._explain_failure(
+                expectation, code_objects, options, judgement
+            )
+            logger.debug("Caching explained judgement result")
+            cache.put(cache_key, judgement)
+
+        return judgement
+
+    def test_many(
+        self,
+        cases: Sequence[Tuple[str, Dict[str, object]]],
+        options: Optional[IntentGuardOptions] = None,
+    ) -> List[Evaluation]:
+        """
+        Test many expectations at once using LLM inference.
+
+        Cache keys are computed up front and identical requests are evaluated
+        only once. The cache is consulted in a single bulk lookup, then the
+        cached votes of the misses in another. Prompts are built only for the
+        cases still short of votes, and the missing votes are sent to the
+        inference provider with at most `max_concurrency` inferences in flight
+        across the whole batch.
+
+        Args:
+            cases: Sequence of (expectation, params) pairs, as accepted by test_code()
+            options: Custom options for these tests, falls back to instance defaults
+
+        Returns:
+            One Evaluation per case, in the same order as cases
+        """
+        options = options or self.options
+        inference_options = self._inference_options(options)
+        judgement_options = self._judgement_options(options)
+
+        key_indices: Dict[str, int] = {}
+        unique_keys: List[JudgementCacheKey] = []
+        unique_cases: List[Tuple[str, List[CodeObject]]] = []
+        case_prompt_indices: List[int] = []
+        for expectation, params in cases:
+            code_objects = CodeObject.from_dict(params)
+            cache_key = self._cache_key(
+                expectation,
+                code_objects,
+                inference_options,
+                judgement_options,
+                options,
+            )
+            if cache_key.digest not in key_indices:
+                key_indices[cache_key.digest] = len(unique_keys)
+                unique_keys.append(cache_key)
+                unique_cases.append((expectation, code_objects))
+            case_prompt_indices.append(key_indices[cache_key.digest])
+        logger.info(
+            "Testing %d cases with %d unique prompts",
+            len(case_prompt_indices),
+            len(unique_keys),
+        )
+
+        cached_judgements = IntentGuard._judgement_cache_provider.get_many(unique_keys)
+        judgements: Dict[int, Evaluation] = {
+            index: judgement
+            for index, judgement in enumerate(cached_judgements)
+            if judgement
+        }
+        missing = [
+            index for index in range(len(unique_keys)) if index not in judgements
+        ]
+        logger.info(
+            "Using %d cached judgements, evaluating %d prompts",
+            len(unique_keys) - len(missing),
+            len(missing),
+        )
+
+        if missing:
+            judge = Judge(judgement_options)
+            budget = options.evaluation_budget
+            vote_keys = {
+                index: self._vote_keys(unique_keys[index], inference_options, options)
+                for index in missing
+            }
+            cached_votes = IntentGuard._judgement_cache_provider.get_many(
+                [key for index in missing for key in vote_keys[index]]
+            )
+            collected: Dict[int, List[Evaluation]] = {}
+            free_keys: Dict[int, List[JudgementCacheKey]] = {}
+            num_cached: Dict[int, int] = {}
+            new_indices: List[int] = []
+            for position, index in enumerate(missing):
+                collected[index], free_keys[index] = self._split_votes(
+                    vote_keys[index],
+                    cached_votes[position * budget : (position + 1) * budget],
+                )
+                num_cached[index] = len(collected[index])
+                if not self._needs_votes(collected[index], options, judge):
+                    judgements[index] = IntentGuard._make_judgement(
+                        judge, collected[index], options
+                    )
+                    new_indices.append(index)
+            pending = [index for index in missing if index not in judgements]
+
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, options.max_concurrency),
+                thread_name_prefix="intentguard-vote",
+            )
+            cancellations = {index: CancellationToken() for index in pending}
+            try:
+                prompt_futures: Dict[int, List[Future]] = {}
+                future_indices: Dict[Future, int] = {}
+                for index in pending:
+                    prompt = self._create_prompt(*unique_cases[index], options)
+                    prompt_futures[index] = [
+                        executor.submit(
+                            IntentGuard._inference_provider.predict_cancellable,
+                            prompt,
+                            inference_options,
+                            cancellations[index],
+                        )
+                        for _ in range(budget - num_cached[index])
+                    ]
+                    for future in prompt_futures[index]:
+                        future_indices[future] = index
+
+                for future in as_completed(future_indices):
+                    index = future_indices[future]
+                    if index in judgements or future.cancelled():
+                        continue
+                    evaluations = collected[index]
+                    evaluations.append(future.result())
+                    if not IntentGuard._needs_votes(evaluations, options, judge):
+                        for other in prompt_futures[index]:
+                            other.cancel()
+                        cancellations[index].cancel()
+                        judgements[index] = IntentGuard._make_judgement(
+                            judge, evaluations, options
+                        )
+                        new_indices.append(index)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                for cancellation in cancellations.values():
+                    cancellation.cancel()
+                keys: List[JudgementCacheKey] = []
+                values: List[Evaluation] = []
+                for index in missing:
+                    new_votes = collected[index][num_cached[index] :]
+                    keys.extend(free_keys[index][: len(new_votes)])
+                    values.extend(new_votes)
+                logger.debug(
+                    "Caching %d judgement results and %d new votes",
+                    len(new_indices),
+                    len(values),
+                )
+                IntentGuard._judgement_cache_provider.put_many(
+                    keys + [unique_keys[index] for index in new_indices],
+                    values + [judgements[index] for index in new_indices],
+                )
+
+        unexplained = [
+            index
+            for index, judgement in judgements.items()
+            if self._needs_explanation(judgement, options)
+        ]
+        if unexplained:
+            for index in unexplained:
+                expectation, code_objects = unique_cases[index]
+                judgements[index] = self._explain_failure(
+                    expectation, code_objects, options, judgements[index]
+                )
+            logger.debug("Caching %d explained judgement results", len(unexplained))
+            IntentGuard._judgement_cache_provider.put_many(
+                [unique_keys[index] for index in unexplained],
+                [judgements[index] for index in unexplained],
+            )
+
+        return [judgements[index] for index in case_prompt_indices]
+
+    @staticmethod
+    def _collect_evaluations(
+        prompt: List[Message],
+        inference_options: InferenceOptions,
+        options: IntentGuardOptions,
+        judge: Judge,
+        cached_votes: Sequence[Evaluation] = (),
+    ) -> List[Evaluation]:
+        """
+        Run the configured number of inferences for a single prompt.
+
+        Inferences are sent one after another unless `max_concurrency` allows
+        more than one at a time, in which case they are submitted together to
+        a worker pool bounded by `max_concurrency`. With `early_exit`, the judge
+        is consulted after each vote and sampling stops once the verdict is
+        settled; pending inferences are cancelled, and those already running
+        are aborted through the provider's predict_cancellable().
+
+        Args:
+            prompt: The list of messages forming the evaluation prompt
+            inference_options: Configuration for the inference process
+            options: Options controlling the number of inferences and concurrency
+            judge: The judge used to detect a settled verdict
+            cached_votes: Votes reused from the cache, which count towards the
+                vote budget
+
+        Returns:
+            The cached votes followed by the new evaluations, in completion order
+        """
+        evaluations: List[Evaluation] = list(cached_votes)
+        num_evaluations = options.evaluation_budget - len(evaluations)
+        max_workers = min(options.max_concurrency, num_evaluations)
+        if max_workers <= 1:
+            logger.info("Performing up to %d evaluations", num_evaluations)
+            for i in range(num_evaluations):
+                logger.debug("Running evaluation %d/%d", i + 1, num_evaluations)
+                evaluations.append(
+                    IntentGuard._inference_provider.predict(prompt, inference_options)
+                )
+                if IntentGuard._is_settled(evaluations, options, judge):
+                    break
+            return evaluations
+
+        logger.info(
+            "Performing up to %d evaluations with up to %d in parallel",
+            num_evaluations,
+            max_workers,
+        )
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="intentguard-vote"
+        )
+        cancellation = CancellationToken()
+        try:
+            futures = [
+                executor.submit(
+                    IntentGuard._inference_provider.predict_cancellable,
+                    prompt,
+                    inference_options,
+                    cancellation,
+                )
+                for _ in range(num_evaluations)
+            ]
+            for future in as_completed(futures):
+                evaluations.append(future.result())
+                if IntentGuard._is_settled(evaluations, options, judge):
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            cancellation.cancel()
+        return evaluations
+
+    @staticmethod
+    def _is_settled(
+        evaluations: List[Evaluation], options: IntentGuardOptions, judge: Judge
+    ) -> bool:
+        """
+        Check whether sampling can stop early for the votes collected so far.
+
+        Sampling stops when early exit is enabled and no remaining vote can
+        change the verdict, or, in adaptive mode, when at least
+        `min_evaluations` votes have been collected and the judge's confidence
+        in the verdict reaches `target_confidence`.
+
+        Args:
+            evaluations: The evaluations collected so far
+            options: Options controlling the vote budget and stopping rules
+            judge: The judge used to assess the votes
+
+        Returns:
+            True if sampling should stop before the vote budget is exhausted
+        """
+        budget = options.evaluation_budget
+        if len(evaluations) >= budget:
+            return False
+        if options.early_exit and judge.is_decided(evaluations, budget):
+            logger.info(
+                "Verdict settled after %d of %d evaluations; skipping the rest",
+                len(evaluations),
+                budget,
             )
-            evaluations.append(evaluation)
-        judge = Judge(judgement_options)
+            return True
+        if (
+            options.target_confidence is not None
+            and len(evaluations) >= options.min_evaluations
+        ):
+            confidence = judge.verdict_confidence(evaluations, budget)
+            if confidence >= options.target_confidence:
+                logger.info(
+                    "Verdict confidence %.3f reached after %d of %d evaluations",
+                    confidence,
+                    len(evaluations),
+                    budget,
+                )
+                return True
+        return False
+
+    @staticmethod
+    def _make_judgement(
+        judge: Judge, evaluations: List[Evaluation], options: IntentGuardOptions
+    ) -> Evaluation:
+        """
+        Aggregate the collected votes, recording adaptive sampling metadata.
+
+        Args:
+            judge: The judge used to aggregate the votes
+            evaluations: The evaluations collected for one prompt
+            options: Options controlling the vote budget
+
+        Returns:
+            The final judgement
+        """
         logger.debug("Making final judgement from %d evaluations", len(evaluations))
         judgement = judge.make_judgement(evaluations)
+        if options.target_confidence is not None:
+            judgement.metadata["confidence"] = judge.verdict_confidence(
+                evaluations, options.evaluation_budget
+            )
+        return judgement
+
+    @staticmethod
+    def _needs_explanation(judgement: Evaluation, options: IntentGuardOptions) -> bool:
+        """Check whether a two-phase verdict still lacks its reasoned explanation."""
+        return (
+            options.two_phase
+            and not judgement.result
+            and not judgement.metadata.get("explained")
+        )
+
+    @staticmethod
+    def _explanation_request(
+        expectation: str, code_objects: List[CodeObject], options: IntentGuardOptions
+    ) -> Tuple[List[Message], InferenceOptions]:
+        """Build the full chain-of-thought prompt and options of phase two."""
+        prompt = IntentGuard._prompt_factory.create_prompt(expectation, code_objects)
+        return prompt, InferenceOptions(temperature=options.temperature)
+
+    @staticmethod
+    def _with_explanation(judgement: Evaluation, evaluation: Evaluation) -> Evaluation:
+        """
+        Attach the explanation of phase two to the verdict of phase one.
+
+        The verdict always comes from the phase one votes. If the explaining
+        inference produced no explanation, the short one from phase one is kept.
+        """
+        return Evaluation(
+            result=judgement.result,
+            explanation=evaluation.explanation or judgement.explanation,
+            metadata={**judgement.metadata, "explained": True},
+        )
+
+    @staticmethod
+    def _explain_failure(
+        expectation: str,
+        code_objects: List[CodeObject],
+        options: IntentGuardOptions,
+        judgement: Evaluation,
+    ) -> Evaluation:
+        """
+        Run phase two of two-phase mode: explain a negative verdict.
+
+        Args:
+            expectation: The condition that was evaluated
+            code_objects: The code objects that were evaluated
+            options: Options providing the sampling temperature
+            judgement: The negative verdict from phase one
+
+        Returns:
+            The verdict with the reasoned explanation attached
+        """
+        logger.info("Verdict is negative; generating a reasoned explanation")
+        prompt, inference_options = IntentGuard._explanation_request(
+            expectation, code_objects, options
+        )
+        evaluation = IntentGuard._inference_provider.predict(prompt, inference_options)
+        return IntentGuard._with_explanation(judgement, evaluation)
+
+    @staticmethod
+    async def _explain_failure_async(
+        expectation: str,
+        code_objects: List[CodeObject],
+        options: IntentGuardOptions,
+        judgement: Evaluation,
+    ) -> Evaluation:
+        """Asynchronous counterpart of _explain_failure()."""
+        logger.info("Verdict is negative; generating a reasoned explanation")
+        prompt, inference_options = IntentGuard._explanation_request(
+            expectation, code_objects, options
+        )
+        evaluation = await IntentGuard._predict_async(prompt, inference_options)
+        return IntentGuard._with_explanation(judgement, evaluation)
+
+    async def test_code_async(
+        self,
+        expectation: str,
+        params: Dict[str, object],
+        options: Optional[IntentGuardOptions] = None,
+    ) -> Evaluation:
+        """
+        Test if code meets an expected condition using LLM inference, asynchronously.
+
+        Behaves like test_code(), but runs on the asyncio event loop. Votes are sent
+        concurrently, bounded by `max_concurrency`, and many assertions can be awaited
+        together without a thread per assertion when the inference provider implements
+        AsyncInferenceProvider. Synchronous providers are run in worker threads.
+
+        Args:
+            expectation: The condition to evaluate, expressed in natural language
+            params: Dictionary mapping variable names to code objects for evaluation
+            options: Custom options for this test, falls back to instance defaults
+
+        Returns:
+            Evaluation object containing the test result and explanation
+        """
+        options = options or self.options
+        inference_options = self._inference_options(options)
+        judgement_options = self._judgement_options(options)
 
-        logger.debug("Caching judgement result")
-        IntentGuard._judgement_cache_provider.put(
-            prompt, inference_options, judgement_options, judgement
+        code_objects = CodeObject.from_dict(params)
+        cache_key = self._cache_key(
+            expectation, code_objects, inference_options, judgement_options, options
         )
 
+        logger.debug("Testing code asynchronously with expectation: %s", expectation)
+        logger.debug("Code objects: %s", code_objects)
+
+        cache = IntentGuard._judgement_cache_provider
+        judgement = await cache.get_async(cache_key)
+        if judgement:
+            logger.info("Using cached judgement for prompt")
+        else:
+            judge = Judge(judgement_options)
+            vote_keys = self._vote_keys(cache_key, inference_options, options)
+            cached_votes, free_keys = self._split_votes(
+                vote_keys, await cache.get_many_async(vote_keys)
+            )
+            evaluations = cached_votes
+            if self._needs_votes(evaluations, options, judge):
+                prompt = self._create_prompt(expectation, code_objects, options)
+                evaluations = await self._collect_evaluations_async(
+                    prompt, inference_options, options, judge, cached_votes
+                )
+            judgement = self._make_judgement(judge, evaluations, options)
+
+            new_votes = evaluations[len(cached_votes) :]
+            logger.debug("Caching judgement result and %d new votes", len(new_votes))
+            await cache.put_many_async(
+                free_keys[: len(new_votes)] + [cache_key], new_votes + [judgement]
+            )
+
+        if self._needs_explanation(judgement, options):
+            judgement = await self._explain_failure_async(
+                expectation, code_objects, options, judgement
+            )
+            logger.debug("Caching explained judgement result")
+            await cache.put_async(cache_key, judgement)
+
         return judgement
 
+    @staticmethod
+    async def _predict_async(
+        prompt: List[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        """Run one inference on the event loop, natively or in a worker thread."""
+        provider = IntentGuard._inference_provider
+        if isinstance(provider, AsyncInferenceProvider):
+            return await provider.predict_async(prompt, inference_options)
+        return await asyncio.to_thread(provider.predict, prompt, inference_options)
+
+    @staticmethod
+    async def _collect_evaluations_async(
+        prompt: List[Message],
+        inference_options: InferenceOptions,
+        options: IntentGuardOptions,
+        judge: Judge,
+        cached_votes: Sequence[Evaluation] = (),
+    ) -> List[Evaluation]:
+        """
+        Run the configured number of inferences for a single prompt on the event loop.
+
+        With `early_exit`, outstanding inferences are cancelled as soon as the
+        verdict is settled.
+
+        Args:
+            prompt: The list of messages forming the evaluation prompt
+            inference_options: Configuration for the inference process
+            options: Options controlling the number of inferences and concurrency
+            judge: The judge used to detect a settled verdict
+            cached_votes: Votes reused from the cache, which count towards the
+                vote budget
+
+        Returns:
+            The cached votes followed by the new evaluations, in completion order
+        """
+        semaphore = asyncio.Semaphore(max(1, options.max_concurrency))
+
+        async def predict() -> Evaluation:
+            async with semaphore:
+                return await IntentGuard._predict_async(prompt, inference_options)
+
+        evaluations: List[Evaluation] = list(cached_votes)
+        num_evaluations = options.evaluation_budget - len(evaluations)
+        logger.info("Performing up to %d evaluations", num_evaluations)
+        tasks = [asyncio.ensure_future(predict()) for _ in range(num_evaluations)]
+        try:
+            for next_evaluation in asyncio.as_completed(tasks):
+                evaluations.append(await next_evaluation)
+                if IntentGuard._is_settled(evaluations, options, judge):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return evaluations
+
     def assert_code(
         self,
         expectation: str,
@@ -173,3 +847,32 @@ class IntentGuard:
                 f'Expected "{expectation}" to be true, but it was false.\n'
                 f"Explanation: {evaluation.explanation}"
             )
+
+    async def assert_code_async(
+        self,
+        expectation: str,
+        params: Dict[str, object],
+        options: Optional[IntentGuardOptions] = None,
+    ) -> None:
+        """
+        Assert that code meets an expected condition using LLM inference, asynchronously.
+
+        Similar to test_code_async(), but raises an AssertionError if the evaluation
+        fails, with the same message as assert_code().
+
+        Args:
+            expectation: The condition to evaluate, expressed in natural language
+            params: Dictionary mapping variable names to code objects for evaluation
+            options: Custom options for this assertion, falls back to instance defaults
+
+        Raises:
+            AssertionError: If the code does not meet the expected condition
+        """
+        logger.info("Asserting code meets expectation: %s", expectation)
+        evaluation = await self.test_code_async(expectation, params, options)
+        if not evaluation.result:
+            logger.warning("Assertion failed: %s", expectation)
+            raise AssertionError(
+                f'Expected "{expectation}" to be true, but it was false.\n'
+                f"Explanation: {evaluation.explanation}"
+            )
@@ -1,3 +1,8 @@
+from typing import Optional, Union
+
+from intentguard.domain.aggregation_mode import AggregationMode
+
+
 class IntentGuardOptions:
     """
     Configuration options for IntentGuard assertions.
@@ -10,23 +15,143 @@ class IntentGuardOptions:
         self,
         num_evaluations: int = 1,
         temperature: float = 0.4,
+        max_concurrency: int = 1,
+        aggregation_mode: Union[AggregationMode, str] = AggregationMode.BALANCED,
+        early_exit: bool = True,
+        target_confidence: Optional[float] = None,
+        min_evaluations: int = 1,
+        max_evaluations: Optional[int] = None,
+        logprob_threshold: Optional[float] = None,
+        fast_mode: bool = False,
+        max_tokens: Optional[int] = None,
+        two_phase: bool = False,
     ) -> None:
         """
         Initialize IntentGuardOptions with the specified parameters.
 
         Args:
             num_evaluations (int, optional): The number of LLM inferences to perform
-                for each assertion. The final result is determined by majority vote.
-                Defaults to 1.
+                for each assertion. The final result is determined by the
+                aggregation mode. Defaults to 1.
             temperature (float, optional): The temperature parameter for the LLM.
                 Defaults to 0.4.
+            max_concurrency (int, optional): The maximum number of inferences sent
+                to the inference provider at the same time. Values above 1 only
+                pay off when the provider can serve requests in parallel, e.g. a
+                Llamafile server started with several parallel slots.
+                Defaults to 1.
+            aggregation_mode (AggregationMode | str, optional): How individual
+                evaluations are combined: "strict" requires every evaluation to
+                pass, "balanced" requires a strict majority, and "relaxed"
+                requires a single passing evaluation. Defaults to "balanced".
+            early_exit (bool, optional): Stop sampling, and cancel any pending
+                inferences, as soon as the remaining evaluations can no longer
+                change the verdict. Defaults to True.
+            target_confidence (float, optional): Enables adaptive sampling. After
+                each vote, a sequential test estimates the probability that the
+                remaining votes would leave the verdict unchanged, and sampling
+                stops once it reaches this value. Defaults to None (disabled).
+            min_evaluations (int, optional): In adaptive mode, the number of
+                votes collected before the sequential test may stop sampling.
+                Defaults to 1.
+            max_evaluations (int, optional): In adaptive mode, the maximum number
+                of votes per assertion. Defaults to num_evaluations.
+            logprob_threshold (float, optional): Enables log-probability scoring.
+                Each inference reports the probability that the result is true,
+                taken from the token log-probabilities of the verdict, and the
+                assertion passes when the mean probability exceeds this
+                threshold. A single inference then gives a calibrated score, so
+                num_evaluations can stay at 1. Defaults to None (majority voting).
+            fast_mode (bool, optional): Ask for the verdict first and skip the
+                chain-of-thought. The model answers with only the result and
+                explanation, and streaming providers stop reading as soon as
+                the verdict is known. This is much faster per inference at some
+                cost in accuracy. Defaults to False.
+            max_tokens (int, optional): Maximum number of tokens generated per
+                vote. Output cut off after the verdict is still used. Requires
+                fast_mode or two_phase, because chain-of-thought votes write
+                the verdict last and a cap would cut it off. Defaults to None
+                (no limit).
+            two_phase (bool, optional): Decide the verdict with cheap,
+                token-capped, verdict-first votes, as in fast mode, and run a
+                full chain-of-thought inference only when the verdict is
+                negative, to explain the failure. Both phases are cached.
+                Defaults to False.
         """
+        if target_confidence is not None and not 0.0 < target_confidence < 1.0:
+            raise ValueError(
+                f"target_confidence must be between 0 and 1, got {target_confidence}"
+            )
+        if max_evaluations is not None and target_confidence is None:
+            raise ValueError(
+                "max_evaluations requires target_confidence, since only adaptive "
+                "sampling stops before the budget"
+            )
+        if min_evaluations < 1:
+            raise ValueError(f"min_evaluations must be positive, got {min_evaluations}")
+        budget = num_evaluations if max_evaluations is None else max_evaluations
+        if min_evaluations > budget:
+            raise ValueError(
+                f"min_evaluations must not exceed the vote budget of {budget}, "
+                f"got {min_evaluations}"
+            )
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError(f"max_tokens must be positive, got {max_tokens}")
+        if max_tokens is not None and not (fast_mode or two_phase):
+            raise ValueError(
+                "max_tokens requires fast_mode or two_phase, since chain-of-thought "
+                "votes write the verdict last"
+            )
         self.num_evaluations: int = num_evaluations
         self.temperature: float = temperature
+        self.max_concurrency: int = max_concurrency
+        self.aggregation_mode: AggregationMode = AggregationMode(aggregation_mode)
+        self.early_exit: bool = early_exit
+        self.target_confidence: Optional[float] = target_confidence
+        self.min_evaluations: int = min_evaluations
+        self.max_evaluations: Optional[int] = max_evaluations
+        self.logprob_threshold: Optional[float] = logprob_threshold
+        self.fast_mode: bool = fast_mode
+        self.max_tokens: Optional[int] = max_tokens
+        self.two_phase: bool = two_phase
+
+    @property
+    def evaluation_budget(self) -> int:
+        """
+        The maximum number of votes collected for one assertion.
+
+        This is max_evaluations in adaptive mode, if set, and num_evaluations
+        otherwise.
+        """
+        if self.target_confidence is not None and self.max_evaluations is not None:
+            return self.max_evaluations
+        return self.num_evaluations
 
     def __repr__(self) -> str:
+        optional_fields = ""
+        if self.max_concurrency != 1:
+            optional_fields += f", max_concurrency={self.max_concurrency!r}"
+        if self.aggregation_mode != AggregationMode.BALANCED:
+            optional_fields += f", aggregation_mode={self.aggregation_mode.value!r}"
+        if not self.early_exit:
+            optional_fields += f", early_exit={self.early_exit!r}"
+        if self.target_confidence is not None:
+            optional_fields += (
+                f", target_confidence={self.target_confidence!r}"
+                f", min_evaluations={self.min_evaluations!r}"
+                f", max_evaluations={self.max_evaluations!r}"
+            )
+        if self.logprob_threshold is not None:
+            optional_fields += f", logprob_threshold={self.logprob_threshold!r}"
+        if self.fast_mode:
+            optional_fields += f", fast_mode={self.fast_mode!r}"
+        if self.max_tokens is not None:
+            optional_fields += f", max_tokens={self.max_tokens!r}"
+        if self.two_phase:
+            optional_fields += f", two_phase={self.two_phase!r}"
         return (
             f"{self.__class__.__name__}("
             f"num_evaluations={self.num_evaluations!r}, "
-            f"temperature={self.temperature!r})"
+            f"temperature={self.temperature!r}"
+            f"{optional_fields})"
         )
@@ -1,10 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional, List
 
-from intentguard.app.inference_options import InferenceOptions
-from intentguard.app.message import Message
+from intentguard.app.judgement_cache_key import JudgementCacheKey
 from intentguard.domain.evaluation import Evaluation
-from intentguard.domain.judgement_options import JudgementOptions
 
 
 class JudgementCache(ABC):
@@ -14,48 +13,37 @@ class JudgementCache(ABC):
     This class serves as a contract for implementing caching mechanisms to store and
     retrieve LLM evaluation results. Caching helps improve performance by avoiding
     redundant model inferences for previously evaluated prompts.
+
+    Entries are identified by a JudgementCacheKey, which IntentGuard computes
+    once per evaluation request and passes to both get() and put(). The
+    individual votes behind a judgement are stored too, under keys derived
+    with JudgementCacheKey.vote_key().
     """
 
     @abstractmethod
-    def get(
-        self,
-        prompt: List[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-    ) -> Optional[Evaluation]:
+    def get(self, key: JudgementCacheKey) -> Optional[Evaluation]:
         """
         Retrieve a cached evaluation result if available.
 
         Args:
-            prompt: The list of messages forming the evaluation prompt
-            inference_options: The inference configuration used for the evaluation
-            judgement_options: The judgement configuration used for the evaluation
+            key: Identifies the evaluation request
 
         Returns:
             The cached Evaluation if found, None otherwise
 
         Note:
-            Implementations should use all three parameters (prompt, inference_options,
-            and judgement_options) as part of the cache key to ensure cached results
-            are only returned for identical evaluation conditions.
+            Implementations should use the whole key, e.g. its digest, so cached
+            results are only returned for identical evaluation conditions.
         """
         pass
 
     @abstractmethod
-    def put(
-        self,
-        prompt: List[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-        judgement: Evaluation,
-    ):
+    def put(self, key: JudgementCacheKey, judgement: Evaluation):
         """
         Store an evaluation result in the cache.
 
         Args:
-            prompt: The list of messages forming the evaluation prompt
-            inference_options: The inference configuration used for the evaluation
-            judgement_options: The judgement configuration used for the evaluation
+            key: Identifies the evaluation request
             judgement: The evaluation result to cache
 
         Note:
@@ -64,3 +52,104 @@ class JudgementCache(ABC):
             distributed cache).
         """
         pass
+
+    def get_many(self, keys: List[JudgementCacheKey]) -> List[Optional[Evaluation]]:
+        """
+        Retrieve cached evaluation results for several requests in one pass.
+
+        The default implementation calls get() for each key. Implementations
+        that can look up many entries more cheaply than one at a time should
+        override it.
+
+        Args:
+            keys: Identify the evaluation requests to look up
+
+        Returns:
+            A list with the cached Evaluation or None for each key, in order
+        """
+        return [self.get(key) for key in keys]
+
+    def put_many(
+        self, keys: List[JudgementCacheKey], judgements: List[Evaluation]
+    ) -> None:
+        """
+        Store evaluation results for several requests in one pass.
+
+        The default implementation calls put() for each key.
+
+        Args:
+            keys: Identify the evaluation requests
+            judgements: The evaluation results to cache, one per key
+        """
+        for key, judgement in zip(keys, judgements):
+            self.put(key, judgement)
+
+    def touch_many(self, keys: List[JudgementCacheKey]) -> None:
+        """
+        Record that entries were used without reading them from this cache.
+
+        Caches in front of this one, such as an in-memory tier, call it for
+        their hits so that eviction by access time keeps the entries they
+        serve. The default implementation does nothing.
+
+        Args:
+            keys: Identify the entries that were used
+        """
+
+    async def get_async(self, key: JudgementCacheKey) -> Optional[Evaluation]:
+        """
+        Retrieve a cached evaluation result without blocking the event loop.
+
+        The default implementation runs get() in a worker thread. Implementations
+        backed by a natively asynchronous store may override it.
+
+        Args:
+            key: Identifies the evaluation request
+
+        Returns:
+            The cached Evaluation if found, None otherwise
+        """
+        return await asyncio.to_thread(self.get, key)
+
+    async def put_async(self, key: JudgementCacheKey, judgement: Evaluation) -> None:
+        """
+        Store an evaluation result without blocking the event loop.
+
+        The default implementation runs put() in a worker thread. Implementations
+        backed by a natively asynchronous store may override it.
+
+        Args:
+            key: Identifies the evaluation request
+            judgement: The evaluation result to cache
+        """
+        await asyncio.to_thread(self.put, key, judgement)
+
+    async def get_many_async(
+        self, keys: List[JudgementCacheKey]
+    ) -> List[Optional[Evaluation]]:
+        """
+        Retrieve several cached evaluation results without blocking the event loop.
+
+        The default implementation runs get_many() in a worker thread.
+
+        Args:
+            keys: Identify the evaluation requests to look up
+
+        Returns:
+            A list with the cached Evaluation or None for each key, in order
+        """
+        return await asyncio.to_thread(self.get_many, keys)
+
+    async def put_many_async(
+        self, keys: List[JudgementCacheKey], judgements: List[Evaluation]
+    ) -> None:
+        """
+        Store several evaluation results without blocking the event loop.
+
+        The default implementation runs put_many() in a worker thread.
+
+        Args:
+            keys: Identify the evaluation requests
+            judgements: The evaluation results to cache, one per key
+        """
+        await asyncio.to_thread(self.put_many, keys, judgements)
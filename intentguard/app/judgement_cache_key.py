@@ -0,0 +1,129 @@
+import hashlib
+from dataclasses import MISSING, dataclass, fields, replace
+from functools import cached_property
+from typing import Any, List, Optional, Tuple
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.sampling_options import SamplingOptions
+from intentguard.domain.code_object import CodeObject
+from intentguard.domain.judgement_options import JudgementOptions
+
+# Bump when the way keys are derived changes, to invalidate every entry
+KEY_VERSION = "v3"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _options_key(options: Any) -> str:
+    """
+    Render options dataclasses for the cache key, leaving out default values.
+
+    Adding a field with a default therefore does not invalidate existing cache
+    entries. Entries only change when the new field is set.
+    """
+    rendered = ", ".join(
+        f"{field.name}={getattr(options, field.name)!r}"
+        for field in fields(options)
+        if field.default is MISSING or getattr(options, field.name) != field.default
+    )
+    return f"{type(options).__name__}({rendered})"
+
+
+@dataclass(frozen=True)
+class JudgementCacheKey:
+    """
+    Identifies a cached judgement by digests of everything that determines it.
+
+    The key is built from small per-component digests instead of the rendered
+    prompt, so it is cheap to compute and a cache hit never builds the prompt.
+    Code object digests are computed once per CodeObject.
+
+    Attributes:
+        template_version: Version of the prompt template, see
+            PromptFactory.template_version()
+        model_id: Identity of the model, see InferenceProvider.model_id()
+        expectation: Digest of the expectation
+        code: Digests of the code objects, in prompt order
+        options: Digest of the inference, judgement and sampling options
+    """
+
+    template_version: str
+    model_id: str
+    expectation: str
+    code: Tuple[str, ...]
+    options: str
+
+    @classmethod
+    def create(
+        cls,
+        template_version: str,
+        model_id: str,
+        expectation: str,
+        code_objects: List[CodeObject],
+        inference_options: InferenceOptions,
+        judgement_options: JudgementOptions,
+        sampling_options: Optional[SamplingOptions] = None,
+    ) -> "JudgementCacheKey":
+        """
+        Build the key of an evaluation request.
+
+        Args:
+            template_version: Version of the prompt template
+            model_id: Identity of the model
+            expectation: The condition being evaluated
+            code_objects: The code objects being evaluated
+            inference_options: Configuration for the inference process
+            judgement_options: Configuration for the judgement process
+            sampling_options: The vote budget and stopping rules behind the
+                judgement, if they are part of the key
+
+        Returns:
+            The cache key
+        """
+        options = f"{_options_key(inference_options)}:{_options_key(judgement_options)}"
+        if sampling_options is not None:
+            options += f":{_options_key(sampling_options)}"
+        return cls(
+            template_version=template_version,
+            model_id=model_id,
+            expectation=_sha256(expectation),
+            code=tuple(code_object.digest for code_object in code_objects),
+            options=_sha256(options),
+        )
+
+    def vote_key(
+        self, inference_options: InferenceOptions, sample: int
+    ) -> "JudgementCacheKey":
+        """
+        Derive the key of one vote of this evaluation request.
+
+        Votes do not depend on how they are aggregated, so the judgement
+        and sampling options are left out. The same vote can then be reused
+        under any aggregation mode, stopping rule and vote budget.
+
+        Args:
+            inference_options: Configuration the vote was sampled with
+            sample: Index of the vote among the votes of the request
+
+        Returns:
+            The cache key of the vote
+        """
+        return replace(
+            self,
+            options=_sha256(f"{_options_key(inference_options)}:sample={sample}"),
+        )
+
+    @cached_property
+    def digest(self) -> str:
+        """A hex digest of the whole key, usable as a file name."""
+        parts = [
+            KEY_VERSION,
+            self.template_version,
+            self.model_id,
+            self.expectation,
+            *self.code,
+            self.options,
+        ]
+        return _sha256("\0".join(parts))
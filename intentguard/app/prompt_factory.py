@@ -40,3 +40,37 @@ class PromptFactory(ABC):
             - Expected response format
         """
         pass
+
+    def create_fast_prompt(
+        self, expectation: str, code_objects: List[CodeObject]
+    ) -> List[Message]:
+        """
+        Create a prompt that asks for the verdict before any reasoning.
+
+        Used when fast mode is enabled. Implementations should ask for the
+        result and explanation only, keeping the rest of the prompt identical
+        to create_prompt() so cached prompt prefixes are still shared. The
+        default returns the regular prompt.
+
+        Args:
+            expectation: Natural language description of the expected code behavior
+                or properties to evaluate
+            code_objects: List of code objects to evaluate against the expectation
+
+        Returns:
+            A list of Message objects forming the complete evaluation prompt
+        """
+        return self.create_prompt(expectation, code_objects)
+
+    def template_version(self) -> str:
+        """
+        Identify the prompt template, for the judgement cache key.
+
+        Must change whenever the prompts produced for the same input change,
+        so that judgements cached for the old prompts are not reused.
+        Implementations should override it; the default is the class name.
+
+        Returns:
+            A string identifying the prompt template
+        """
+        return type(self).__qualname__
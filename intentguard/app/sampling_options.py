@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class SamplingOptions:
+    """
+    Configuration of how many votes are sampled for one judgement.
+
+    Attributes:
+        evaluation_budget: Maximum number of votes behind the judgement.
+        early_exit: Whether sampling stops once the remaining votes can no
+            longer change the verdict.
+        target_confidence: Confidence at which adaptive sampling stops, or None
+            when adaptive sampling is disabled.
+        min_evaluations: Number of votes collected before adaptive sampling
+            may stop.
+    """
+
+    evaluation_budget: int
+    early_exit: bool = True
+    target_confidence: Optional[float] = None
+    min_evaluations: int = 1
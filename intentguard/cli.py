@@ -0,0 +1,165 @@
+import argparse
+import logging
+import sys
+import time
+from typing import List, Optional
+
+from intentguard.infrastructure.judgement_cache_config import (
+    BACKENDS,
+    JudgementCacheConfig,
+    PersistentJudgementCache,
+    create_persistent_cache,
+    load_judgement_cache_config,
+    parse_size,
+)
+from intentguard.infrastructure.llamafile import verify_artifacts
+
+
+def _verify(args: argparse.Namespace) -> int:
+    """Fully re-hash the downloaded artifacts and refresh the manifest."""
+    ok = True
+    for path, verified in verify_artifacts().items():
+        if verified:
+            print(f"OK       {path}")
+        elif not path.exists():
+            print(f"MISSING  {path}")
+            ok = False
+        else:
+            print(f"MISMATCH {path}")
+            ok = False
+    return 0 if ok else 1
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return "-"
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+def _open_cache(args: argparse.Namespace) -> PersistentJudgementCache:
+    return create_persistent_cache(JudgementCacheConfig(backend=args.backend))
+
+
+def _cache_stats(args: argparse.Namespace) -> int:
+    """Print the size and access times of the judgement cache."""
+    stats = _open_cache(args).store_stats()
+    print(f"Location:      {stats.location}")
+    print(f"Entries:       {stats.entries}")
+    print(f"Size:          {_format_size(stats.size_bytes)}")
+    print(f"Oldest access: {_format_time(stats.oldest_access)}")
+    print(f"Newest access: {_format_time(stats.newest_access)}")
+    return 0
+
+
+def _cache_prune(args: argparse.Namespace) -> int:
+    """Evict judgements beyond the size and age limits."""
+    if args.max_size is None and args.max_age_days is None:
+        print(
+            "No limit given: pass --max-size or --max-age-days, or set them "
+            "in the environment",
+            file=sys.stderr,
+        )
+        return 2
+    config = JudgementCacheConfig(
+        backend=args.backend, max_size=args.max_size, max_age_days=args.max_age_days
+    )
+    removed = create_persistent_cache(config).prune(
+        config.max_size, config.max_age_seconds, compact=True
+    )
+    print(f"Removed {removed} entries")
+    return 0
+
+
+def _cache_clear(args: argparse.Namespace) -> int:
+    """Remove every cached judgement."""
+    removed = _open_cache(args).clear()
+    print(f"Removed {removed} entries")
+    return 0
+
+
+def _cache_verify(args: argparse.Namespace) -> int:
+    """Check that every cached judgement can be read, removing the others."""
+    valid, removed = _open_cache(args).verify()
+    print(f"{valid} valid entries, removed {removed} unreadable entries")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the intentguard command."""
+    parser = argparse.ArgumentParser(
+        prog="intentguard", description="IntentGuard maintenance commands."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="enable debug logging"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    verify = subparsers.add_parser(
+        "verify",
+        help="re-verify the checksums of the downloaded model and server binary",
+    )
+    verify.set_defaults(handler=_verify)
+
+    config = load_judgement_cache_config()
+    cache = subparsers.add_parser("cache", help="inspect and maintain the cache")
+    cache.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=config.backend,
+        help="cache backend to operate on (default: %(default)s)",
+    )
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+    cache_commands.add_parser(
+        "stats", help="show the number, size and age of cached judgements"
+    ).set_defaults(handler=_cache_stats)
+    prune = cache_commands.add_parser(
+        "prune", help="evict the least recently used judgements beyond the limits"
+    )
+    prune.add_argument(
+        "--max-size",
+        type=parse_size,
+        default=config.max_size,
+        help="maximum total size to keep, e.g. 500M",
+    )
+    prune.add_argument(
+        "--max-age-days",
+        type=float,
+        default=config.max_age_days,
+        help="evict judgements not used for this many days",
+    )
+    prune.set_defaults(handler=_cache_prune)
+    cache_commands.add_parser(
+        "clear", help="remove every cached judgement"
+    ).set_defaults(handler=_cache_clear)
+    cache_commands.add_parser(
+        "verify", help="check every cached judgement and remove unreadable ones"
+    ).set_defaults(handler=_cache_verify)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the intentguard command.
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        The process exit code
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
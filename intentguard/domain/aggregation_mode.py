@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class AggregationMode(str, Enum):
+    """
+    Strategies for aggregating multiple evaluations into a final judgement.
+
+    Attributes:
+        STRICT: The code passes only if every evaluation is positive.
+        BALANCED: The code passes if a strict majority of evaluations is positive.
+            Ties fail.
+        RELAXED: The code passes if at least one evaluation is positive.
+    """
+
+    STRICT = "strict"
+    BALANCED = "balanced"
+    RELAXED = "relaxed"
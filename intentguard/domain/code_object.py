@@ -1,6 +1,8 @@
+import hashlib
 import inspect
 import logging
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, List, Any
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,11 @@ class CodeObject:
     code: str
     name: str
 
+    @cached_property
+    def digest(self) -> str:
+        """SHA-256 of the name and code, computed once per code object."""
+        return hashlib.sha256(f"{self.name}\0{self.code}".encode()).hexdigest()
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> List["CodeObject"]:
         """
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -20,7 +20,11 @@ class Evaluation:
             - Specific issues identified in the code
             - Suggestions for improvement
             May be None if no explanation is provided
+        metadata: Additional information about how the evaluation was reached,
+            such as the number of votes behind a judgement. Must be JSON
+            serializable, as it is stored in the judgement cache.
     """
 
     result: bool
     explanation: Optional[str]
+    metadata: Dict[str, Any] = field(default_factory=dict)
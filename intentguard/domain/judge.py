@@ -1,7 +1,9 @@
 from collections import Counter
 import logging
-from typing import List
+import math
+from typing import Any, Dict, List
 
+from intentguard.domain.aggregation_mode import AggregationMode
 from intentguard.domain.evaluation import Evaluation
 from intentguard.domain.judgement_options import JudgementOptions
 
@@ -13,8 +15,10 @@ class Judge:
     A class for making final judgements based on multiple LLM evaluations.
 
     This class implements a voting mechanism to aggregate multiple evaluations
-    into a single consensus result. It uses majority voting to determine the
-    final outcome and provides explanatory context for negative results.
+    into a single consensus result. The aggregation mode decides how many
+    positive votes are needed, and the judge can tell when a partial set of
+    votes already settles the outcome, so that remaining votes can be skipped.
+    For negative results, it provides explanatory context.
     """
 
     def __init__(self, judgement_options: JudgementOptions):
@@ -26,30 +30,163 @@ class Judge:
         """
         self.judgement_options = judgement_options
 
+    def _verdict(self, positive: int, negative: int) -> bool:
+        """
+        Decide the outcome for the given vote counts under the aggregation mode.
+
+        Args:
+            positive: Number of positive votes
+            negative: Number of negative votes
+
+        Returns:
+            True if the votes pass under the configured aggregation mode
+        """
+        mode = self.judgement_options.aggregation_mode
+        if mode == AggregationMode.STRICT:
+            return positive > 0 and negative == 0
+        if mode == AggregationMode.RELAXED:
+            return positive > 0
+        return positive > negative
+
+    @staticmethod
+    def true_probability(evaluation: Evaluation) -> float:
+        """
+        Get the probability that an individual evaluation's result is true.
+
+        Uses the "true_probability" metadata reported by providers that score
+        the verdict token, and falls back to 1.0 or 0.0 from the result.
+
+        Args:
+            evaluation: An individual evaluation
+
+        Returns:
+            A probability between 0.0 and 1.0
+        """
+        probability = evaluation.metadata.get("true_probability")
+        if probability is None:
+            return 1.0 if evaluation.result else 0.0
+        return float(probability)
+
+    def is_decided(self, evaluations: List[Evaluation], num_evaluations: int) -> bool:
+        """
+        Check whether the remaining votes can still change the verdict.
+
+        Every aggregation mode is monotonic in the number of positive votes, so
+        the outcome is settled once the verdict is the same whether all of the
+        remaining votes turn out positive or all turn out negative.
+
+        Args:
+            evaluations: The evaluations collected so far
+            num_evaluations: The total number of evaluations planned
+
+        Returns:
+            True if no outcome of the remaining votes can change the verdict
+        """
+        if self.judgement_options.probability_threshold is not None:
+            return len(evaluations) >= num_evaluations
+        positive = sum(1 for evaluation in evaluations if evaluation.result)
+        negative = len(evaluations) - positive
+        remaining = max(0, num_evaluations - len(evaluations))
+        return self._verdict(positive + remaining, negative) == self._verdict(
+            positive, negative + remaining
+        )
+
+    def verdict_confidence(
+        self, evaluations: List[Evaluation], num_evaluations: int
+    ) -> float:
+        """
+        Estimate how likely the remaining votes are to leave the verdict unchanged.
+
+        Votes are modelled as independent draws with an unknown probability of
+        being positive, with a uniform Beta(1, 1) prior. Given the votes so far,
+        the number of positive votes among the remaining ones follows a
+        beta-binomial distribution. The returned value is the posterior
+        predictive probability that the verdict after all `num_evaluations`
+        votes equals the verdict of the votes collected so far. It is 1.0 once
+        the verdict is decided.
+
+        Args:
+            evaluations: The evaluations collected so far
+            num_evaluations: The maximum number of evaluations that may be collected
+
+        Returns:
+            A probability between 0.0 and 1.0
+        """
+        if self.is_decided(evaluations, num_evaluations):
+            return 1.0
+        if self.judgement_options.probability_threshold is not None:
+            return 0.0
+        positive = sum(1 for evaluation in evaluations if evaluation.result)
+        negative = len(evaluations) - positive
+        remaining = num_evaluations - len(evaluations)
+        current = self._verdict(positive, negative)
+
+        alpha = positive + 1
+        beta = negative + 1
+        log_norm = math.lgamma(alpha + beta) - math.lgamma(alpha) - math.lgamma(beta)
+        log_total = math.lgamma(remaining + alpha + beta)
+        agreement = 0.0
+        for extra_positive in range(remaining + 1):
+            extra_negative = remaining - extra_positive
+            if (
+                self._verdict(positive + extra_positive, negative + extra_negative)
+                != current
+            ):
+                continue
+            agreement += math.exp(
+                math.lgamma(remaining + 1)
+                - math.lgamma(extra_positive + 1)
+                - math.lgamma(extra_negative + 1)
+                + math.lgamma(extra_positive + alpha)
+                + math.lgamma(extra_negative + beta)
+                - log_total
+                + log_norm
+            )
+        return min(1.0, agreement)
+
     def make_judgement(self, evaluations: List[Evaluation]) -> Evaluation:
         """
-        Aggregate multiple evaluations into a final judgement using majority voting.
+        Aggregate multiple evaluations into a final judgement.
 
-        This method counts positive and negative evaluations to determine the
-        consensus. For negative results, it includes an explanation from the first
-        failing evaluation that provides one.
+        This method counts positive and negative evaluations and applies the
+        configured aggregation mode: unanimity for strict, strict majority for
+        balanced (ties fail), and a single positive vote for relaxed. With a
+        probability threshold, the mean probability that the result is true is
+        compared against the threshold instead, and recorded as "score". For
+        negative results, it includes an explanation from the first failing
+        evaluation that provides one.
 
         Args:
             evaluations: List of individual Evaluation objects to aggregate
 
         Returns:
             A single Evaluation representing the consensus judgement.
-            The result is True if there are more positive than negative votes.
             For negative results, includes an explanation from a failing evaluation.
         """
         vote_count = Counter(evaluation.result for evaluation in evaluations)
-        final_result = vote_count[True] > vote_count[False]
-
-        logger.info(
-            "Vote count - Positive: %d, Negative: %d",
-            vote_count[True],
-            vote_count[False],
-        )
+        metadata: Dict[str, Any] = {
+            "votes": len(evaluations),
+            "positive_votes": vote_count[True],
+        }
+        threshold = self.judgement_options.probability_threshold
+        if threshold is not None:
+            score = (
+                sum(self.true_probability(evaluation) for evaluation in evaluations)
+                / len(evaluations)
+                if evaluations
+                else 0.0
+            )
+            final_result = score > threshold
+            metadata["score"] = score
+            logger.info("Probability score: %.3f (threshold: %.3f)", score, threshold)
+        else:
+            final_result = self._verdict(vote_count[True], vote_count[False])
+            logger.info(
+                "Vote count - Positive: %d, Negative: %d (mode: %s)",
+                vote_count[True],
+                vote_count[False],
+                self.judgement_options.aggregation_mode.value,
+            )
 
         explanation = None
         if not final_result:
@@ -61,4 +198,6 @@ class Judge:
                     break
 
         logger.info("Final judgement: %s", "Pass" if final_result else "Fail")
-        return Evaluation(result=final_result, explanation=explanation)
+        return Evaluation(
+            result=final_result, explanation=explanation, metadata=metadata
+        )
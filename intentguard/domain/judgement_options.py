@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from typing import Optional
+
+from intentguard.domain.aggregation_mode import AggregationMode
 
 
 @dataclass
@@ -6,13 +9,18 @@ class JudgementOptions:
     """
     Configuration options for the code evaluation judgement process.
 
-    This class is designed to hold settings that control how multiple evaluations
-    are aggregated into a final judgement. While currently empty, it provides
-    a structure for future configuration options such as:
-    - Custom voting thresholds
-    - Weighting strategies for different evaluations
-    - Explanation selection preferences
-    - Conflict resolution strategies
+    This class holds settings that control how multiple evaluations are
+    aggregated into a final judgement. Every field is part of the judgement
+    cache key, so only settings that can change the verdict belong here.
+
+    Attributes:
+        aggregation_mode: The strategy used to combine individual evaluations.
+            Defaults to majority voting.
+        probability_threshold: If set, evaluations are scored instead of
+            counted: the final result is true when the mean probability that
+            the result is true exceeds this threshold. The aggregation mode is
+            ignored in this case.
     """
 
-    pass
+    aggregation_mode: AggregationMode = AggregationMode.BALANCED
+    probability_threshold: Optional[float] = None
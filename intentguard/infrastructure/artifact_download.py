@@ -0,0 +1,289 @@
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import threading
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from intentguard.infrastructure.artifact_manifest import ArtifactManifest
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 16 * 1024 * 1024  # Unit of parallel fetching and of resumption
+READ_SIZE = 1024 * 1024
+DEFAULT_CONNECTIONS = 4
+MAX_CHUNK_ATTEMPTS = 3
+TIMEOUT_SECONDS = 60
+PROGRESS_STEP_PERCENT = 10
+
+_CONTENT_RANGE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+
+def artifact_source(url: str, filename: str, mirror: Optional[str] = None) -> str:
+    """
+    Resolve where an artifact is downloaded from.
+
+    Args:
+        url: The upstream URL of the artifact
+        filename: The artifact's file name under `.intentguard`
+        mirror: A base URL, or a local directory, holding the artifacts under
+            their `.intentguard` file names. None uses the upstream URL.
+
+    Returns:
+        The URL or local path to download the artifact from
+    """
+    if not mirror:
+        return url
+    if "://" in mirror and not mirror.startswith("file://"):
+        return f"{mirror.rstrip('/')}/{filename}"
+    return str(Path(mirror.removeprefix("file://")) / filename)
+
+
+class _Progress:
+    """Logs download progress in steps of PROGRESS_STEP_PERCENT."""
+
+    def __init__(self, name: str, total: Optional[int], done: int = 0):
+        self._name = name
+        self._total = total
+        self._done = done
+        self._reported = 0
+        self._lock = threading.Lock()
+
+    def advance(self, count: int) -> None:
+        with self._lock:
+            self._done += count
+            if not self._total:
+                return
+            percent = self._done * 100 // self._total
+            step = percent - percent % PROGRESS_STEP_PERCENT
+            if step > self._reported:
+                self._reported = step
+                logger.info(
+                    "Downloading %s: %d%% of %d MiB",
+                    self._name,
+                    percent,
+                    self._total // (1024 * 1024),
+                )
+
+
+def _probe(url: str) -> Tuple[Optional[int], bool]:
+    """Return the size of a remote file and whether it supports range requests."""
+    request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+    with urllib.request.urlopen(request, timeout=TIMEOUT_SECONDS) as response:
+        if response.status == 206:
+            match = _CONTENT_RANGE.fullmatch(response.headers.get("Content-Range", ""))
+            if match:
+                return int(match.group(1)), True
+        length = response.headers.get("Content-Length")
+        return (int(length) if length else None), False
+
+
+class _ResumeState:
+    """
+    Chunks of a `.part` file that were already downloaded.
+
+    Stored as JSON next to the `.part` file, and only reused for the same URL,
+    size and chunk size.
+    """
+
+    def __init__(self, path: Path, url: str, size: int):
+        self.path = path
+        self._identity = {"url": url, "size": size, "chunk_size": CHUNK_SIZE}
+        self._lock = threading.Lock()
+        self.done: Set[int] = set()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                saved: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return
+        if all(saved.get(k) == v for k, v in self._identity.items()):
+            self.done = set(saved.get("done", []))
+
+    def mark_done(self, index: int) -> None:
+        with self._lock:
+            self.done.add(index)
+            tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(dict(self._identity, done=sorted(self.done)), f)
+            os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def _fetch_chunk(
+    url: str, part_path: Path, start: int, end: int, progress: _Progress
+) -> None:
+    """Download bytes start..end (inclusive) into the same range of part_path."""
+    for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+        written = 0
+        try:
+            request = urllib.request.Request(
+                url, headers={"Range": f"bytes={start}-{end}"}
+            )
+            with (
+                urllib.request.urlopen(request, timeout=TIMEOUT_SECONDS) as response,
+                open(part_path, "r+b") as f,
+            ):
+                if response.status != 206:
+                    raise ValueError(f"{url} ignored the range request")
+                f.seek(start)
+                while block := response.read(READ_SIZE):
+                    f.write(block)
+                    written += len(block)
+                    progress.advance(len(block))
+            if written != end - start + 1:
+                raise ConnectionError(
+                    f"Received {written} of {end - start + 1} bytes from {url}"
+                )
+            return
+        except (OSError, http.client.HTTPException) as e:
+            progress.advance(-written)
+            if attempt == MAX_CHUNK_ATTEMPTS:
+                raise
+            logger.warning("Retrying bytes %d-%d of %s: %s", start, end, url, e)
+
+
+def _download_ranges(
+    url: str, part_path: Path, size: int, connections: int, hasher: Any
+) -> None:
+    """
+    Download a file in chunks over several connections, resuming if possible.
+
+    Chunks are hashed in order as soon as they and every chunk before them
+    are on disk, while later chunks are still downloading.
+    """
+    state = _ResumeState(part_path.with_name(f"{part_path.name}.json"), url, size)
+    if part_path.exists() and part_path.stat().st_size == size:
+        state.load()
+    else:
+        with open(part_path, "wb") as part:
+            part.truncate(size)
+    chunks = [
+        (start, min(start + CHUNK_SIZE, size) - 1)
+        for start in range(0, size, CHUNK_SIZE)
+    ]
+    if state.done:
+        logger.info(
+            "Resuming download of %s: %d of %d chunks already downloaded",
+            url,
+            len(state.done),
+            len(chunks),
+        )
+    progress = _Progress(
+        part_path.name,
+        size,
+        sum(
+            end - start + 1 for i, (start, end) in enumerate(chunks) if i in state.done
+        ),
+    )
+
+    def fetch(index: int) -> None:
+        start, end = chunks[index]
+        _fetch_chunk(url, part_path, start, end, progress)
+        state.mark_done(index)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, connections), thread_name_prefix="intentguard-download"
+    )
+    try:
+        futures: Dict[int, Future] = {
+            i: executor.submit(fetch, i)
+            for i in range(len(chunks))
+            if i not in state.done
+        }
+        with open(part_path, "rb", buffering=0) as f:
+            buffer = bytearray(READ_SIZE)
+            view = memoryview(buffer)
+            for i, (start, end) in enumerate(chunks):
+                if i in futures:
+                    futures[i].result()
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining:
+                    read = f.readinto(view[: min(READ_SIZE, remaining)])
+                    if not read:
+                        raise ConnectionError(f"{part_path} is shorter than expected")
+                    hasher.update(view[:read])
+                    remaining -= read
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    state.remove()
+
+
+def _download_stream(url: str, part_path: Path, hasher: Any) -> None:
+    """Download a file over one connection, for servers without range support."""
+    with (
+        urllib.request.urlopen(url, timeout=TIMEOUT_SECONDS) as response,
+        open(part_path, "wb") as f,
+    ):
+        length = response.headers.get("Content-Length")
+        progress = _Progress(part_path.name, int(length) if length else None)
+        while block := response.read(READ_SIZE):
+            hasher.update(block)
+            f.write(block)
+            progress.advance(len(block))
+
+
+def _copy_local(source: Path, part_path: Path, hasher: Any) -> None:
+    """Copy a file from a local mirror, hashing it on the way."""
+    with open(source, "rb") as src, open(part_path, "wb") as dst:
+        while block := src.read(READ_SIZE):
+            hasher.update(block)
+            dst.write(block)
+
+
+def download(
+    source: str,
+    target_path: Path,
+    expected_sha256: str,
+    connections: int = DEFAULT_CONNECTIONS,
+) -> None:
+    """
+    Download a file, verify its checksum and move it into place.
+
+    The file is written to `<target>.part`, and only renamed to the target
+    once its checksum matches. Servers that support HTTP range requests are
+    downloaded in CHUNK_SIZE chunks over several connections, and an
+    interrupted download resumes from the chunks already in the `.part` file.
+    The checksum is computed while downloading, and recorded in the artifact
+    manifest so the file is not hashed again on first use.
+
+    Args:
+        source: URL, or local file path, to download from
+        target_path: Where to store the file
+        expected_sha256: The checksum the file must have
+        connections: Maximum number of concurrent range requests
+
+    Raises:
+        ValueError: If the downloaded file has the wrong checksum
+    """
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = target_path.with_name(f"{target_path.name}.part")
+    hasher = hashlib.sha256()
+
+    if "://" not in source:
+        logger.info("Copying %s to %s...", source, target_path)
+        _copy_local(Path(source), part_path, hasher)
+    else:
+        logger.info("Downloading %s to %s...", source, target_path)
+        size, ranges = _probe(source)
+        if ranges and size:
+            _download_ranges(source, part_path, size, connections, hasher)
+        else:
+            _download_stream(source, part_path, hasher)
+
+    checksum = hasher.hexdigest()
+    if checksum != expected_sha256:
+        part_path.unlink()  # Delete the file if checksum verification fails
+        raise ValueError(f"Checksum verification failed for {target_path}")
+    os.replace(part_path, target_path)
+    ArtifactManifest(target_path.parent).record(target_path, checksum)
+    logger.info("Successfully downloaded and verified %s", target_path)
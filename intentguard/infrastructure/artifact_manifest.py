@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+HASH_BUFFER_SIZE = 1024 * 1024  # 1 MiB reads keep hashing of large models I/O bound
+
+
+def compute_checksum(file_path: Path) -> str:
+    """Compute the SHA-256 checksum of a file using large buffered reads."""
+    sha256_hash = hashlib.sha256()
+    buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            sha256_hash.update(view[:read])
+    return sha256_hash.hexdigest()
+
+
+def _fingerprint(stat: os.stat_result) -> Dict[str, int]:
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "inode": stat.st_ino,
+    }
+
+
+class ArtifactManifest:
+    """
+    Record of artifacts whose checksum has already been verified.
+
+    The manifest is a JSON file stored next to the artifacts. For each file it
+    keeps the size, modification time and inode observed at verification time,
+    together with the verified SHA-256 checksum. As long as these stat fields
+    are unchanged, the file is trusted without being hashed again.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Initialize the manifest for the artifacts in a directory.
+
+        Args:
+            directory: Directory holding the artifacts and the manifest file
+        """
+        self.path = directory / MANIFEST_FILENAME
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable artifact manifest %s: %s", self.path, e)
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_verified(self, file_path: Path, expected_sha256: str) -> bool:
+        """
+        Check whether a file was verified and has not changed since.
+
+        Args:
+            file_path: Path of the artifact
+            expected_sha256: The checksum the artifact must have
+
+        Returns:
+            True if the manifest records the expected checksum for the file and
+            its size, mtime and inode still match; False otherwise
+        """
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        with self._lock:
+            entry = self._load().get(file_path.name)
+        if entry is None or entry.get("sha256") != expected_sha256:
+            return False
+        return all(entry.get(k) == v for k, v in _fingerprint(stat).items())
+
+    def record(
+        self, file_path: Path, sha256: str, stat: Optional[os.stat_result] = None
+    ) -> None:
+        """
+        Record a file as verified with the given checksum.
+
+        Args:
+            file_path: Path of the verified artifact
+            sha256: The checksum computed for the artifact
+            stat: The file status taken before hashing. Defaults to the
+                current status of the file.
+        """
+        stat = stat or file_path.stat()
+        entry: Dict[str, Any] = dict(_fingerprint(stat), sha256=sha256)
+        with self._lock:
+            entries = self._load()
+            entries[file_path.name] = entry
+            try:
+                self._save(entries)
+            except OSError as e:
+                logger.warning("Failed to write artifact manifest %s: %s", self.path, e)
+
+    def forget(self, file_path: Path) -> None:
+        """
+        Remove a file from the manifest.
+
+        Args:
+            file_path: Path of the artifact to forget
+        """
+        with self._lock:
+            entries = self._load()
+            if entries.pop(file_path.name, None) is None:
+                return
+            try:
+                self._save(entries)
+            except OSError as e:
+                logger.warning("Failed to write artifact manifest %s: %s", self.path, e)
+
+    def verify(
+        self, file_path: Path, expected_sha256: str, force: bool = False
+    ) -> bool:
+        """
+        Verify the checksum of a file, hashing it only when necessary.
+
+        Args:
+            file_path: Path of the artifact
+            expected_sha256: The checksum the artifact must have
+            force: Hash the file even if the manifest says it is unchanged
+
+        Returns:
+            True if the file has the expected checksum, False otherwise
+        """
+        if not force and self.is_verified(file_path, expected_sha256):
+            logger.debug("%s unchanged since last verification", file_path)
+            return True
+        stat = file_path.stat()
+        checksum = compute_checksum(file_path)
+        if checksum != expected_sha256:
+            self.forget(file_path)
+            return False
+        self.record(file_path, checksum, stat)
+        return True
@@ -0,0 +1,218 @@
+import asyncio
+import http.client
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+
+from intentguard.infrastructure.http_connection_pool import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise http.client.IncompleteRead(b"")
+        line = line.rstrip(b"\r\n")
+        if not line:
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_chunked_body(reader: asyncio.StreamReader) -> bytes:
+    chunks: List[bytes] = []
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError as e:
+            raise http.client.HTTPException(f"Invalid chunk size: {size_line!r}") from e
+        if size == 0:
+            # Discard optional trailers up to the terminating blank line.
+            await _read_headers(reader)
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, str, Dict[str, str]]:
+    status_line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+    parts = status_line.split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise http.client.BadStatusLine(status_line)
+    try:
+        status = int(parts[1])
+    except ValueError as e:
+        raise http.client.BadStatusLine(status_line) from e
+    reason = parts[2] if len(parts) > 2 else ""
+    return status, reason, await _read_headers(reader)
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        return await _read_chunked_body(reader)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+
+async def _iter_body_lines(
+    reader: asyncio.StreamReader, headers: Dict[str, str]
+) -> AsyncIterator[bytes]:
+    """Yield the response body line by line as it arrives."""
+    if headers.get("transfer-encoding", "").lower() != "chunked":
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+            for line in body.splitlines(keepends=True):
+                yield line
+            return
+        while line := await reader.readline():
+            yield line
+        return
+
+    buffer = b""
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError as e:
+            raise http.client.HTTPException(f"Invalid chunk size: {size_line!r}") from e
+        if size == 0:
+            await _read_headers(reader)
+            break
+        buffer += await reader.readexactly(size)
+        await reader.readexactly(2)
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line + b"\n"
+    if buffer:
+        yield buffer
+
+
+async def _read_response(reader: asyncio.StreamReader) -> HttpResponse:
+    status, reason, headers = await _read_head(reader)
+    body = await _read_body(reader, headers)
+    return HttpResponse(status=status, reason=reason, body=body)
+
+
+async def _consume_response(
+    reader: asyncio.StreamReader, on_line: Callable[[bytes], bool]
+) -> HttpResponse:
+    status, reason, headers = await _read_head(reader)
+    if status != 200:
+        body = await _read_body(reader, headers)
+        return HttpResponse(status=status, reason=reason, body=body)
+    async for line in _iter_body_lines(reader, headers):
+        if on_line(line):
+            break
+    return HttpResponse(status=status, reason=reason, body=b"")
+
+
+async def _send_request(
+    host: str, port: int, path: str, body: bytes, timeout: float
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout
+    )
+    head = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n"
+        "\r\n"
+    )
+    try:
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, OSError) as e:
+        logger.debug("Error while closing connection: %s", e)
+
+
+async def post_json(
+    host: str, port: int, path: str, body: bytes, timeout: float
+) -> HttpResponse:
+    """
+    Send a JSON POST request using non-blocking asyncio streams.
+
+    A new connection is opened for every request and closed afterwards, so
+    cancelling the calling task drops the connection and lets the server abandon
+    the request.
+
+    Args:
+        host: Server host name or address
+        port: Server port
+        path: Request path, e.g. "/v1/chat/completions"
+        body: Encoded JSON request body
+        timeout: Timeout in seconds for connecting and for reading the response
+
+    Returns:
+        The parsed HTTP response
+
+    Raises:
+        asyncio.TimeoutError: If connecting or reading takes longer than timeout
+        ConnectionError: If the server closes the connection prematurely
+        http.client.HTTPException: If the response is malformed
+    """
+    reader, writer = await _send_request(host, port, path, body, timeout)
+    try:
+        try:
+            return await asyncio.wait_for(_read_response(reader), timeout)
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionError("Server closed the connection prematurely") from e
+    finally:
+        await _close(writer)
+
+
+async def post_json_stream(
+    host: str,
+    port: int,
+    path: str,
+    body: bytes,
+    timeout: float,
+    on_line: Callable[[bytes], bool],
+) -> HttpResponse:
+    """
+    Send a JSON POST request and consume a streamed response line by line.
+
+    Each line of a successful response body is passed to on_line as soon as
+    it arrives. Once on_line returns True, the connection is closed without
+    reading the rest of the response, which lets the server stop generating.
+
+    Args:
+        host: Server host name or address
+        port: Server port
+        path: Request path, e.g. "/v1/chat/completions"
+        body: Encoded JSON request body
+        timeout: Timeout in seconds for connecting and for reading the response
+        on_line: Callback receiving each body line, returning True to stop
+
+    Returns:
+        The response status. The body is only included for non-200 responses,
+        since successful bodies are delivered through on_line.
+
+    Raises:
+        asyncio.TimeoutError: If connecting or reading takes longer than timeout
+        ConnectionError: If the server closes the connection prematurely
+        http.client.HTTPException: If the response is malformed
+    """
+    reader, writer = await _send_request(host, port, path, body, timeout)
+    try:
+        try:
+            return await asyncio.wait_for(_consume_response(reader, on_line), timeout)
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionError("Server closed the connection prematurely") from e
+    finally:
+        await _close(writer)
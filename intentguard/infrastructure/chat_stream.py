@@ -0,0 +1,71 @@
+import json
+import logging
+from typing import Any, Dict, List
+
+from intentguard.infrastructure.evaluation_format import verdict_complete
+
+logger = logging.getLogger(__name__)
+
+
+class ChatStream:
+    """
+    Accumulates a streamed chat completions response.
+
+    Server-sent event lines are fed in one at a time. The stream reports that
+    it is finished when the server ends the generation, or as soon as the
+    generated text contains a complete verdict, so the caller can drop the
+    connection and skip the remaining tokens.
+    """
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._logprobs: List[Dict[str, Any]] = []
+        self.finished: bool = False
+        self.stopped_early: bool = False
+
+    @property
+    def text(self) -> str:
+        """The content generated so far."""
+        return "".join(self._parts)
+
+    def feed_line(self, line: bytes) -> bool:
+        """
+        Process one line of the event stream.
+
+        Args:
+            line: A raw line of the response body
+
+        Returns:
+            True if no further lines are needed
+        """
+        line = line.strip()
+        if self.finished or not line.startswith(b"data:"):
+            return self.finished
+        data = line[len(b"data:") :].strip()
+        if data == b"[DONE]":
+            self.finished = True
+            return True
+
+        chunk = json.loads(data)
+        for choice in chunk.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                self._parts.append(content)
+            logprobs = (choice.get("logprobs") or {}).get("content")
+            if logprobs:
+                self._logprobs.extend(logprobs)
+            if choice.get("finish_reason"):
+                self.finished = True
+
+        if not self.finished and verdict_complete(self.text):
+            logger.debug("Verdict known after %d characters", len(self.text))
+            self.finished = True
+            self.stopped_early = True
+        return self.finished
+
+    def to_response(self) -> Dict[str, Any]:
+        """Build the equivalent non-streamed chat completions response."""
+        choice: Dict[str, Any] = {"message": {"content": self.text}}
+        if self._logprobs:
+            choice["logprobs"] = {"content": self._logprobs}
+        return {"choices": [choice]}
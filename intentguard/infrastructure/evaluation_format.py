@@ -0,0 +1,177 @@
+import json
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from intentguard.domain.evaluation import Evaluation
+
+logger = logging.getLogger(__name__)
+
+# Fields are listed in generation order: the grammar derived from this schema
+# makes the model reason in `thoughts` before it commits to `result`.
+EVALUATION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "thoughts": {"type": "string"},
+        "result": {"type": "boolean"},
+        "explanation": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+    },
+    "required": ["thoughts", "result", "explanation"],
+    "additionalProperties": False,
+}
+
+# Fast-mode variant: the verdict comes first and no reasoning is generated.
+VERDICT_FIRST_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "result": {"type": "boolean"},
+        "explanation": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+    },
+    "required": ["result", "explanation"],
+    "additionalProperties": False,
+}
+
+_END_OF_TURN = "<|eot_id|>"
+_CODE_FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_RESULT_PATTERN = re.compile(r'"result"\s*:\s*"?(true|false)\b', re.IGNORECASE)
+_EXPLANATION_PATTERN = re.compile(r'"explanation"\s*:\s*(null|"(?:[^"\\]|\\.)*"?)')
+_COMPLETE_EXPLANATION_PATTERN = re.compile(
+    r'"explanation"\s*:\s*(?:null\b|"(?:[^"\\]|\\.)*")'
+)
+
+
+def response_format(verdict_first: bool = False) -> Dict[str, Any]:
+    """
+    Build the OpenAI-compatible `response_format` that constrains decoding.
+
+    The server compiles the schema into a grammar, so the model can only emit
+    a JSON object with the `thoughts`, `result` and `explanation` fields.
+
+    Args:
+        verdict_first: Use the fast-mode schema, which has no `thoughts` field
+            and starts with `result`
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "evaluation",
+            "strict": True,
+            "schema": VERDICT_FIRST_SCHEMA if verdict_first else EVALUATION_SCHEMA,
+        },
+    }
+
+
+def verdict_complete(text: str) -> bool:
+    """
+    Check whether partial output already contains everything a vote needs.
+
+    That is a `result` of true, or a `result` of false followed by a complete
+    `explanation`. Anything generated afterwards can be skipped.
+
+    Args:
+        text: The output generated so far
+
+    Returns:
+        True if the rest of the generation can be discarded
+    """
+    result_match = _RESULT_PATTERN.search(text)
+    if result_match is None:
+        return False
+    if result_match.group(1).lower() == "true":
+        return True
+    return _COMPLETE_EXPLANATION_PATTERN.search(text, result_match.end()) is not None
+
+
+def _legacy_repair(text: str) -> str:
+    """Escape quote patterns the model is known to leave unescaped in strings."""
+    return (
+        text.replace('"""', '\\"\\"\\"')
+        .replace('\\\\"\\"\\"', '\\"\\"\\"')
+        .replace('\\\\"', '\\"')
+        .replace('["', '[\\"')
+        .replace('"]', '\\"]')
+    )
+
+
+def _to_evaluation(llm_response: Any) -> Optional[Evaluation]:
+    if not isinstance(llm_response, dict) or "result" not in llm_response:
+        return None
+    result = llm_response["result"]
+    if isinstance(result, str):
+        result = result.strip().lower() == "true"
+    return Evaluation(result=bool(result), explanation=llm_response.get("explanation"))
+
+
+def _loads(text: str) -> Optional[Evaluation]:
+    try:
+        return _to_evaluation(json.loads(text))
+    except json.JSONDecodeError:
+        return None
+
+
+def _decode_partial_string(literal: str) -> str:
+    """Decode a JSON string literal that may have been cut off."""
+    if not literal.endswith('"') or literal.endswith('\\"') or len(literal) == 1:
+        literal = literal.rstrip("\\") + '"'
+    try:
+        return json.loads(literal)
+    except json.JSONDecodeError:
+        return literal[1:-1]
+
+
+def _recover(text: str) -> Optional[Evaluation]:
+    """Pull the result and explanation out of malformed or truncated JSON."""
+    result_match = _RESULT_PATTERN.search(text)
+    if result_match is None:
+        return None
+    explanation: Optional[str] = None
+    explanation_match = _EXPLANATION_PATTERN.search(text, result_match.end())
+    if explanation_match is not None and explanation_match.group(1) != "null":
+        explanation = _decode_partial_string(explanation_match.group(1))
+    return Evaluation(
+        result=result_match.group(1).lower() == "true", explanation=explanation
+    )
+
+
+def parse_evaluation_text(text: str) -> Evaluation:
+    """
+    Parse the model's answer into an Evaluation, tolerating malformed output.
+
+    Strategies are tried from strictest to most lenient:
+
+    1. The text as-is, which always succeeds for schema-constrained output
+    2. The text with known quoting mistakes repaired
+    3. The outermost `{...}` block, ignoring surrounding prose or code fences
+    4. Field-by-field recovery of `result` and `explanation`, which also
+       handles output that was cut off after the verdict
+
+    Args:
+        text: The generated message content
+
+    Returns:
+        The parsed evaluation
+
+    Raises:
+        ValueError: If no verdict can be found in the text
+    """
+    if text.endswith(_END_OF_TURN):
+        text = text[: -len(_END_OF_TURN)]
+    text = _CODE_FENCE_PATTERN.sub("", text)
+
+    candidates = [text, _legacy_repair(text)]
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        block = text[start : end + 1]
+        candidates.extend([block, _legacy_repair(block)])
+
+    for candidate in candidates:
+        evaluation = _loads(candidate)
+        if evaluation is not None:
+            return evaluation
+
+    evaluation = _recover(text)
+    if evaluation is not None:
+        logger.debug("Recovered verdict from malformed model output")
+        return evaluation
+
+    raise ValueError(f"No verdict found in model output: {text}")
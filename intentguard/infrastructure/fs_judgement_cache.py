@@ -1,25 +1,83 @@
-import hashlib
 import json
 import logging
+import os
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from intentguard.app.inference_options import InferenceOptions
 from intentguard.app.judgement_cache import JudgementCache
-from intentguard.app.message import Message
+from intentguard.app.judgement_cache_key import JudgementCacheKey
 from intentguard.domain.evaluation import Evaluation
-from intentguard.domain.judgement_options import JudgementOptions
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CacheStoreStats:
+    """
+    Summary of the entries held by a persistent judgement cache.
+
+    Attributes:
+        location: Where the cache is stored
+        entries: Number of cached judgements
+        size_bytes: Total size of the cached judgements
+        oldest_access: Time of the least recent access, in seconds since the
+            epoch, or None if the cache is empty
+        newest_access: Time of the most recent access, or None if the cache
+            is empty
+    """
+
+    location: str
+    entries: int = 0
+    size_bytes: int = 0
+    oldest_access: Optional[float] = None
+    newest_access: Optional[float] = None
+
+
+def select_evictions(
+    entries: List[Tuple[str, float, int]],
+    max_bytes: Optional[int],
+    max_age_seconds: Optional[float],
+    now: float,
+) -> List[str]:
+    """
+    Choose the cache entries to remove to stay within the limits.
+
+    Entries not accessed within max_age_seconds are removed first. Then the
+    least recently accessed entries are removed until the rest fit in
+    max_bytes.
+
+    Args:
+        entries: (key, last access time, size) of every cached entry
+        max_bytes: Maximum total size to keep, or None for no size limit
+        max_age_seconds: Maximum time since the last access, or None for no
+            age limit
+        now: The current time, in seconds since the epoch
+
+    Returns:
+        The keys of the entries to remove
+    """
+    by_access = sorted(entries, key=lambda entry: entry[1])
+    total = sum(size for _, _, size in by_access)
+    evicted: List[str] = []
+    for key, accessed_at, size in by_access:
+        too_old = max_age_seconds is not None and accessed_at < now - max_age_seconds
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            break
+        evicted.append(key)
+        total -= size
+    return evicted
+
+
 class FsJudgementCache(JudgementCache):
     """
     File system-based implementation of the JudgementCache interface.
 
     This class provides a persistent cache for evaluation results using the local
-    file system. Each cache entry is stored in a separate file, with the filename
-    derived from a hash of the input parameters. Cache files are stored in a
+    file system. Each cache entry is stored in a separate file, named after the
+    digest of its JudgementCacheKey. Cache files are stored in a
     '.intentguard' directory in the current working directory.
     """
 
@@ -27,37 +85,39 @@ class FsJudgementCache(JudgementCache):
         self.cache_dir = Path(".intentguard") / "cache"
         logger.debug("Initialized cache directory at %s", self.cache_dir)
 
-    def _get_cache_file_path(
-        self,
-        prompt: List[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-    ) -> Path:
+    def _get_cache_file_path(self, key: JudgementCacheKey) -> Path:
         """
-        Generate a unique file path for caching an evaluation result.
-
-        Creates a deterministic file path by hashing the combination of prompt,
-        inference options, and judgement options. This ensures that identical
-        evaluation requests map to the same cache file.
+        Get the file holding the cached judgement for a key.
 
         Args:
-            prompt: The list of messages forming the evaluation prompt
-            inference_options: Configuration for the inference process
-            judgement_options: Configuration for the judgement process
+            key: Identifies the evaluation request
 
         Returns:
             Path object pointing to the cache file location
         """
-        input_str = f"v2:{prompt}:{inference_options}:{judgement_options}"
-        hashed_input = hashlib.sha256(input_str.encode()).hexdigest()
-        return self.cache_dir / hashed_input
+        return self.cache_dir / key.digest
 
-    def get(
-        self,
-        prompt: List[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-    ) -> Optional[Evaluation]:
+    def _read_cache_file(self, file_path: Path) -> Optional[Evaluation]:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                logger.debug("Cache hit for %s", file_path)
+                judgement = Evaluation(**data)
+        except Exception as e:
+            logger.warning("Failed to read cache file %s: %s", file_path, str(e))
+            return None
+        self._touch(file_path)
+        return judgement
+
+    @staticmethod
+    def _touch(file_path: Path) -> None:
+        """Record an access in the modification time, which drives eviction."""
+        try:
+            os.utime(file_path)
+        except OSError as e:
+            logger.debug("Could not update access time of %s: %s", file_path, e)
+
+    def get(self, key: JudgementCacheKey) -> Optional[Evaluation]:
         """
         Retrieve a cached evaluation result if available.
 
@@ -66,35 +126,61 @@ class FsJudgementCache(JudgementCache):
         errors reading or parsing the file.
 
         Args:
-            prompt: The list of messages forming the evaluation prompt
-            inference_options: Configuration for the inference process
-            judgement_options: Configuration for the judgement process
+            key: Identifies the evaluation request
 
         Returns:
             The cached Evaluation if found and valid, None otherwise
         """
-        file_path = self._get_cache_file_path(
-            prompt, inference_options, judgement_options
-        )
+        file_path = self._get_cache_file_path(key)
         if not file_path.exists():
             logger.debug("Cache miss for %s", file_path)
             return None
+        return self._read_cache_file(file_path)
+
+    def get_many(self, keys: List[JudgementCacheKey]) -> List[Optional[Evaluation]]:
+        """
+        Retrieve cached evaluation results for several requests in one pass.
+
+        Lists the cache directory once instead of checking each entry for
+        existence, then opens only the files that are present.
+
+        Args:
+            keys: Identify the evaluation requests to look up
+
+        Returns:
+            A list with the cached Evaluation or None for each key, in order
+        """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                logger.debug("Cache hit for %s", file_path)
-                return Evaluation(**data)
-        except Exception as e:
-            logger.warning("Failed to read cache file %s: %s", file_path, str(e))
-            return None
+            with os.scandir(self.cache_dir) as entries:
+                existing = {entry.name for entry in entries}
+        except FileNotFoundError:
+            existing = set()
 
-    def put(
-        self,
-        prompt: List[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-        judgement: Evaluation,
-    ):
+        results: List[Optional[Evaluation]] = []
+        for key in keys:
+            file_path = self._get_cache_file_path(key)
+            if file_path.name in existing:
+                results.append(self._read_cache_file(file_path))
+            else:
+                results.append(None)
+        logger.debug(
+            "Bulk cache lookup: %d of %d entries found",
+            sum(result is not None for result in results),
+            len(results),
+        )
+        return results
+
+    def touch_many(self, keys: List[JudgementCacheKey]) -> None:
+        """
+        Refresh the access times of entries served by a cache in front of this one.
+
+        Args:
+            keys: Identify the entries that were used
+        """
+        for key in keys:
+            self._touch(self._get_cache_file_path(key))
+
+    def put(self, key: JudgementCacheKey, judgement: Evaluation):
         """
         Store an evaluation result in the cache.
 
@@ -102,18 +188,139 @@ class FsJudgementCache(JudgementCache):
         directory. Creates the cache directory if it doesn't exist.
 
         Args:
-            prompt: The list of messages forming the evaluation prompt
-            inference_options: Configuration for the inference process
-            judgement_options: Configuration for the judgement process
+            key: Identifies the evaluation request
             judgement: The evaluation result to cache
         """
-        file_path = self._get_cache_file_path(
-            prompt, inference_options, judgement_options
-        )
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._write_cache_file(self._get_cache_file_path(key), judgement)
+
+    def put_many(
+        self, keys: List[JudgementCacheKey], judgements: List[Evaluation]
+    ) -> None:
+        """
+        Store evaluation results for several requests in one pass.
+
+        Creates the cache directory once and then writes one file per entry.
+
+        Args:
+            keys: Identify the evaluation requests
+            judgements: The evaluation results to cache, one per key
+        """
+        if not keys:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for key, judgement in zip(keys, judgements):
+            self._write_cache_file(self._get_cache_file_path(key), judgement)
+
+    def _write_cache_file(self, file_path: Path, judgement: Evaluation) -> None:
         try:
             with open(file_path, "w", encoding="utf-8") as f:
                 json.dump(judgement.__dict__, f)
             logger.debug("Successfully cached judgement at %s", file_path)
         except Exception as e:
             logger.error("Failed to write cache file %s: %s", file_path, str(e))
+
+    def _scan(self) -> List[Tuple[str, float, int]]:
+        """List (name, last access time, size) of every cache file."""
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                files = [entry for entry in entries if entry.is_file()]
+        except FileNotFoundError:
+            return []
+        scanned = []
+        for entry in files:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            scanned.append((entry.name, stat.st_mtime, stat.st_size))
+        return scanned
+
+    def _remove(self, names: List[str]) -> int:
+        removed = 0
+        for name in names:
+            try:
+                os.unlink(self.cache_dir / name)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Failed to remove cache file %s: %s", name, e)
+        return removed
+
+    def store_stats(self) -> CacheStoreStats:
+        """
+        Summarize the entries in the cache directory.
+
+        The last access of an entry is the modification time of its file,
+        which is updated on every cache hit.
+
+        Returns:
+            The number, total size and access times of the cached entries
+        """
+        entries = self._scan()
+        access_times = [accessed_at for _, accessed_at, _ in entries]
+        return CacheStoreStats(
+            location=str(self.cache_dir),
+            entries=len(entries),
+            size_bytes=sum(size for _, _, size in entries),
+            oldest_access=min(access_times, default=None),
+            newest_access=max(access_times, default=None),
+        )
+
+    def prune(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        compact: bool = False,
+    ) -> int:
+        """
+        Remove entries to stay within a size and age limit.
+
+        See select_evictions for which entries are removed.
+
+        Args:
+            max_bytes: Maximum total size to keep, or None for no size limit
+            max_age_seconds: Maximum time since the last access, or None for
+                no age limit
+            compact: Ignored. Removed files release their space immediately.
+
+        Returns:
+            The number of entries removed
+        """
+        evicted = select_evictions(
+            self._scan(), max_bytes, max_age_seconds, time.time()
+        )
+        removed = self._remove(evicted)
+        logger.info("Pruned %d judgements from %s", removed, self.cache_dir)
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove every entry from the cache.
+
+        Returns:
+            The number of entries removed
+        """
+        return self._remove([name for name, _, _ in self._scan()])
+
+    def verify(self) -> Tuple[int, int]:
+        """
+        Check that every entry can be read, and remove those that cannot.
+
+        Returns:
+            The number of valid entries and the number of entries removed
+        """
+        valid = 0
+        corrupt: List[str] = []
+        for name, _, _ in self._scan():
+            try:
+                with open(self.cache_dir / name, "r", encoding="utf-8") as f:
+                    Evaluation(**json.load(f))
+                valid += 1
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning("Removing unreadable cache file %s: %s", name, e)
+                corrupt.append(name)
+        return valid, self._remove(corrupt)
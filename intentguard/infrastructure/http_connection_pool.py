@@ -0,0 +1,185 @@
+import http.client
+import logging
+import select
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDLE_PER_ENDPOINT = 8
+
+# Errors raised when a kept-alive connection was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+@dataclass
+class HttpResponse:
+    """
+    A fully read HTTP response.
+
+    Attributes:
+        status: The HTTP status code
+        reason: The reason phrase from the status line
+        body: The raw response body
+    """
+
+    status: int
+    reason: str
+    body: bytes
+
+
+def _is_stale(conn: http.client.HTTPConnection) -> bool:
+    """
+    Check whether an idle connection can no longer be used.
+
+    An idle keep-alive socket should have nothing to read. If it is readable,
+    the server has either closed it or sent unexpected data, and the
+    connection must be discarded.
+    """
+    sock = getattr(conn, "sock", None)
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class HttpConnectionPool:
+    """
+    Thread-safe pool of persistent HTTP/1.1 connections, keyed by endpoint.
+
+    Connections are kept alive between requests and handed out to one thread
+    at a time. Idle connections are checked before reuse, and a request that
+    fails because a reused connection went stale is transparently retried once
+    on a fresh connection.
+    """
+
+    def __init__(self, max_idle_per_endpoint: int = DEFAULT_MAX_IDLE_PER_ENDPOINT):
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_idle_per_endpoint: Maximum number of idle connections kept open
+                for each host and port. Extra connections are closed on release.
+        """
+        self._max_idle_per_endpoint = max_idle_per_endpoint
+        self._idle: Dict[Tuple[str, int], Deque[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(
+        self, host: str, port: int, timeout: Optional[float]
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take an idle connection to the endpoint, or create a new one.
+
+        Returns:
+            The connection and whether it was reused from the pool
+        """
+        with self._lock:
+            idle = self._idle.get((host, port))
+            while idle:
+                conn = idle.pop()
+                if _is_stale(conn):
+                    logger.debug("Discarding stale connection to %s:%d", host, port)
+                    conn.close()
+                    continue
+                conn.timeout = timeout
+                if getattr(conn, "sock", None) is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(
+        self, host: str, port: int, conn: http.client.HTTPConnection, reusable: bool
+    ) -> None:
+        """Return a connection to the pool, or close it if it cannot be reused."""
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault((host, port), deque())
+                if len(idle) < self._max_idle_per_endpoint:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def request(
+        self,
+        host: str,
+        port: int,
+        method: str,
+        path: str,
+        body: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HttpResponse:
+        """
+        Send a request over a pooled connection and read the whole response.
+
+        Args:
+            host: Server host name or address
+            port: Server port
+            method: HTTP method, e.g. "POST"
+            path: Request path
+            body: Optional request body
+            headers: Optional request headers
+            timeout: Socket timeout in seconds, or None to block indefinitely
+
+        Returns:
+            The fully read response
+
+        Raises:
+            OSError: On connection errors, including timeouts
+            http.client.HTTPException: If the response is malformed
+        """
+        while True:
+            conn, reused = self._acquire(host, port, timeout)
+            try:
+                conn.request(method, path, body=body, headers=dict(headers or {}))
+                response = conn.getresponse()
+                data = response.read()
+            except _STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if not reused:
+                    raise
+                logger.debug(
+                    "Reused connection to %s:%d went stale (%s); reconnecting",
+                    host,
+                    port,
+                    e,
+                )
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            self._release(host, port, conn, not getattr(response, "will_close", True))
+            return HttpResponse(
+                status=response.status, reason=response.reason, body=data
+            )
+
+    def close(self, host: Optional[str] = None, port: Optional[int] = None) -> None:
+        """
+        Close idle connections.
+
+        Args:
+            host: If given together with port, only connections to this
+                endpoint are closed. Otherwise all idle connections are closed.
+            port: See host
+        """
+        with self._lock:
+            if host is not None and port is not None:
+                connections = list(self._idle.pop((host, port), ()))
+            else:
+                connections = [conn for idle in self._idle.values() for conn in idle]
+                self._idle.clear()
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,140 @@
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Mapping, Optional, Union
+
+from intentguard.infrastructure.fs_judgement_cache import FsJudgementCache
+from intentguard.infrastructure.sqlite_judgement_cache import SqliteJudgementCache
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ENV_VAR = "INTENTGUARD_CACHE_BACKEND"
+MAX_SIZE_ENV_VAR = "INTENTGUARD_CACHE_MAX_SIZE"
+MAX_AGE_ENV_VAR = "INTENTGUARD_CACHE_MAX_AGE_DAYS"
+BACKENDS = ("fs", "sqlite")
+SECONDS_PER_DAY = 24 * 60 * 60
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+PersistentJudgementCache = Union[FsJudgementCache, SqliteJudgementCache]
+
+
+@dataclass
+class JudgementCacheConfig:
+    """
+    Configuration of the persistent judgement cache.
+
+    Attributes:
+        backend: "fs" for one file per entry, "sqlite" for a single database
+        max_size: Maximum total size of the entries in bytes, or None for no
+            limit
+        max_age_days: Entries not used for this many days are evicted, or
+            None for no limit
+    """
+
+    backend: str = "fs"
+    max_size: Optional[int] = None
+    max_age_days: Optional[float] = None
+
+    @property
+    def max_age_seconds(self) -> Optional[float]:
+        """The age limit in seconds, or None for no limit."""
+        if self.max_age_days is None:
+            return None
+        return self.max_age_days * SECONDS_PER_DAY
+
+    @property
+    def has_limits(self) -> bool:
+        """Whether a size or age limit is configured."""
+        return self.max_size is not None or self.max_age_days is not None
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size in bytes, with an optional K, M or G suffix (powers of 1024).
+
+    Args:
+        text: The size, e.g. "500M"
+
+    Returns:
+        The size in bytes
+
+    Raises:
+        ValueError: If the text is not a size
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*", text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def load_judgement_cache_config(
+    environ: Optional[Mapping[str, str]] = None,
+) -> JudgementCacheConfig:
+    """
+    Load the cache configuration from the environment.
+
+    Reads INTENTGUARD_CACHE_BACKEND, INTENTGUARD_CACHE_MAX_SIZE (e.g. "500M")
+    and INTENTGUARD_CACHE_MAX_AGE_DAYS.
+
+    Args:
+        environ: Environment variables. Defaults to os.environ.
+
+    Returns:
+        The loaded configuration, with defaults for anything not set
+
+    Raises:
+        ValueError: If a configured value is invalid
+    """
+    environ = os.environ if environ is None else environ
+    config = JudgementCacheConfig()
+    backend = environ.get(BACKEND_ENV_VAR, "").strip().lower()
+    if backend:
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Invalid {BACKEND_ENV_VAR}: {backend!r}, expected one of {BACKENDS}"
+            )
+        config.backend = backend
+    max_size = environ.get(MAX_SIZE_ENV_VAR, "").strip()
+    if max_size:
+        config.max_size = parse_size(max_size)
+    max_age = environ.get(MAX_AGE_ENV_VAR, "").strip()
+    if max_age:
+        config.max_age_days = float(max_age)
+    return config
+
+
+def create_persistent_cache(config: JudgementCacheConfig) -> PersistentJudgementCache:
+    """Create the persistent cache selected by the configuration."""
+    if config.backend == "sqlite":
+        return SqliteJudgementCache()
+    return FsJudgementCache()
+
+
+def prune_in_background(
+    cache: PersistentJudgementCache, config: JudgementCacheConfig
+) -> Optional[threading.Thread]:
+    """
+    Evict entries beyond the configured limits without blocking the caller.
+
+    Args:
+        cache: The cache to prune
+        config: The configuration holding the limits
+
+    Returns:
+        The started thread, or None if no limit is configured
+    """
+    if not config.has_limits:
+        return None
+
+    def prune() -> None:
+        try:
+            cache.prune(config.max_size, config.max_age_seconds)
+        except Exception as e:
+            logger.warning("Failed to prune the judgement cache: %s", e)
+
+    thread = threading.Thread(target=prune, name="intentguard-cache-prune", daemon=True)
+    thread.start()
+    return thread
@@ -1,3 +1,4 @@
+import asyncio
 import http.client
 import json
 import logging
@@ -6,42 +7,100 @@ import subprocess
 import time
 import os
 import hashlib
-import urllib.request
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Set
 import threading
 import atexit
 import socket
 
+from intentguard.app.async_inference_provider import AsyncInferenceProvider
+from intentguard.app.cancellation import CancellationToken
 from intentguard.app.inference_options import InferenceOptions
 from intentguard.app.inference_provider import InferenceProvider
 from intentguard.app.message import Message
 from intentguard.domain.evaluation import Evaluation
+from intentguard.infrastructure.artifact_download import (
+    DEFAULT_CONNECTIONS,
+    artifact_source,
+    download,
+)
+from intentguard.infrastructure.artifact_manifest import (
+    ArtifactManifest,
+    compute_checksum,
+)
+from intentguard.infrastructure.async_http import post_json, post_json_stream
+from intentguard.infrastructure.chat_stream import ChatStream
+from intentguard.infrastructure.evaluation_format import (
+    parse_evaluation_text,
+    response_format,
+)
+from intentguard.infrastructure.http_connection_pool import (
+    DEFAULT_MAX_IDLE_PER_ENDPOINT,
+    HttpConnectionPool,
+    HttpResponse,
+)
+from intentguard.infrastructure.llamafile_config import load_llamafile_options
+from intentguard.infrastructure.llamafile_daemon import DaemonClient, FileLock
+from intentguard.infrastructure.llamafile_options import (
+    CONTEXT_SIZE,
+    LlamafileOptions,
+)
+from intentguard.infrastructure.llamafile_readiness import (
+    ReadinessState,
+    ServerReadiness,
+)
+from intentguard.infrastructure.llamafile_supervisor import (
+    ServerSupervisor,
+    SupervisorMetrics,
+)
+from intentguard.infrastructure.llamafile_tuning import (
+    DEFAULT_CACHE_TYPE,
+    ServerSettings,
+    estimate_context_size,
+    resolve_server_settings,
+)
+from intentguard.infrastructure.logprobs import extract_true_probability
+from intentguard.infrastructure.prompt_text import SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
 # Constants
 STARTUP_TIMEOUT_SECONDS = 120  # 2 minutes
 INFERENCE_TIMEOUT_SECONDS = 300  # 5 minutes
-CONTEXT_SIZE = 32768
 MODEL_FILENAME = "IntentGuard-1-qwen2.5-coder-1.5b.gguf"
 MODEL_NAME = "IntentGuard-1"
 LLAMAFILE_URL = "https://github.com/mozilla-ai/llamafile/releases/download/0.10.0/llamafile-0.10.0"  # URL for llamafile
 LLAMAFILE_SHA256 = "3d0e2757bfc04630d06d03bb5543291d2d9c100767fef059ce5fc3f755300fd0"  # SHA-256 checksum for llamafile
 GGUF_URL = "https://huggingface.co/kdunee/IntentGuard-1-qwen2.5-coder-1.5b-gguf/resolve/main/unsloth.Q4_K_M.gguf"  # URL for the GGUF file
 GGUF_SHA256 = "25a0ef913752216890c58fd49d588fa8cc5dde93f669258d29efd8b704cf16c4"  # SHA-256 checksum for the GGUF file
+TOP_LOGPROBS = 5  # Alternatives reported per token when scoring the verdict
 MAX_RETRY_ATTEMPTS = 3  # Maximum number of retries for handling connection errors
+RETRY_BACKOFF_SECONDS = 0.5  # Delay before the first retry; doubles per attempt
+AUTO_CODE_MARGIN_CHARS = 12288  # Code an auto-sized context fits without a restart
 
 STORAGE_DIR = Path(".intentguard")
+SLOTS_DIR = STORAGE_DIR / "slots"
+LLAMAFILE_PATH = STORAGE_DIR / "llamafile.exe"
+MODEL_PATH = STORAGE_DIR / MODEL_FILENAME
+PROVISION_LOCK_FILE = STORAGE_DIR / "provision.lock"
+SLOTS_LOCK_FILE = STORAGE_DIR / "slots.lock"
 
+# Shared files are written by one Llamafile instance at a time, also when a
+# LlamafilePool starts several in the same process. The lock files extend
+# this to other processes.
+_provision_lock = threading.Lock()
+_slots_lock = threading.Lock()
 
-def compute_checksum(file_path: Path) -> str:
-    """Compute the SHA-256 checksum of a file."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+_RETRYABLE_ERRORS = (
+    socket.timeout,
+    TimeoutError,
+    asyncio.TimeoutError,
+    ConnectionRefusedError,
+    ConnectionError,
+    http.client.HTTPException,
+)
 
 
 def verify_checksum(file_path: Path, expected_sha256: str) -> bool:
@@ -49,35 +108,131 @@ def verify_checksum(file_path: Path, expected_sha256: str) -> bool:
     return compute_checksum(file_path) == expected_sha256
 
 
-def download_file(url: str, target_path: Path, expected_sha256: str):
-    """Download a file and verify its checksum."""
-    logger.info(f"Downloading {url} to {target_path}...")
-
-    # Create parent directories if they don't exist
-    target_path.parent.mkdir(parents=True, exist_ok=True)
+def download_file(
+    url: str,
+    target_path: Path,
+    expected_sha256: str,
+    mirror: Optional[str] = None,
+    connections: int = DEFAULT_CONNECTIONS,
+):
+    """
+    Download a file and verify its checksum.
 
-    # Download the file
-    urllib.request.urlretrieve(url, target_path)
+    Args:
+        url: The upstream URL of the file
+        target_path: Where to store the file
+        expected_sha256: The checksum the file must have
+        mirror: Base URL or local directory to download from instead of url
+        connections: Maximum number of concurrent range requests
 
-    # Verify checksum
-    if not verify_checksum(target_path, expected_sha256):
-        target_path.unlink()  # Delete the file if checksum verification fails
-        raise ValueError(f"Checksum verification failed for {target_path}")
+    Raises:
+        ValueError: If the downloaded file has the wrong checksum
+    """
+    source = artifact_source(url, target_path.name, mirror)
+    download(source, target_path, expected_sha256, connections)
 
-    logger.info(f"Successfully downloaded and verified {target_path}")
 
+def ensure_file(
+    url: str,
+    target_path: Path,
+    expected_sha256: str,
+    force: bool = False,
+    mirror: Optional[str] = None,
+    connections: int = DEFAULT_CONNECTIONS,
+):
+    """
+    Ensure a file exists with the correct checksum.
 
-def ensure_file(url: str, target_path: Path, expected_sha256: str):
-    """Ensure a file exists with the correct checksum."""
+    The file is only hashed if it changed since it was last verified, as
+    recorded in the artifact manifest next to it, or if force is set.
+    Otherwise it is downloaded with download_file.
+    """
     if target_path.exists():
-        if verify_checksum(target_path, expected_sha256):
+        manifest = ArtifactManifest(target_path.parent)
+        if manifest.verify(target_path, expected_sha256, force=force):
             logger.debug(
                 f"{target_path} already exists with correct checksum, skipping download"
             )
             return
         logger.debug(f"{target_path} exists but has incorrect checksum, re-downloading")
         target_path.unlink()
-    download_file(url, target_path, expected_sha256)
+    download_file(url, target_path, expected_sha256, mirror, connections)
+
+
+def provision_artifacts(
+    mirror: Optional[str] = None, connections: int = DEFAULT_CONNECTIONS
+) -> None:
+    """
+    Ensure the server binary and model are present and verified.
+
+    Callers in other threads or processes wait for a download in progress
+    instead of writing to the same files.
+
+    Args:
+        mirror: Base URL or local directory to download from instead of the
+            upstream URLs
+        connections: Maximum number of concurrent range requests
+    """
+    with _provision_lock, FileLock(PROVISION_LOCK_FILE):
+        for url, path, sha256 in (
+            (LLAMAFILE_URL, LLAMAFILE_PATH, LLAMAFILE_SHA256),
+            (GGUF_URL, MODEL_PATH, GGUF_SHA256),
+        ):
+            ensure_file(url, path, sha256, mirror=mirror, connections=connections)
+
+
+def preload_file(file_path: Path) -> None:
+    """
+    Pull a file into the OS page cache ahead of use.
+
+    Where supported, the kernel is asked to read the file asynchronously.
+    Otherwise the file is read sequentially and the data discarded.
+    """
+    with open(file_path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            return
+        buffer = bytearray(1024 * 1024)
+        while f.readinto(buffer):
+            pass
+
+
+def artifact_paths() -> Dict[Path, str]:
+    """Return the paths of the server binary and model with their checksums."""
+    return {
+        LLAMAFILE_PATH: LLAMAFILE_SHA256,
+        MODEL_PATH: GGUF_SHA256,
+    }
+
+
+def verify_artifacts() -> Dict[Path, bool]:
+    """
+    Fully re-verify the checksums of the downloaded artifacts.
+
+    Unlike ensure_file, this always hashes the files, refreshes the artifact
+    manifest and never downloads anything.
+
+    Returns:
+        A mapping from artifact path to whether it exists with the correct
+        checksum
+    """
+    results = {}
+    manifest = ArtifactManifest(STORAGE_DIR)
+    for path, expected_sha256 in artifact_paths().items():
+        results[path] = path.exists() and manifest.verify(
+            path, expected_sha256, force=True
+        )
+    return results
+
+
+def _abort_connection(conn: http.client.HTTPConnection) -> None:
+    """Shut down a connection's socket, failing a request blocked on it."""
+    sock = conn.sock
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
 
 
 def get_free_port():
@@ -91,7 +246,7 @@ def get_free_port():
     return port
 
 
-class Llamafile(InferenceProvider):
+class Llamafile(InferenceProvider, AsyncInferenceProvider):
     """
     Implementation of InferenceProvider using a local Llamafile server.
 
@@ -101,41 +256,258 @@ class Llamafile(InferenceProvider):
 
     The server is lazily initialized when the first inference is requested,
     and listens on a dynamically assigned port on localhost. Requests are made
-    using the OpenAI-compatible chat completions API.
+    using the OpenAI-compatible chat completions API, either with blocking
+    sockets through predict() or on the asyncio event loop through
+    predict_async().
 
     The GGUF model weights and server binary are downloaded on-demand when the
     first inference is requested, if they are not already present in the
     infrastructure directory.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        options: Optional[LlamafileOptions] = None,
+        cpu_set: Optional[Set[int]] = None,
+    ):
         """
         Initialize the Llamafile provider.
 
         The actual server process and required files are initialized lazily
         when the first prediction is requested. This constructor only sets up
         the basic instance attributes and threading lock.
+
+        Args:
+            options: Server configuration. If None, options are loaded from
+                the `[tool.intentguard.llamafile]` table of pyproject.toml and
+                from INTENTGUARD_LLAMAFILE_* environment variables.
+            cpu_set: CPUs to pin the server process to. Only supported on
+                Linux; ignored with a warning elsewhere.
         """
-        self._process = None
-        self._port = None
+        self.options: LlamafileOptions = options or load_llamafile_options()
+        self.cpu_set = cpu_set
+        self._process: Optional[subprocess.Popen] = None
+        self._daemon: Optional[DaemonClient] = (
+            DaemonClient() if self.options.daemon else None
+        )
+        self._attached = False
+        self._port: Optional[int] = None
+        self._settings: Optional[ServerSettings] = None
+        # Largest per-slot context requested so far; only grows, so a restart
+        # after an error never shrinks the context again.
+        self._min_context_size = 0
         self._process_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_lock = threading.Lock()
+        self._supervisor = ServerSupervisor(self)
+        self._readiness = ServerReadiness()
+        # Cancellation token of the predict_cancellable() call on each thread
+        self._cancellation = threading.local()
+        self._connection_pool = HttpConnectionPool(
+            max_idle_per_endpoint=max(
+                DEFAULT_MAX_IDLE_PER_ENDPOINT, self.options.parallel_slots
+            )
+        )
         atexit.register(self.shutdown)
 
     def shutdown(self):
-        """Shutdown the Llamafile server process in a thread-safe manner."""
+        """
+        Shutdown the Llamafile server process in a thread-safe manner.
+
+        In daemon mode, the shared server is left running; this instance only
+        detaches from it.
+        """
+        self._supervisor.stop()
         with self._process_lock:
-            if self._process is not None:
-                try:
-                    if self._process.poll() is None:  # process is still running
-                        self._process.kill()
-                        logger.debug("Killed llamafile server process")
-                except Exception as e:
-                    logger.warning("Failed to kill llamafile server process: %s", e)
+            self._stop_process()
 
-                self._process = None
-                self._port = None
+    def _stop_process(self) -> None:
+        """Kill the server process. The caller must hold the process lock."""
+        if self._attached or self._process is not None:
+            self._supervisor.server_stopped()
+        if self._attached:
+            assert self._daemon is not None
+            self._daemon.detach()
+            self._attached = False
+            self._port = None
+            self._settings = None
+        self._readiness.reset()
+        if self._process is not None:
+            try:
+                if self._process.poll() is None:  # process is still running
+                    self._process.kill()
+                    logger.debug("Killed llamafile server process")
+            except Exception as e:
+                logger.warning("Failed to kill llamafile server process: %s", e)
+
+            self._process = None
+            self._port = None
+            self._settings = None
+        self._connection_pool.close()
+
+    @property
+    def server_state(self) -> ReadinessState:
+        """The startup phase of the server: stopped, starting, loading or ready."""
+        return self._readiness.state
+
+    @property
+    def metrics(self) -> SupervisorMetrics:
+        """Restart counts, downtime and other counters of the server supervisor."""
+        return self._supervisor.metrics
+
+    def model_id(self) -> str:
+        """The checksum of the GGUF model weights."""
+        return GGUF_SHA256
+
+    def warmup(self, prime: bool = True) -> None:
+        """
+        Start the server on a background thread, ahead of the first request.
+
+        The warm-up thread reads the model into the page cache, downloads and
+        verifies missing artifacts, and boots the server. Requests made in the
+        meantime wait only for the remaining startup work. Calling this again
+        while a warm-up is running, or after the server is up, does nothing.
 
-    def _ensure_process(self):
+        Args:
+            prime: Also evaluate the system prompt once, so the first real
+                request finds it in the KV cache. With prompt_cache enabled the
+                slots are primed during startup anyway.
+        """
+        with self._warmup_lock:
+            if self._is_running() or (
+                self._warmup_thread is not None and self._warmup_thread.is_alive()
+            ):
+                return
+            self._warmup_thread = threading.Thread(
+                target=self._warmup,
+                args=(prime,),
+                name="intentguard-llamafile-warmup",
+                daemon=True,
+            )
+            self._warmup_thread.start()
+
+    def _warmup(self, prime: bool) -> None:
+        """Body of the warm-up thread. Errors are left for the first request."""
+        try:
+            if MODEL_PATH.exists():
+                preload_file(MODEL_PATH)
+            self._ensure_process(self._initial_context_size())
+            if prime and not self.options.prompt_cache:
+                self._send_http_request(self._priming_payload(0))
+            logger.info("Llamafile warm-up finished")
+        except Exception as e:
+            logger.warning("Llamafile warm-up failed: %s", e)
+
+    def _build_command(
+        self,
+        llamafile_path: Path,
+        model_path: Path,
+        settings: Optional[ServerSettings] = None,
+    ) -> List[str]:
+        """
+        Build the command line used to start the Llamafile server.
+
+        With more than one parallel slot, the total context is multiplied by
+        the slot count so that every slot keeps the configured context size,
+        and continuous batching is enabled so concurrent requests are decoded
+        together. With prompt caching, slot snapshots are stored in SLOTS_DIR.
+
+        Args:
+            llamafile_path: Path to the llamafile executable
+            model_path: Path to the GGUF model weights
+            settings: Resolved server settings. Resolved from the options if
+                None.
+
+        Returns:
+            The command as a list of arguments, without the platform-specific
+            shell prefix
+        """
+        if settings is None:
+            settings = resolve_server_settings(
+                self.options, model_path, self._min_context_size
+            )
+        parallel_slots = settings.parallel_slots
+        command = [
+            str(llamafile_path),
+            "--server",
+            "-m",
+            str(model_path),
+            "-c",
+            str(settings.context_size * parallel_slots),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(self._port),
+            "--threads",
+            str(settings.threads),
+        ]
+        if parallel_slots > 1:
+            command.extend(["--parallel", str(parallel_slots), "--cont-batching"])
+        if settings.batch_size is not None:
+            command.extend(["--batch-size", str(settings.batch_size)])
+        if settings.cache_type_k != DEFAULT_CACHE_TYPE:
+            command.extend(["--cache-type-k", settings.cache_type_k])
+        if settings.cache_type_v != DEFAULT_CACHE_TYPE:
+            command.extend(["--cache-type-v", settings.cache_type_v])
+        if settings.flash_attention:
+            command.extend(["--flash-attn", "on"])
+        if settings.mlock:
+            command.append("--mlock")
+        if not settings.mmap:
+            command.append("--no-mmap")
+        if self.options.prompt_cache:
+            command.extend(["--slot-save-path", str(SLOTS_DIR.resolve())])
+        return command
+
+    def _required_context_size(self, prompt: List[Message]) -> int:
+        """
+        Estimate the per-slot context a prompt needs.
+
+        Only relevant when the context size is tuned automatically. Returns 0
+        when it is configured explicitly. The estimate leaves room for at
+        least AUTO_CODE_MARGIN_CHARS of code next to the system prompt, so
+        most prompts fit the first server and it is rarely restarted. A shared
+        daemon always gets CONTEXT_SIZE, since restarting it would disrupt the
+        other processes using it.
+        """
+        if self.options.context_size is not None:
+            return 0
+        if self._daemon is not None:
+            return CONTEXT_SIZE
+        prompt_chars = sum(len(message.content) for message in prompt)
+        return estimate_context_size(
+            max(prompt_chars, len(SYSTEM_PROMPT) + AUTO_CODE_MARGIN_CHARS)
+        )
+
+    def _initial_context_size(self) -> int:
+        """
+        The per-slot context to start a server with before any prompt is known.
+
+        This is what a prompt with little code needs, so the first request
+        does not restart a server started by warmup(). A daemon gets
+        CONTEXT_SIZE.
+        """
+        return self._required_context_size([])
+
+    def _is_running(self, min_context_size: int = 0) -> bool:
+        """
+        Check whether a server is up with at least the given per-slot context.
+
+        An attached daemon is shared with other processes, so it counts as
+        running whatever its context; it is sized up front instead.
+        """
+        if self._attached:
+            return True
+        settings = self._settings
+        return (
+            self._process is not None
+            and settings is not None
+            and settings.context_size >= min_context_size
+        )
+
+    def _ensure_process(
+        self, min_context_size: int = 0, own_requests: Optional[int] = None
+    ):
         """
         Ensure the Llamafile server process is running.
 
@@ -143,38 +515,66 @@ class Llamafile(InferenceProvider):
         if it hasn't been started yet. This method is thread-safe and handles
         concurrent initialization attempts.
 
+        Args:
+            min_context_size: The per-slot context the caller's prompt needs.
+                With an automatically sized context, a running server with a
+                smaller context is restarted with a larger one, once the
+                requests in flight on it have finished.
+            own_requests: Number of requests in flight on behalf of the
+                caller, which are not waited for before a restart. Defaults
+                to those of the calling thread.
+
         Raises:
             Exception: If the server fails to start, if file downloads
                 or verification fail.
         """
-        if self._process is not None:
+        if self._is_running(min_context_size):
             return
+        if self._process is not None:
+            # Restarting for a larger context would abort the requests in
+            # flight, so new requests are held back until those have finished.
+            with self._supervisor.exclusive(INFERENCE_TIMEOUT_SECONDS, own_requests):
+                self._start_process(min_context_size)
+        else:
+            self._start_process(min_context_size)
 
+    def _start_process(self, min_context_size: int) -> None:
+        """Start or restart the server, or attach to the daemon, under the lock."""
         with self._process_lock:
-            if self._process is not None:
+            if self._is_running(min_context_size):
+                return
+            if min_context_size > self._min_context_size:
+                self._min_context_size = min_context_size
+            start_time = time.monotonic()
+            if self._daemon is not None:
+                self._attach_daemon()
+                self._supervisor.server_started(time.monotonic() - start_time)
+                self._supervisor.start()
                 return
+            if self._process is not None:
+                logger.info(
+                    "Restarting llamafile server with a %d-token context per slot",
+                    self._min_context_size,
+                )
+                self._stop_process()
 
-            model_path = STORAGE_DIR.joinpath(MODEL_FILENAME)
-            llamafile_path = STORAGE_DIR.joinpath("llamafile.exe")
+            model_path = MODEL_PATH
+            llamafile_path = LLAMAFILE_PATH
 
-            ensure_file(LLAMAFILE_URL, llamafile_path, LLAMAFILE_SHA256)
-            ensure_file(GGUF_URL, model_path, GGUF_SHA256)
+            provision_artifacts(
+                self.options.artifact_mirror, self.options.download_connections
+            )
 
             # Get a free port and use it directly
             self._port = get_free_port()
 
-            command = [
-                str(llamafile_path),
-                "--server",
-                "-m",
-                str(model_path),
-                "-c",
-                str(CONTEXT_SIZE),
-                "--host",
-                "127.0.0.1",
-                "--port",
-                str(self._port),
-            ]
+            if self.options.prompt_cache:
+                SLOTS_DIR.mkdir(parents=True, exist_ok=True)
+
+            settings = resolve_server_settings(
+                self.options, model_path, self._min_context_size
+            )
+            command = self._build_command(llamafile_path, model_path, settings)
 
             system = platform.system()
             if system != "Windows":
@@ -186,167 +586,622 @@ class Llamafile(InferenceProvider):
                 command.insert(0, "sh")
 
             # Start the process with stdout/stderr redirected to devnull
-            self._process = subprocess.Popen(
+            process = subprocess.Popen(
                 command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
             )
+            if self.cpu_set:
+                self._pin_process(process)
 
-            # Give the server a moment to start
-            start_time = time.time()
-            while time.time() - start_time < STARTUP_TIMEOUT_SECONDS:
-                # Check if the process is still running
-                if self._process.poll() is not None:
-                    status = self._process.poll()
-                    logger.error(
-                        "Llamafile server failed to start with status %d", status
-                    )
-                    raise Exception(f"llamafile exited with status {status}")
+            # Probe the health endpoint until the model has loaded
+            self._readiness.reset(ReadinessState.STARTING)
+            try:
+                self._readiness.wait_ready(self._port, process, STARTUP_TIMEOUT_SECONDS)
+            except Exception:
+                if process.poll() is None:
+                    process.kill()
+                self._port = None
+                raise
 
-                # Try to connect to the server to verify it's ready
-                try:
-                    with socket.create_connection(("127.0.0.1", self._port), timeout=1):
-                        logger.info(
-                            "Llamafile server started successfully on port %d",
-                            self._port,
-                        )
-                        return
-                except (socket.timeout, ConnectionRefusedError):
-                    # Wait a bit before trying again
-                    time.sleep(1)
+            self._settings = settings
+            if self.options.prompt_cache:
+                self._prepare_slots()
 
-            # If we get here, the server didn't start within the timeout
-            self._process.kill()
-            self._process = None
-            self._port = None
-            raise Exception(
-                f"Llamafile server failed to start within {STARTUP_TIMEOUT_SECONDS} seconds"
+            # Publish the process only once it accepts requests, so callers
+            # that skip the lock never talk to a server that is still booting.
+            self._process = process
+            self._supervisor.server_started(time.monotonic() - start_time)
+            self._supervisor.start()
+
+    def _pin_process(self, process: subprocess.Popen) -> None:
+        """
+        Restrict the server process to self.cpu_set.
+
+        The shell execs the llamafile in place, and the server creates its
+        worker threads only after loading the model, so they all inherit the
+        affinity set here.
+        """
+        assert self.cpu_set is not None
+        if not hasattr(os, "sched_setaffinity"):
+            logger.warning("CPU pinning is not supported on %s", platform.system())
+            return
+        try:
+            os.sched_setaffinity(process.pid, self.cpu_set)
+            logger.debug("Pinned llamafile server to CPUs %s", sorted(self.cpu_set))
+        except OSError as e:
+            logger.warning("Failed to pin llamafile server to CPUs: %s", e)
+
+    def _discard_exited_process(self) -> bool:
+        """
+        Forget the server process if it has exited, e.g. after a crash.
+
+        The next request, or warmup(), then starts a new one. Never waits for
+        the process lock: a server that is being started or restarted is left
+        to the thread doing so.
+
+        Returns:
+            True if an exited process was discarded
+        """
+        process = self._process
+        if process is None or process.poll() is None:
+            return False
+        if not self._process_lock.acquire(blocking=False):
+            return False
+        try:
+            process = self._process
+            if process is None or process.poll() is None:
+                return False
+            logger.warning(
+                "Llamafile server on port %s exited with status %s",
+                self._port,
+                process.poll(),
             )
+            self._stop_process()
+            return True
+        finally:
+            self._process_lock.release()
 
-    def _send_http_request(self, payload: dict) -> dict:
+    def _attach_daemon(self) -> None:
+        """Attach to the shared daemon. The caller must hold the process lock."""
+        assert self._daemon is not None
+        if self._attached:
+            self._stop_process()
+        state = self._daemon.attach(
+            self.options, max(self._min_context_size, self._initial_context_size())
+        )
+        self._port = state.port
+        self._settings = ServerSettings(**state.settings)
+        self._attached = True
+        self._readiness.reset(ReadinessState.STARTING)
+        self._readiness.wait_ready(state.port, None, STARTUP_TIMEOUT_SECONDS)
+
+    @staticmethod
+    def _is_loading(response: HttpResponse, load_wait_start: float) -> bool:
         """
-        Sends an HTTP request to the Llamafile server with the given payload
-        and returns the parsed JSON response.
+        Check whether a response means the model is still loading.
 
         Llamafile 0.10.x may accept socket connections before the model has
-        finished loading, returning HTTP 503 "Loading model" responses. In that
-        case, we wait briefly and retry without restarting the process.
+        finished loading, returning HTTP 503 "Loading model" responses. Such
+        responses are worth retrying until STARTUP_TIMEOUT_SECONDS have passed,
+        once _wait_until_loaded() returns.
+        """
+        if (
+            response.status == 503
+            and b"Loading model" in response.body
+            and time.time() - load_wait_start < STARTUP_TIMEOUT_SECONDS
+        ):
+            logger.debug("Llamafile is still loading the model; retrying request")
+            return True
+        return False
+
+    def _wait_until_loaded(self, port: int, load_wait_start: float) -> None:
+        """
+        Block after a "Loading model" response until the model has loaded.
+
+        Waits on the readiness state machine, which probes the health endpoint
+        with a short backoff, instead of sleeping between full requests.
+
+        Raises:
+            ServerStartupError: If the model has not loaded by the end of
+                STARTUP_TIMEOUT_SECONDS from load_wait_start
+        """
+        self._readiness.mark_loading()
+        remaining = STARTUP_TIMEOUT_SECONDS - (time.time() - load_wait_start)
+        self._readiness.wait_ready(port, None, max(remaining, 0))
+
+    @staticmethod
+    def _parse_http_response(response: HttpResponse) -> dict:
+        """
+        Parse a chat completions response from the Llamafile server.
+
+        Raises:
+            Exception: If the server returned an error or no choices
+        """
+        if response.status == 200:
+            json_response = json.loads(response.body)
+            if not json_response.get("choices"):
+                error_msg = f"Llamafile API returned no choices: {json_response}"
+                logger.error(error_msg)
+                raise Exception(error_msg)
+            return json_response
+
+        response_text = response.body.decode(errors="replace")
+        error_msg = (
+            f"Llamafile API error: {response.status} {response.reason} {response_text}"
+        )
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
+    def _post_json(
+        self, path: str, payload: dict, timeout: float = INFERENCE_TIMEOUT_SECONDS
+    ) -> HttpResponse:
+        """
+        POST a JSON payload to the Llamafile server and return the raw response.
+
+        Requests go over persistent keep-alive connections from the provider's
+        connection pool, so repeated votes do not pay for a new TCP handshake.
+        While the model is loading, the request is retried without restarting
+        the process.
         """
         load_wait_start = time.time()
 
         while True:
-            conn = http.client.HTTPConnection(
-                "127.0.0.1", self._port, timeout=INFERENCE_TIMEOUT_SECONDS
-            )
-            try:
+            port = self._port
+            if port is None:
+                raise ConnectionError("Llamafile server is not running")
+            if self._current_cancellation() is None:
+                response = self._connection_pool.request(
+                    "127.0.0.1",
+                    port,
+                    "POST",
+                    path,
+                    body=json.dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+            else:
+                response = self._post_json_cancellable(port, path, payload, timeout)
+            if not self._is_loading(response, load_wait_start):
+                return response
+            self._wait_until_loaded(port, load_wait_start)
+
+    def _post_json_cancellable(
+        self, port: int, path: str, payload: dict, timeout: float
+    ) -> HttpResponse:
+        """
+        POST a JSON payload over a dedicated connection that is shut down if the
+        current request is cancelled.
+        """
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        try:
+            with self._abort_on_cancel(conn):
                 conn.request(
                     "POST",
-                    "/v1/chat/completions",
+                    path,
                     body=json.dumps(payload),
                     headers={"Content-Type": "application/json"},
                 )
                 response = conn.getresponse()
-                data = response.read()
+                return HttpResponse(
+                    status=response.status, reason=response.reason, body=response.read()
+                )
+        finally:
+            conn.close()
+
+    def _current_cancellation(self) -> Optional[CancellationToken]:
+        """The cancellation token of the request running on this thread."""
+        return getattr(self._cancellation, "token", None)
+
+    @contextmanager
+    def _abort_on_cancel(self, conn: http.client.HTTPConnection) -> Iterator[None]:
+        """
+        Shut down the connection if the current request is cancelled meanwhile.
+
+        The server notices the closed connection and stops generating.
+        """
+        cancellation = self._current_cancellation()
+        if cancellation is None:
+            yield
+            return
+        conn.connect()
+        unregister = cancellation.register(lambda: _abort_connection(conn))
+        try:
+            yield
+        finally:
+            unregister()
+
+    def _send_http_request(self, payload: dict) -> dict:
+        """
+        Sends a chat completions request to the Llamafile server with the given
+        payload and returns the parsed JSON response.
+        """
+        response = self._post_json("/v1/chat/completions", payload)
+        return self._parse_http_response(response)
+
+    def _stream_http_request(self, payload: dict) -> dict:
+        """
+        Streaming counterpart of _send_http_request().
+
+        Reads the response as server-sent events and closes the connection as
+        soon as the verdict is complete, so the server stops generating tokens
+        nobody will read. Returns the same shape as a non-streamed response.
+        """
+        load_wait_start = time.time()
+
+        while True:
+            port = self._port
+            if port is None:
+                raise ConnectionError("Llamafile server is not running")
+            # A dedicated connection: it is dropped mid-response, so it can
+            # never go back to the keep-alive pool.
+            conn = http.client.HTTPConnection(
+                "127.0.0.1", port, timeout=INFERENCE_TIMEOUT_SECONDS
+            )
+            try:
+                with self._abort_on_cancel(conn):
+                    conn.request(
+                        "POST",
+                        "/v1/chat/completions",
+                        body=json.dumps(payload),
+                        headers={"Content-Type": "application/json"},
+                    )
+                    response = conn.getresponse()
+                    if response.status != 200:
+                        error = HttpResponse(
+                            status=response.status,
+                            reason=response.reason,
+                            body=response.read(),
+                        )
+                        if self._is_loading(error, load_wait_start):
+                            self._wait_until_loaded(port, load_wait_start)
+                            continue
+                        return self._parse_http_response(error)
+
+                    stream = ChatStream()
+                    for line in response:
+                        if stream.feed_line(line):
+                            break
             finally:
                 conn.close()
+            return stream.to_response()
+
+    async def _stream_http_request_async(self, payload: dict) -> dict:
+        """Asynchronous counterpart of _stream_http_request()."""
+        load_wait_start = time.time()
 
+        while True:
+            port = self._port
+            if port is None:
+                raise ConnectionError("Llamafile server is not running")
+            stream = ChatStream()
+            response = await post_json_stream(
+                "127.0.0.1",
+                port,
+                "/v1/chat/completions",
+                json.dumps(payload).encode("utf-8"),
+                INFERENCE_TIMEOUT_SECONDS,
+                stream.feed_line,
+            )
             if response.status == 200:
-                json_response = json.loads(data)
-                if not json_response.get("choices"):
-                    error_msg = f"Llamafile API returned no choices: {json_response}"
-                    logger.error(error_msg)
-                    raise Exception(error_msg)
-                return json_response
-
-            response_text = data.decode(errors="replace")
-            if (
-                response.status == 503
-                and "Loading model" in response_text
-                and time.time() - load_wait_start < STARTUP_TIMEOUT_SECONDS
-            ):
-                logger.debug("Llamafile is still loading the model; retrying request")
-                time.sleep(1)
-                continue
+                return stream.to_response()
+            if not self._is_loading(response, load_wait_start):
+                return self._parse_http_response(response)
+            await asyncio.to_thread(self._wait_until_loaded, port, load_wait_start)
 
-            error_msg = f"Llamafile API error: {response.status} {response.reason} {response_text}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
+    async def _send_http_request_async(self, payload: dict) -> dict:
+        """
+        Asynchronous counterpart of _send_http_request().
 
-    def predict(
-        self, prompt: List[Message], inference_options: InferenceOptions
-    ) -> Evaluation:
+        Uses non-blocking asyncio streams, so waiting for the server does not
+        occupy a thread. The same 503 "Loading model" handling applies.
         """
-        Generate a prediction using the Llamafile server.
+        load_wait_start = time.time()
+
+        while True:
+            port = self._port
+            if port is None:
+                raise ConnectionError("Llamafile server is not running")
+            response = await post_json(
+                "127.0.0.1",
+                port,
+                "/v1/chat/completions",
+                json.dumps(payload).encode("utf-8"),
+                INFERENCE_TIMEOUT_SECONDS,
+            )
+            if not self._is_loading(response, load_wait_start):
+                return self._parse_http_response(response)
+            await asyncio.to_thread(self._wait_until_loaded, port, load_wait_start)
+
+    def _slot_snapshot_name(self, slot_id: int) -> str:
+        """
+        Build the snapshot file name for a slot primed with the system prompt.
+
+        The name embeds a digest of everything the cached KV state depends on,
+        so snapshots from another model, server version, context size, KV
+        cache type or system prompt are never restored.
+        """
+        settings = self._settings
+        fingerprint = "\0".join(
+            [
+                GGUF_SHA256,
+                LLAMAFILE_SHA256,
+                str(settings.context_size if settings else self.options.context_size),
+                str(settings.cache_type_k if settings else self.options.cache_type_k),
+                str(settings.cache_type_v if settings else self.options.cache_type_v),
+                SYSTEM_PROMPT,
+            ]
+        )
+        digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+        return f"system-prompt-{digest}-slot{slot_id}.bin"
+
+    @staticmethod
+    def _priming_payload(slot_id: int) -> dict:
+        """Build a one-token request that only evaluates the system prompt."""
+        return {
+            "model": MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": ""},
+            ],
+            "max_tokens": 1,
+            "temperature": 0.0,
+            "cache_prompt": True,
+            "id_slot": slot_id,
+        }
 
-        If a timeout occurs, the method will retry up to MAX_RETRY_ATTEMPTS times,
-        restarting the server process between attempts.
+    def _prepare_slots(self) -> None:
         """
+        Load the shared system prompt into the KV cache of every server slot.
+
+        Each slot is first restored from its on-disk snapshot in SLOTS_DIR. If
+        there is no usable snapshot, the slot is primed with a one-token request
+        that contains only the system prompt, and its KV state is saved for the
+        next server start. Later requests that share the system prompt reuse
+        the cached prefix instead of evaluating it again.
+
+        Failures are logged and otherwise ignored, since prompt caching is an
+        optimization only.
+        """
+        for slot_id in range(max(1, self.options.parallel_slots)):
+            filename = self._slot_snapshot_name(slot_id)
+            try:
+                # Other servers share the snapshot files, so they are never
+                # read while another server writes them.
+                with _slots_lock, FileLock(SLOTS_LOCK_FILE):
+                    restore = self._post_json(
+                        f"/slots/{slot_id}?action=restore", {"filename": filename}
+                    )
+                if restore.status == 200:
+                    logger.debug("Restored slot %d from %s", slot_id, filename)
+                    continue
+
+                self._send_http_request(self._priming_payload(slot_id))
+                with _slots_lock, FileLock(SLOTS_LOCK_FILE):
+                    save = self._post_json(
+                        f"/slots/{slot_id}?action=save", {"filename": filename}
+                    )
+                if save.status == 200:
+                    logger.debug("Primed slot %d and saved it to %s", slot_id, filename)
+                else:
+                    logger.debug(
+                        "Primed slot %d but could not save it: %d %s",
+                        slot_id,
+                        save.status,
+                        save.body.decode(errors="replace"),
+                    )
+            except Exception as e:
+                logger.warning("Failed to prepare slot %d: %s", slot_id, e)
+
+    def _build_payload(
+        self, prompt: List[Message], inference_options: InferenceOptions
+    ) -> dict:
+        """Build the chat completions request payload for a prompt."""
         messages = [{"role": m.role, "content": m.content} for m in prompt]
         payload = {
             "model": MODEL_NAME,
             "messages": messages,
             "temperature": inference_options.temperature,
         }
+        if self.options.prompt_cache:
+            payload["cache_prompt"] = True
+        if self.options.constrained_decoding:
+            payload["response_format"] = response_format(
+                inference_options.verdict_first
+            )
+        if inference_options.max_tokens is not None:
+            payload["max_tokens"] = inference_options.max_tokens
+        if inference_options.verdict_first:
+            # Stream so the connection can be dropped once the verdict is known.
+            payload["stream"] = True
+        if inference_options.logprobs:
+            payload["logprobs"] = True
+            payload["top_logprobs"] = TOP_LOGPROBS
+        return payload
 
-        attempts = 0
-        last_error = None
+    @staticmethod
+    def _parse_evaluation(json_response: dict) -> Evaluation:
+        """
+        Parse the model's JSON answer from a chat completions response.
 
-        while attempts < MAX_RETRY_ATTEMPTS:
-            attempts += 1
-            try:
-                self._ensure_process()
-                logger.debug(
-                    f"Attempt {attempts}/{MAX_RETRY_ATTEMPTS}: Preparing prediction request with temperature {inference_options.temperature:.2f}"
-                )
+        When the response carries token log-probabilities, the probability
+        that the result is true is added to the evaluation's metadata.
 
-                json_response = self._send_http_request(payload)
-                generated_text = json_response["choices"][0]["message"]["content"]
-                if generated_text.endswith("<|eot_id|>"):
-                    generated_text = generated_text[: -len("<|eot_id|>")]
-
-                # Fix common JSON parsing issues
-                generated_text = (
-                    generated_text.replace('"""', '\\"\\"\\"')
-                    .replace('\\\\"\\"\\"', '\\"\\"\\"')
-                    .replace('\\\\"', '\\"')
-                    .replace('["', '[\\"')
-                    .replace('"]', '\\"]')
-                )
+        Malformed or truncated JSON is repaired where possible, so a usable
+        verdict is not thrown away and paid for again.
+
+        Raises:
+            Exception: If no verdict can be recovered from the generated text
+        """
+        generated_text = json_response["choices"][0]["message"]["content"]
+
+        try:
+            evaluation = parse_evaluation_text(generated_text)
+        except ValueError as e:
+            error_msg = f"Could not parse Llamafile response: {generated_text}"
+            logger.error(error_msg)
+            raise Exception(error_msg) from e
+
+        logprobs = json_response["choices"][0].get("logprobs") or {}
+        if logprobs.get("content"):
+            true_probability = extract_true_probability(logprobs["content"])
+            if true_probability is not None:
+                evaluation.metadata["true_probability"] = true_probability
+        return evaluation
+
+    def predict(
+        self, prompt: List[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        """
+        Generate a prediction using the Llamafile server.
+
+        If a timeout or connection error occurs, the method will retry up to
+        MAX_RETRY_ATTEMPTS times with exponential backoff. The server is
+        restarted between attempts only if the supervisor finds it dead or hung.
+        """
+        with self._supervisor.track_request():
+            payload = self._build_payload(prompt, inference_options)
+            min_context_size = self._required_context_size(prompt)
+
+            attempts = 0
+            last_error = None
 
+            while attempts < MAX_RETRY_ATTEMPTS:
+                attempts += 1
                 try:
-                    llm_response = json.loads(generated_text)
-                    return Evaluation(
-                        result=llm_response["result"],
-                        explanation=llm_response["explanation"],
+                    self._ensure_process(min_context_size)
+                    logger.debug(
+                        f"Attempt {attempts}/{MAX_RETRY_ATTEMPTS}: Preparing prediction request with temperature {inference_options.temperature:.2f}"
                     )
-                except json.JSONDecodeError as e:
-                    error_msg = f"Could not parse Llamafile response: {generated_text}"
-                    logger.error(error_msg)
-                    raise Exception(error_msg) from e
-
-            except (
-                socket.timeout,
-                TimeoutError,
-                ConnectionRefusedError,
-                ConnectionError,
-                http.client.HTTPException,
-            ) as e:
-                last_error = e
-                logger.warning(
-                    f"Error occurred during attempt {attempts}/{MAX_RETRY_ATTEMPTS}: {e}"
-                )
-                if attempts < MAX_RETRY_ATTEMPTS:
-                    logger.info("Restarting llamafile process and retrying...")
-                    self.shutdown()  # Kill the existing process
-                else:
-                    logger.error(
-                        f"Failed after {MAX_RETRY_ATTEMPTS} attempts due to timeouts"
+
+                    if payload.get("stream"):
+                        json_response = self._stream_http_request(payload)
+                    else:
+                        json_response = self._send_http_request(payload)
+                    return self._parse_evaluation(json_response)
+
+                except _RETRYABLE_ERRORS as e:
+                    self._raise_if_cancelled(e)
+                    last_error = e
+                    self._handle_retryable_error(attempts, e)
+                except Exception as e:
+                    self._raise_if_cancelled(e)
+                    logger.error(f"Error during prediction: {e}")
+                    raise
+
+            raise Exception(
+                f"Llamafile request failed after {MAX_RETRY_ATTEMPTS} attempts"
+            ) from last_error
+
+    def predict_cancellable(
+        self,
+        prompt: List[Message],
+        inference_options: InferenceOptions,
+        cancellation: CancellationToken,
+    ) -> Evaluation:
+        """
+        Generate a prediction that is aborted once the token is cancelled.
+
+        The request goes over a dedicated connection, which is shut down on
+        cancellation so the server stops generating. It is not retried.
+
+        Raises:
+            CancelledError: If the token is cancelled before the prediction
+                completes
+        """
+        if cancellation.cancelled:
+            raise CancelledError()
+        self._cancellation.token = cancellation
+        try:
+            return self.predict(prompt, inference_options)
+        finally:
+            self._cancellation.token = None
+
+    def _raise_if_cancelled(self, error: BaseException) -> None:
+        """Turn an error caused by aborting a cancelled request into CancelledError."""
+        cancellation = self._current_cancellation()
+        if cancellation is not None and cancellation.cancelled:
+            logger.debug("Prediction cancelled: %s", error)
+            raise CancelledError() from error
+
+    async def predict_async(
+        self, prompt: List[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        """
+        Generate a prediction using the Llamafile server without blocking the event loop.
+
+        Server startup runs in a worker thread; the request itself uses
+        non-blocking sockets. Retry behaviour matches predict().
+        """
+        async with self._supervisor.track_request_async():
+            payload = self._build_payload(prompt, inference_options)
+            min_context_size = self._required_context_size(prompt)
+
+            attempts = 0
+            last_error = None
+
+            while attempts < MAX_RETRY_ATTEMPTS:
+                attempts += 1
+                try:
+                    if not self._is_running(min_context_size):
+                        # This request is in flight, but not on the worker thread
+                        await asyncio.to_thread(
+                            self._ensure_process, min_context_size, 1
+                        )
+                    logger.debug(
+                        f"Attempt {attempts}/{MAX_RETRY_ATTEMPTS}: Preparing async prediction request with temperature {inference_options.temperature:.2f}"
                     )
-                    raise Exception(
-                        f"Llamafile request failed after {MAX_RETRY_ATTEMPTS} attempts"
-                    ) from last_error
-            except Exception as e:
-                logger.error(f"Error during prediction: {e}")
-                raise
 
-        raise Exception(
-            f"Llamafile request failed after {MAX_RETRY_ATTEMPTS} attempts"
-        ) from last_error
+                    if payload.get("stream"):
+                        json_response = await self._stream_http_request_async(payload)
+                    else:
+                        json_response = await self._send_http_request_async(payload)
+                    return self._parse_evaluation(json_response)
+
+                except _RETRYABLE_ERRORS as e:
+                    last_error = e
+                    await self._handle_retryable_error_async(attempts, e)
+                except Exception as e:
+                    logger.error(f"Error during prediction: {e}")
+                    raise
+
+            raise Exception(
+                f"Llamafile request failed after {MAX_RETRY_ATTEMPTS} attempts"
+            ) from last_error
+
+    def _give_up_if_last_attempt(self, attempts: int, error: BaseException) -> None:
+        """
+        Log a retryable error, and give up after the last attempt.
+
+        Raises:
+            Exception: If this was the last allowed attempt
+        """
+        logger.warning(
+            f"Error occurred during attempt {attempts}/{MAX_RETRY_ATTEMPTS}: {error}"
+        )
+        if attempts >= MAX_RETRY_ATTEMPTS:
+            logger.error(f"Failed after {MAX_RETRY_ATTEMPTS} attempts due to timeouts")
+            raise Exception(
+                f"Llamafile request failed after {MAX_RETRY_ATTEMPTS} attempts"
+            ) from error
+
+    def _handle_retryable_error(self, attempts: int, error: BaseException) -> None:
+        """
+        Prepare to retry a request after a connection error or timeout.
+
+        The supervisor checks the server and restarts it only if it has died
+        or hung, so other requests on a healthy server are not interrupted.
+        The retry then waits with exponential backoff.
+
+        Raises:
+            Exception: If this was the last allowed attempt
+        """
+        self._give_up_if_last_attempt(attempts, error)
+        self._supervisor.report_failure(error)
+        time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+    async def _handle_retryable_error_async(
+        self, attempts: int, error: BaseException
+    ) -> None:
+        """Asynchronous counterpart of _handle_retryable_error()."""
+        self._give_up_if_last_attempt(attempts, error)
+        await asyncio.to_thread(self._supervisor.report_failure, error)
+        await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
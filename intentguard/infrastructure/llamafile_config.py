@@ -0,0 +1,137 @@
+import logging
+import os
+import sys
+import typing
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from intentguard.infrastructure.llamafile_options import LlamafileOptions
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:  # pragma: no cover - depends on the Python version
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "INTENTGUARD_LLAMAFILE_"
+PYPROJECT_TABLE = ("tool", "intentguard", "llamafile")
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+def _find_pyproject(start: Path) -> Optional[Path]:
+    for directory in [start, *start.parents]:
+        candidate = directory / "pyproject.toml"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _read_pyproject_table(pyproject: Path) -> Dict[str, Any]:
+    if tomllib is None:
+        # Only when the declared tomli dependency is missing on Python 3.10
+        try:
+            configured = "[tool.intentguard.llamafile]" in pyproject.read_text()
+        except OSError:
+            configured = False
+        if configured:
+            logger.warning(
+                "Ignoring [tool.intentguard.llamafile] in %s: install tomli to "
+                "read it on Python 3.10",
+                pyproject,
+            )
+        return {}
+    try:
+        with open(pyproject, "rb") as f:
+            table: Any = tomllib.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read %s: %s", pyproject, e)
+        return {}
+    for key in PYPROJECT_TABLE:
+        table = table.get(key, {}) if isinstance(table, dict) else {}
+    return table if isinstance(table, dict) else {}
+
+
+def _coerce(name: str, annotation: Any, value: Any) -> Any:
+    """Convert a configured value to the type of the option."""
+    optional = type(None) in typing.get_args(annotation)
+    base = next(
+        (t for t in typing.get_args(annotation) if t is not type(None)), annotation
+    )
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if optional and text in ("", "auto", "none"):
+            return None
+        if base is bool:
+            if text in _TRUE_VALUES:
+                return True
+            if text in _FALSE_VALUES:
+                return False
+            raise ValueError(f"Invalid boolean for llamafile option {name}: {value!r}")
+        if base is int:
+            return int(text)
+        return value.strip()
+    if value is None and optional:
+        return None
+    if base is int and isinstance(value, bool):
+        raise ValueError(f"Invalid integer for llamafile option {name}: {value!r}")
+    if not isinstance(value, base):
+        raise ValueError(
+            f"Invalid value for llamafile option {name}: {value!r}, "
+            f"expected {base.__name__}"
+        )
+    return value
+
+
+def load_llamafile_options(
+    project_dir: Optional[Path] = None,
+    environ: Optional[Mapping[str, str]] = None,
+) -> LlamafileOptions:
+    """
+    Load server options from pyproject.toml and the environment.
+
+    Options are read from the `[tool.intentguard.llamafile]` table of the
+    nearest pyproject.toml, then overridden by `INTENTGUARD_LLAMAFILE_<OPTION>`
+    environment variables, e.g. `INTENTGUARD_LLAMAFILE_THREADS=16`. Keys use
+    the LlamafileOptions field names, with dashes or underscores. The value
+    "auto" selects automatic tuning for options that support it.
+
+    Args:
+        project_dir: Directory to search upward from for pyproject.toml.
+            Defaults to the current working directory.
+        environ: Environment variables. Defaults to os.environ.
+
+    Returns:
+        The loaded options, with defaults for anything not configured
+
+    Raises:
+        ValueError: If a configured value has the wrong type
+    """
+    environ = os.environ if environ is None else environ
+    hints = typing.get_type_hints(LlamafileOptions)
+    known = {field.name for field in fields(LlamafileOptions)}
+    values: Dict[str, Any] = {}
+
+    pyproject = _find_pyproject(project_dir or Path.cwd())
+    if pyproject is not None:
+        for key, value in _read_pyproject_table(pyproject).items():
+            name = key.replace("-", "_")
+            if name not in known:
+                logger.warning("Unknown llamafile option %r in %s", key, pyproject)
+                continue
+            values[name] = _coerce(name, hints[name], value)
+
+    for name in known:
+        env_value = environ.get(ENV_PREFIX + name.upper())
+        if env_value is not None:
+            values[name] = _coerce(name, hints[name], env_value)
+
+    if values:
+        logger.info("Configured llamafile options: %s", values)
+    return LlamafileOptions(**values)
@@ -0,0 +1,439 @@
+"""
+Shared Llamafile server daemon.
+
+In daemon mode, one detached server is shared by every process that uses the
+same `.intentguard` directory, e.g. all pytest-xdist workers of a test run.
+The first process spawns a small Python supervisor (this module run with
+`python -m`), which starts the server, records its port and PIDs in a state
+file, and shuts it down once no client has been registered for the configured
+idle timeout. Clients register one file per Llamafile instance, named after
+their PID, so clients that crash are detected and pruned.
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+from intentguard.infrastructure.llamafile_config import ENV_PREFIX
+from intentguard.infrastructure.llamafile_options import LlamafileOptions
+
+logger = logging.getLogger(__name__)
+
+DAEMON_DIR = Path(".intentguard") / "daemon"
+STATE_FILE = DAEMON_DIR / "daemon.json"
+LOCK_FILE = DAEMON_DIR / "daemon.lock"
+CLIENTS_DIR = DAEMON_DIR / "clients"
+LOG_FILE = DAEMON_DIR / "daemon.log"
+POLL_INTERVAL_SECONDS = 1
+STOP_TIMEOUT_SECONDS = 10
+# Makes importing intentguard warm up a Llamafile, which in the daemon would
+# attach to the daemon itself and keep it from ever going idle.
+WARMUP_ENV_VAR = "INTENTGUARD_WARMUP"
+
+
+class FileLock:
+    """
+    Exclusive lock shared between processes, backed by a lock file.
+
+    Used as a context manager. Blocks until the lock is acquired.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: Optional[IO[bytes]] = None
+
+    def __enter__(self) -> "FileLock":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if sys.platform == "win32":
+            import msvcrt
+
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 seconds; keep waiting.
+                    continue
+        else:
+            import fcntl
+
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        assert self._file is not None
+        if sys.platform == "win32":
+            import msvcrt
+
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+@dataclass
+class DaemonState:
+    """
+    Contents of the daemon state file.
+
+    Attributes:
+        pid: PID of the supervising daemon process
+        server_pid: PID of the llamafile server process
+        port: Port the server listens on, on 127.0.0.1
+        settings: The resolved server settings, as a dictionary
+    """
+
+    pid: int
+    server_pid: int
+    port: int
+    settings: Dict[str, Any]
+
+
+def pid_alive(pid: int) -> bool:
+    """Check whether a process with the given PID exists."""
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _port_open(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def read_state() -> Optional[DaemonState]:
+    """Read the daemon state file, or return None if there is no valid one."""
+    try:
+        with open(STATE_FILE, "r") as f:
+            return DaemonState(**json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning("Ignoring invalid daemon state file %s: %s", STATE_FILE, e)
+        return None
+
+
+def write_state(state: DaemonState) -> None:
+    """Atomically write the daemon state file."""
+    DAEMON_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_FILE.with_name(f"{STATE_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(dataclasses.asdict(state), f)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def _remove_state(pid: int) -> None:
+    """Remove the state file if it still belongs to the daemon with this PID."""
+    state = read_state()
+    if state is not None and state.pid == pid:
+        try:
+            STATE_FILE.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def live_clients() -> List[str]:
+    """List the registered clients, removing those whose process has exited."""
+    try:
+        names = os.listdir(CLIENTS_DIR)
+    except FileNotFoundError:
+        return []
+    clients = []
+    for name in names:
+        try:
+            pid = int(name.split("-", 1)[0])
+        except ValueError:
+            continue
+        if pid_alive(pid):
+            clients.append(name)
+        else:
+            logger.info("Removing client %s, whose process has exited", name)
+            try:
+                (CLIENTS_DIR / name).unlink()
+            except FileNotFoundError:
+                pass
+    return clients
+
+
+def _stop_daemon(state: DaemonState) -> None:
+    """Terminate a running daemon and its server, and wait for them to exit."""
+    logger.info("Stopping llamafile daemon %d", state.pid)
+    for pid in (state.pid, state.server_pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    deadline = time.monotonic() + STOP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline and (
+        pid_alive(state.pid) or _port_open(state.port)
+    ):
+        time.sleep(0.1)
+    _remove_state(state.pid)
+
+
+class DaemonClient:
+    """
+    Attaches one Llamafile instance to the shared daemon.
+
+    Each instance registers itself while attached, which keeps the daemon
+    alive. Detaching, or exiting the process, releases it.
+    """
+
+    def __init__(self) -> None:
+        self.client_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._daemon: Optional[subprocess.Popen] = None
+
+    @property
+    def _client_file(self) -> Path:
+        return CLIENTS_DIR / self.client_id
+
+    def _register(self) -> None:
+        CLIENTS_DIR.mkdir(parents=True, exist_ok=True)
+        self._client_file.touch()
+
+    def detach(self) -> None:
+        """Unregister this client. The daemon exits after its idle timeout."""
+        try:
+            self._client_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def attach(self, options: LlamafileOptions, min_context_size: int) -> DaemonState:
+        """
+        Attach to the running daemon, starting one if necessary.
+
+        If the running daemon has a smaller context than min_context_size and
+        no other client is attached, it is replaced by a daemon with a larger
+        context. A daemon in use by other clients is never stopped.
+
+        Args:
+            options: Server options used if a daemon has to be started
+            min_context_size: The per-slot context the caller needs
+
+        Returns:
+            The state of the daemon this client is attached to
+
+        Raises:
+            Exception: If the daemon exits before its server is ready
+        """
+        with FileLock(LOCK_FILE):
+            self._register()
+            try:
+                state = read_state()
+                if state is not None:
+                    if not pid_alive(state.pid) or not _port_open(state.port):
+                        logger.info("Discarding state of dead daemon %d", state.pid)
+                        _stop_daemon(state)
+                    elif (
+                        state.settings["context_size"] < min_context_size
+                        and not self._others_attached()
+                    ):
+                        _stop_daemon(state)
+                    else:
+                        if state.settings["context_size"] < min_context_size:
+                            logger.warning(
+                                "Llamafile daemon %d has a %d-token context, less "
+                                "than the %d tokens needed, but is in use by other "
+                                "processes; attaching anyway",
+                                state.pid,
+                                state.settings["context_size"],
+                                min_context_size,
+                            )
+                        logger.info(
+                            "Attached to llamafile daemon %d on port %d",
+                            state.pid,
+                            state.port,
+                        )
+                        return state
+                return self._spawn(options, min_context_size)
+            except BaseException:
+                self.detach()
+                raise
+
+    @staticmethod
+    def _daemon_command(options: LlamafileOptions, min_context_size: int) -> List[str]:
+        """The command line that runs the daemon."""
+        return [
+            sys.executable,
+            "-m",
+            __name__,
+            "--options",
+            json.dumps(dataclasses.asdict(options)),
+            "--min-context-size",
+            str(min_context_size),
+        ]
+
+    def _others_attached(self) -> bool:
+        """Check whether clients other than this one are attached."""
+        return any(client != self.client_id for client in live_clients())
+
+    def _spawn(self, options: LlamafileOptions, min_context_size: int) -> DaemonState:
+        """
+        Start a detached daemon and wait until its server accepts requests.
+
+        Called with LOCK_FILE held, so concurrent clients wait for this daemon
+        instead of starting their own. The daemon must therefore publish its
+        state without taking the lock.
+        """
+        command = self._daemon_command(options, min_context_size)
+        # The options are passed on the command line. Without the variables
+        # that configure a client, the daemon never becomes one of its own.
+        env = {
+            name: value
+            for name, value in os.environ.items()
+            if name != WARMUP_ENV_VAR and not name.startswith(ENV_PREFIX)
+        }
+        kwargs: Dict[str, Any] = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = (
+                subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+            )
+        else:
+            kwargs["start_new_session"] = True
+        logger.info("Starting llamafile daemon")
+        self._daemon = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=os.getcwd(),
+            env=env,
+            **kwargs,
+        )
+        # No fixed timeout: the daemon may first have to download the model,
+        # and it enforces the server startup timeout itself.
+        while True:
+            status = self._daemon.poll()
+            if status is not None:
+                raise Exception(
+                    f"llamafile daemon exited with status {status}; see {LOG_FILE}"
+                )
+            state = read_state()
+            if state is not None and state.pid == self._daemon.pid:
+                logger.info(
+                    "Started llamafile daemon %d on port %d", state.pid, state.port
+                )
+                return state
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+
+def run_daemon(options: LlamafileOptions, min_context_size: int) -> None:
+    """
+    Run the daemon: start the server, publish it and supervise its clients.
+
+    Returns on SIGTERM, or once no client has been registered for
+    `options.daemon_idle_timeout` seconds. If the provider's supervisor
+    replaces a crashed or hung server, the new server is published.
+    """
+    from intentguard.infrastructure.llamafile import Llamafile
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    provider = Llamafile(dataclasses.replace(options, daemon=False))
+    provider._ensure_process(min_context_size)
+    pid = os.getpid()
+
+    def publish() -> Optional[subprocess.Popen]:
+        # Without LOCK_FILE: the client that spawned this daemon holds it
+        # until the state is published. write_state() replaces the file
+        # atomically, so readers never see a partial state.
+        process, port, settings = provider._process, provider._port, provider._settings
+        if process is None or port is None or settings is None:
+            return None
+        write_state(
+            DaemonState(
+                pid=pid,
+                server_pid=process.pid,
+                port=port,
+                settings=dataclasses.asdict(settings),
+            )
+        )
+        logger.info("Llamafile daemon %d serving on port %d", pid, port)
+        return process
+
+    published = publish()
+    idle_since: Optional[float] = None
+    try:
+        while not stop.wait(POLL_INTERVAL_SECONDS):
+            if provider._process is not None and provider._process is not published:
+                published = publish()
+            with FileLock(LOCK_FILE):
+                if live_clients():
+                    idle_since = None
+                    continue
+                now = time.monotonic()
+                idle_since = idle_since or now
+                if now - idle_since >= options.daemon_idle_timeout:
+                    logger.info(
+                        "No clients for %d seconds; shutting down",
+                        options.daemon_idle_timeout,
+                    )
+                    _remove_state(pid)
+                    break
+    finally:
+        # Not under LOCK_FILE either: on SIGTERM, the client stopping this
+        # daemon holds the lock while it waits for the daemon to exit.
+        _remove_state(pid)
+        provider.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the daemon process."""
+    parser = argparse.ArgumentParser(description="Shared llamafile server daemon")
+    parser.add_argument("--options", required=True, help="LlamafileOptions as JSON")
+    parser.add_argument("--min-context-size", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    DAEMON_DIR.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s %(process)d %(name)s %(levelname)s %(message)s",
+    )
+    try:
+        run_daemon(LlamafileOptions(**json.loads(args.options)), args.min_context_size)
+    except Exception:
+        logger.exception("Llamafile daemon failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from typing import Optional
+
+CONTEXT_SIZE = 32768
+
+
+@dataclass
+class LlamafileOptions:
+    """
+    Configuration options for the local Llamafile server.
+
+    This class holds settings that control how the Llamafile server process is
+    started. They apply to the whole server, not to individual requests.
+    Options set to None are tuned automatically when the server starts, and
+    the chosen values are logged.
+
+    Attributes:
+        parallel_slots: Number of requests the server decodes at the same time.
+            Values above 1 start the server with continuous batching, so
+            concurrent votes share one forward pass instead of queueing.
+        context_size: Context window, in tokens, available to each slot. The
+            server is started with `context_size * parallel_slots` tokens in
+            total. None derives it from the length of the prompts actually
+            sent, with room for more code than the first prompt, up to
+            CONTEXT_SIZE. If a later prompt needs more, the server is
+            restarted once the requests in flight on it have finished. A
+            shared daemon always gets CONTEXT_SIZE.
+        prompt_cache: Whether to reuse the KV cache across requests. When
+            enabled, every slot is primed with the shared system prompt at
+            startup, and the primed KV state is saved under `.intentguard/slots`
+            so a restarted server can restore it instead of evaluating the
+            system prompt again.
+        constrained_decoding: Whether to constrain generation with the JSON
+            schema of the expected answer. The server then cannot emit
+            malformed output, so no generation is wasted on a parse failure.
+        threads: Number of generation threads. None uses the number of
+            physical cores available to the process.
+        batch_size: Logical batch size for prompt processing. None keeps the
+            server default.
+        cache_type_k: Data type of the keys in the KV cache, e.g. "f16" or
+            "q8_0". None uses f16, or q8_0 when memory is tight.
+        cache_type_v: Data type of the values in the KV cache, chosen like
+            cache_type_k.
+        flash_attention: Whether to enable flash attention. None enables it
+            only when the value cache is quantized, which requires it.
+        mlock: Whether to lock the model in memory so it is never swapped out.
+        mmap: Whether to memory-map the model instead of reading it into
+            memory at startup.
+        daemon: Whether to share one detached server between all processes
+            that run in the same directory, such as pytest-xdist workers.
+            The first process starts the server; later ones attach to it.
+        daemon_idle_timeout: Seconds the shared server keeps running after
+            the last attached process has exited or detached.
+        keep_warm: Seconds the server is kept running without requests
+            before it is shut down to release its memory. It is started again
+            on the next request. None keeps it running until the process
+            exits.
+        artifact_mirror: Base URL, or local directory, to download the
+            server binary and model from instead of their upstream URLs. The
+            files must be named as under `.intentguard`, so a provisioned
+            `.intentguard` directory can serve as a mirror.
+        download_connections: Maximum number of concurrent range requests
+            used to download an artifact.
+    """
+
+    parallel_slots: int = 1
+    context_size: Optional[int] = None
+    prompt_cache: bool = True
+    constrained_decoding: bool = True
+    threads: Optional[int] = None
+    batch_size: Optional[int] = None
+    cache_type_k: Optional[str] = None
+    cache_type_v: Optional[str] = None
+    flash_attention: Optional[bool] = None
+    mlock: bool = False
+    mmap: bool = True
+    daemon: bool = False
+    daemon_idle_timeout: int = 300
+    keep_warm: Optional[int] = None
+    artifact_mirror: Optional[str] = None
+    download_connections: int = 4
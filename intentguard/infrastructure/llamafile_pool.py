@@ -0,0 +1,174 @@
+import dataclasses
+import logging
+import threading
+from typing import List, Optional, Set
+
+from intentguard.app.async_inference_provider import AsyncInferenceProvider
+from intentguard.app.cancellation import CancellationToken
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.inference_provider import InferenceProvider
+from intentguard.app.message import Message
+from intentguard.domain.evaluation import Evaluation
+from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_config import load_llamafile_options
+from intentguard.infrastructure.llamafile_options import LlamafileOptions
+from intentguard.infrastructure.llamafile_tuning import (
+    partition_cpus,
+    physical_core_count,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+
+
+class LlamafilePool(InferenceProvider, AsyncInferenceProvider):
+    """
+    Inference provider backed by several Llamafile server processes.
+
+    A single server does not saturate a machine with many cores for a model of
+    this size, and one slow generation delays every request queued behind it.
+    The pool runs one Llamafile per worker and sends each request to the
+    worker with the fewest requests in flight. The workers memory-map the same
+    GGUF file, so the model weights are held in memory only once.
+
+    A worker whose server has crashed is restarted in the background, while
+    requests go to the remaining workers. Requests in flight on other workers
+    are not affected.
+
+    Example:
+        IntentGuard.set_inference_provider(LlamafilePool(workers=4))
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        options: Optional[LlamafileOptions] = None,
+        pin_cpus: bool = False,
+    ):
+        """
+        Initialize the pool. Servers are started lazily, like Llamafile's.
+
+        Args:
+            workers: Number of server processes
+            options: Server configuration shared by all workers. If None,
+                options are loaded like Llamafile's. Automatic thread counts
+                are divided between the workers, and daemon mode is ignored.
+            pin_cpus: Pin each worker to its own contiguous set of CPUs, so
+                workers do not compete for cores. Only supported on Linux.
+
+        Raises:
+            ValueError: If workers is less than 1
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        options = options or load_llamafile_options()
+        if options.daemon:
+            logger.warning("Daemon mode is not supported by LlamafilePool; ignoring it")
+        cpu_sets: List[Optional[Set[int]]] = (
+            list(partition_cpus(workers)) if pin_cpus else [None] * workers
+        )
+        self._workers = [
+            Llamafile(self._worker_options(options, workers, cpu_set), cpu_set)
+            for cpu_set in cpu_sets
+        ]
+        self._in_flight = [0] * workers
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _worker_options(
+        options: LlamafileOptions, workers: int, cpu_set: Optional[Set[int]]
+    ) -> LlamafileOptions:
+        """Derive the options of one worker from the pool's options."""
+        threads = options.threads
+        if threads is None:
+            threads = (
+                len(cpu_set)
+                if cpu_set is not None
+                else max(1, physical_core_count() // workers)
+            )
+        return dataclasses.replace(options, threads=threads, daemon=False)
+
+    @property
+    def workers(self) -> List[Llamafile]:
+        """The Llamafile instance of each worker."""
+        return list(self._workers)
+
+    def model_id(self) -> str:
+        """The model of the workers, which all serve the same one."""
+        return self._workers[0].model_id()
+
+    def warmup(self) -> None:
+        """Start every worker's server in the background."""
+        for worker in self._workers:
+            worker.warmup()
+
+    def shutdown(self) -> None:
+        """Shut down every worker's server."""
+        for worker in self._workers:
+            worker.shutdown()
+
+    def _acquire(self) -> int:
+        """
+        Pick the worker for the next request and count the request against it.
+
+        Workers whose server has exited are restarted in the background first.
+        Workers with a running server are preferred over those still starting;
+        among them, the one with the fewest requests in flight wins, with ties
+        broken round-robin. None of this waits for a worker that is booting.
+        """
+        for worker in self._workers:
+            if worker._discard_exited_process():
+                worker.warmup(prime=False)
+
+        with self._lock:
+            count = len(self._workers)
+            running = [i for i in range(count) if self._workers[i]._is_running()]
+            candidates = running or list(range(count))
+            index = min(
+                candidates,
+                key=lambda i: (self._in_flight[i], (i - self._next) % count),
+            )
+            self._in_flight[index] += 1
+            self._next = (index + 1) % count
+            return index
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def predict(
+        self, prompt: List[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        """Generate a prediction on the least-loaded worker."""
+        index = self._acquire()
+        try:
+            return self._workers[index].predict(prompt, inference_options)
+        finally:
+            self._release(index)
+
+    def predict_cancellable(
+        self,
+        prompt: List[Message],
+        inference_options: InferenceOptions,
+        cancellation: CancellationToken,
+    ) -> Evaluation:
+        """Cancellable counterpart of predict()."""
+        index = self._acquire()
+        try:
+            return self._workers[index].predict_cancellable(
+                prompt, inference_options, cancellation
+            )
+        finally:
+            self._release(index)
+
+    async def predict_async(
+        self, prompt: List[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        """Asynchronous counterpart of predict()."""
+        index = self._acquire()
+        try:
+            return await self._workers[index].predict_async(prompt, inference_options)
+        finally:
+            self._release(index)
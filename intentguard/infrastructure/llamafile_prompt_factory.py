@@ -1,3 +1,4 @@
+import hashlib
 import logging
 from typing import List
 
@@ -10,6 +11,19 @@ logger = logging.getLogger(__name__)
 
 _system_prompt = SYSTEM_PROMPT
 
+# Appended to the user message rather than the system prompt, so the cached
+# KV state of the shared system prompt is reused in fast mode too.
+_verdict_first_instruction = """
+[Response]
+Answer immediately, without the `thoughts` field. Output a JSON object with only `result` followed by `explanation`."""
+
+# Bump the revision when the prompt layout below changes; edits to the prompt
+# texts change the version on their own.
+_TEMPLATE_REVISION = "1"
+TEMPLATE_VERSION = hashlib.sha256(
+    "\0".join([_TEMPLATE_REVISION, _system_prompt, _verdict_first_instruction]).encode()
+).hexdigest()
+
 
 def _format_code_objects(code_objects: List[CodeObject]) -> str:
     """
@@ -104,3 +118,32 @@ class LlamafilePromptFactory(PromptFactory):
         ]
         logger.debug("Created prompt with %d messages", len(messages))
         return messages
+
+    def template_version(self) -> str:
+        """A digest of the prompt texts and the revision of the prompt layout."""
+        return TEMPLATE_VERSION
+
+    def create_fast_prompt(
+        self, expectation: str, code_objects: List[CodeObject]
+    ) -> List[Message]:
+        """
+        Create a prompt that asks for the verdict without chain-of-thought.
+
+        The messages are identical to create_prompt(), except that the user
+        message ends with an instruction to skip the `thoughts` field and
+        answer with `result` and `explanation` only.
+
+        Args:
+            expectation: Natural language assertion describing expected code behavior
+            code_objects: List of code objects to evaluate
+
+        Returns:
+            List of Message objects forming the complete conversation prompt
+        """
+        messages = self.create_prompt(expectation, code_objects)
+        user_message = messages[-1]
+        messages[-1] = Message(
+            content=user_message.content + _verdict_first_instruction,
+            role=user_message.role,
+        )
+        return messages
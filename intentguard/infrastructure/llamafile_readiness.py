@@ -0,0 +1,202 @@
+import http.client
+import logging
+import subprocess
+import threading
+import time
+from enum import Enum
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+INITIAL_PROBE_DELAY_SECONDS = 0.01
+MAX_PROBE_DELAY_SECONDS = 0.08  # Backoff cap, well below the old 1-second poll
+PROBE_TIMEOUT_SECONDS = 5
+
+
+class ServerStartupError(Exception):
+    """
+    Raised when a Llamafile server exits or does not become ready in time.
+
+    Deliberately not a TimeoutError or ConnectionError: a server that failed
+    to start once is not retried by the request that started it.
+    """
+
+
+class ReadinessState(str, Enum):
+    """
+    Startup phases of a Llamafile server.
+
+    Attributes:
+        STOPPED: No server is running.
+        STARTING: The process is running but does not accept connections yet.
+        LOADING: The server accepts connections and is loading the model.
+        READY: The health endpoint reports that requests can be served.
+        FAILED: The server exited or did not become ready in time.
+    """
+
+    STOPPED = "stopped"
+    STARTING = "starting"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+
+def health_status(port: int, timeout: float = PROBE_TIMEOUT_SECONDS) -> Optional[int]:
+    """
+    Query the server's `/health` endpoint.
+
+    Args:
+        port: Port of the server on 127.0.0.1
+        timeout: Socket timeout in seconds
+
+    Returns:
+        The HTTP status: 200 when ready, 503 while the model is loading. None
+        if the server could not be reached.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request("GET", "/health")
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+
+
+class ServerReadiness:
+    """
+    Tracks whether a Llamafile server can serve requests.
+
+    Only one thread probes the health endpoint at a time, with exponential
+    backoff from INITIAL_PROBE_DELAY_SECONDS up to MAX_PROBE_DELAY_SECONDS.
+    Other threads that need the server wait on a condition variable and are
+    woken as soon as the probing thread sees the server become ready.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._state = ReadinessState.STOPPED
+        self._probing = False
+        # Incremented whenever the server is stopped or restarted, so a probe
+        # of the previous server gives up instead of blocking the new one.
+        self._generation = 0
+
+    @property
+    def state(self) -> ReadinessState:
+        """The current startup phase."""
+        return self._state
+
+    def _set_state(self, state: ReadinessState) -> None:
+        """Record a state transition. The caller must hold the condition."""
+        if state != self._state:
+            logger.debug("Llamafile server state: %s -> %s", self._state, state)
+            if state == ReadinessState.LOADING:
+                logger.info("Llamafile server is loading the model")
+            self._state = state
+            self._condition.notify_all()
+
+    def reset(self, state: ReadinessState = ReadinessState.STOPPED) -> None:
+        """Set the state after the server was stopped or (re)started."""
+        with self._condition:
+            self._generation += 1
+            self._set_state(state)
+            self._condition.notify_all()
+
+    def mark_loading(self) -> None:
+        """Record that the server answered a request with "Loading model"."""
+        with self._condition:
+            self._set_state(ReadinessState.LOADING)
+
+    def wait_ready(
+        self,
+        port: int,
+        process: Optional[subprocess.Popen],
+        timeout: float,
+    ) -> None:
+        """
+        Block until the server on the given port is ready.
+
+        Returns immediately if it already is. Otherwise the calling thread
+        either probes the server itself or, if another thread is probing,
+        waits for it.
+
+        Args:
+            port: Port of the server on 127.0.0.1
+            process: The server process, if owned by the caller. Probing
+                stops early if it exits.
+            timeout: Maximum time to wait, in seconds
+
+        Raises:
+            ServerStartupError: If the process exits before the server is
+                ready, or the server is not ready within the timeout
+            ConnectionError: If the server is stopped or restarted meanwhile
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._state == ReadinessState.READY:
+                    return
+                if not self._probing:
+                    self._probing = True
+                    generation = self._generation
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ServerStartupError(
+                        f"Llamafile server was not ready within {timeout} seconds"
+                    )
+                self._condition.wait(remaining)
+        try:
+            self._probe_until_ready(port, process, deadline, timeout, generation)
+        finally:
+            with self._condition:
+                self._probing = False
+                self._condition.notify_all()
+
+    def _probe_until_ready(
+        self,
+        port: int,
+        process: Optional[subprocess.Popen],
+        deadline: float,
+        timeout: float,
+        generation: int,
+    ) -> None:
+        start = time.monotonic()
+        delay = INITIAL_PROBE_DELAY_SECONDS
+        while True:
+            if process is not None and process.poll() is not None:
+                status = process.poll()
+                with self._condition:
+                    self._set_state(ReadinessState.FAILED)
+                logger.error("Llamafile server failed to start with status %d", status)
+                raise ServerStartupError(f"llamafile exited with status {status}")
+
+            status = health_status(port)
+            with self._condition:
+                if self._generation != generation:
+                    raise ConnectionError("Llamafile server was stopped or restarted")
+                if status == 200:
+                    self._set_state(ReadinessState.READY)
+                    logger.info(
+                        "Llamafile server on port %d ready after %.2f seconds",
+                        port,
+                        time.monotonic() - start,
+                    )
+                    return
+                self._set_state(
+                    ReadinessState.STARTING
+                    if status is None
+                    else ReadinessState.LOADING
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._condition:
+                    self._set_state(ReadinessState.FAILED)
+                raise ServerStartupError(
+                    f"Llamafile server failed to start within {timeout} seconds"
+                )
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, MAX_PROBE_DELAY_SECONDS)
@@ -0,0 +1,373 @@
+import asyncio
+import dataclasses
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Optional
+
+from intentguard.infrastructure.llamafile_readiness import health_status
+
+if TYPE_CHECKING:
+    from intentguard.infrastructure.llamafile import Llamafile
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_INTERVAL_SECONDS = 5
+HEALTH_CHECK_TIMEOUT_SECONDS = 5
+HUNG_AFTER_FAILED_CHECKS = 3  # Consecutive failed background checks
+
+
+@dataclass
+class SupervisorMetrics:
+    """
+    Counters describing the health of a supervised Llamafile server.
+
+    Attributes:
+        restarts: Number of times the server was restarted
+        crashes: Number of times the server process was found to have exited
+        hangs: Number of times the server was restarted for not responding
+        failed_health_checks: Number of health checks that got no answer
+        retried_requests: Number of requests retried after a connection error
+            or timeout
+        downtime_seconds: Total time spent restarting the server
+        starts: Number of times a server was started or attached to
+        startup_seconds: Total time spent starting servers, including
+            downloads and model loading
+        warm_seconds: Total time a server was running
+        idle_seconds: Part of warm_seconds with no request in flight
+        idle_shutdowns: Number of times the server was shut down after
+            `keep_warm` seconds without requests
+    """
+
+    restarts: int = 0
+    crashes: int = 0
+    hangs: int = 0
+    failed_health_checks: int = 0
+    retried_requests: int = 0
+    downtime_seconds: float = 0.0
+    starts: int = 0
+    startup_seconds: float = 0.0
+    warm_seconds: float = 0.0
+    idle_seconds: float = 0.0
+    idle_shutdowns: int = 0
+
+
+class ServerSupervisor:
+    """
+    Watches a Llamafile server and restarts it only when it is dead or hung.
+
+    A background thread checks every HEALTH_CHECK_INTERVAL_SECONDS whether the
+    server process is alive and its `/health` endpoint answers. A server that
+    has exited is restarted at once; one that misses HUNG_AFTER_FAILED_CHECKS
+    checks in a row is considered hung and restarted. Requests that fail with
+    a connection error or timeout report it through report_failure(), which
+    checks the server right away instead of killing it, so other requests in
+    flight on a healthy server keep running.
+
+    Checks and restarts are serialized, so many requests failing at once
+    cause at most one restart.
+
+    The supervisor also tracks how long the server is warm and idle. With the
+    `keep_warm` option set, the same thread shuts down a server that has had
+    no request for that many seconds, releasing its memory; the next request
+    starts it again.
+    """
+
+    def __init__(
+        self,
+        provider: "Llamafile",
+        interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+        hung_after: int = HUNG_AFTER_FAILED_CHECKS,
+    ):
+        self._provider = provider
+        self.interval = interval
+        self.hung_after = hung_after
+        self._metrics = SupervisorMetrics()
+        self._failures = 0
+        self._check_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Guards the usage counters below; reentrant because idle shutdown
+        # stops the server, which reports back through server_stopped().
+        self._usage_lock = threading.RLock()
+        self._usage_changed = threading.Condition(self._usage_lock)
+        self._in_flight = 0
+        # Requests in flight on the current thread, and on threads waiting in
+        # exclusive(), which must not wait for each other.
+        self._local = threading.local()
+        self._waiting_exclusive = 0
+        self._exclusive_owner: Optional[int] = None
+        self._last_active = time.monotonic()
+        self._warm_since: Optional[float] = None
+        self._idle_since: Optional[float] = None
+
+    @property
+    def metrics(self) -> SupervisorMetrics:
+        """A snapshot of the supervisor's counters, including the current period."""
+        with self._check_lock, self._usage_lock:
+            metrics = dataclasses.replace(self._metrics)
+            now = time.monotonic()
+            if self._warm_since is not None:
+                metrics.warm_seconds += now - self._warm_since
+            if self._idle_since is not None:
+                metrics.idle_seconds += now - self._idle_since
+            return metrics
+
+    @contextmanager
+    def track_request(self) -> Iterator[None]:
+        """
+        Count a request as in flight for the duration of the block.
+
+        Waits first while another thread holds exclusive().
+        """
+        ident = threading.get_ident()
+        with self._usage_changed:
+            while self._exclusive_owner not in (None, ident):
+                self._usage_changed.wait()
+            self._begin_request()
+        self._local.requests = self._own_requests() + 1
+        try:
+            yield
+        finally:
+            self._local.requests -= 1
+            self._end_request()
+
+    @asynccontextmanager
+    async def track_request_async(self) -> AsyncIterator[None]:
+        """
+        Asynchronous counterpart of track_request().
+
+        Waiting for exclusive() to be released happens in a worker thread, so
+        the event loop keeps running. The request is not counted as one of
+        the calling thread's own, since requests of other tasks run on the
+        same thread; pass own_requests=1 to exclusive() instead.
+        """
+        while True:
+            with self._usage_changed:
+                if self._exclusive_owner is None:
+                    self._begin_request()
+                    break
+            await asyncio.to_thread(self._wait_until_not_exclusive)
+        try:
+            yield
+        finally:
+            self._end_request()
+
+    def _wait_until_not_exclusive(self) -> None:
+        with self._usage_changed:
+            while self._exclusive_owner is not None:
+                self._usage_changed.wait()
+
+    def _begin_request(self) -> None:
+        """Count a request as in flight. The caller must hold the usage lock."""
+        if self._in_flight == 0 and self._idle_since is not None:
+            self._metrics.idle_seconds += time.monotonic() - self._idle_since
+            self._idle_since = None
+        self._in_flight += 1
+
+    def _end_request(self) -> None:
+        with self._usage_changed:
+            self._in_flight -= 1
+            self._last_active = time.monotonic()
+            if self._in_flight == 0 and self._warm_since is not None:
+                self._idle_since = self._last_active
+            self._usage_changed.notify_all()
+
+    def _own_requests(self) -> int:
+        return getattr(self._local, "requests", 0)
+
+    @contextmanager
+    def exclusive(
+        self, timeout: float, own_requests: Optional[int] = None
+    ) -> Iterator[None]:
+        """
+        Hold back new requests and wait for those in flight to finish.
+
+        Used before restarting the server, which would abort the requests in
+        flight. Requests of the caller, and of threads waiting to become
+        exclusive themselves, are not waited for.
+
+        Args:
+            timeout: Maximum time to wait for requests in flight, in seconds.
+                The block runs regardless once it has passed.
+            own_requests: Number of requests in flight on behalf of the
+                caller. Defaults to those tracked on the calling thread; an
+                asynchronous request restarting the server from a worker
+                thread passes 1.
+        """
+        own = self._own_requests() if own_requests is None else own_requests
+        with self._usage_changed:
+            self._waiting_exclusive += own
+            self._usage_changed.notify_all()
+            try:
+                while self._exclusive_owner is not None:
+                    self._usage_changed.wait()
+            finally:
+                self._waiting_exclusive -= own
+            self._exclusive_owner = threading.get_ident()
+            deadline = time.monotonic() + timeout
+            while self._in_flight - own - self._waiting_exclusive > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(
+                        "%d requests still in flight after %d seconds",
+                        self._in_flight - own - self._waiting_exclusive,
+                        timeout,
+                    )
+                    break
+                self._usage_changed.wait(remaining)
+        try:
+            yield
+        finally:
+            with self._usage_changed:
+                self._exclusive_owner = None
+                self._usage_changed.notify_all()
+
+    def server_started(self, startup_seconds: float) -> None:
+        """Record that a server became ready after startup_seconds."""
+        with self._usage_lock:
+            now = time.monotonic()
+            self._metrics.starts += 1
+            self._metrics.startup_seconds += startup_seconds
+            self._warm_since = now
+            self._last_active = now
+            self._idle_since = now if self._in_flight == 0 else None
+
+    def server_stopped(self) -> None:
+        """Record that the server was stopped."""
+        with self._usage_lock:
+            now = time.monotonic()
+            if self._warm_since is not None:
+                self._metrics.warm_seconds += now - self._warm_since
+                self._warm_since = None
+            if self._idle_since is not None:
+                self._metrics.idle_seconds += now - self._idle_since
+                self._idle_since = None
+
+    def start(self) -> None:
+        """Start the background thread, unless it is already running."""
+        with self._thread_lock:
+            if self._thread is not None and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._stop_event,),
+                name="intentguard-llamafile-supervisor",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread. It exits at its next wake-up."""
+        with self._thread_lock:
+            self._stop_event.set()
+            self._thread = None
+
+    def _run(self, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self.interval):
+            try:
+                self.shutdown_if_idle()
+                self.check()
+            except Exception as e:
+                logger.warning("Llamafile health check failed: %s", e)
+
+    def shutdown_if_idle(self) -> bool:
+        """
+        Shut the server down if it has been idle for `keep_warm` seconds.
+
+        Does nothing unless the provider's `keep_warm` option is set.
+
+        Returns:
+            True if the server was shut down
+        """
+        provider = self._provider
+        keep_warm = provider.options.keep_warm
+        if keep_warm is None:
+            return False
+        with provider._process_lock, self._usage_lock:
+            if self._warm_since is None or self._in_flight > 0:
+                return False
+            idle = time.monotonic() - max(self._last_active, self._warm_since)
+            if idle < keep_warm:
+                return False
+            logger.info("Llamafile server idle for %d seconds; shutting it down", idle)
+            provider._stop_process()
+            self._metrics.idle_shutdowns += 1
+            return True
+
+    def report_failure(self, error: BaseException) -> None:
+        """
+        Handle a request that failed with a connection error or timeout.
+
+        The server is checked at once. It is restarted if it has exited or
+        does not answer the health check; otherwise it is left running and
+        only the failed request is retried.
+
+        Args:
+            error: The error the request failed with
+        """
+        logger.debug("Checking llamafile server after failed request: %s", error)
+        with self._check_lock:
+            self._metrics.retried_requests += 1
+        self.check(failed_request=True)
+
+    def check(self, failed_request: bool = False) -> bool:
+        """
+        Check the server and restart it if it is dead or hung.
+
+        Args:
+            failed_request: Whether a request has just failed against the
+                server. A single failed health check is then enough to
+                consider it hung.
+
+        Returns:
+            True if the server is healthy or not running, False if it failed
+            the check
+        """
+        with self._check_lock:
+            provider = self._provider
+            process, port = provider._process, provider._port
+            if port is None or (process is None and not provider._attached):
+                return True
+
+            if process is not None and process.poll() is not None:
+                self._metrics.crashes += 1
+                reason = f"exited with status {process.poll()}"
+            elif health_status(port, HEALTH_CHECK_TIMEOUT_SECONDS) in (200, 503):
+                self._failures = 0
+                return True
+            else:
+                self._metrics.failed_health_checks += 1
+                self._failures += 1
+                if not failed_request and self._failures < self.hung_after:
+                    logger.debug(
+                        "Llamafile health check failed (%d/%d)",
+                        self._failures,
+                        self.hung_after,
+                    )
+                    return False
+                self._metrics.hangs += 1
+                reason = "is not responding"
+
+            self._restart(reason)
+            return False
+
+    def _restart(self, reason: str) -> None:
+        """Replace the server. The caller must hold the check lock."""
+        provider = self._provider
+        logger.warning("Llamafile server %s; restarting it", reason)
+        down_since = time.monotonic()
+        self._failures = 0
+        try:
+            with provider._process_lock:
+                provider._stop_process()
+            provider._ensure_process(provider._min_context_size)
+            self._metrics.restarts += 1
+        except Exception as e:
+            logger.error("Failed to restart llamafile server: %s", e)
+        finally:
+            self._metrics.downtime_seconds += time.monotonic() - down_since
@@ -0,0 +1,249 @@
+import logging
+import os
+import platform
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from intentguard.infrastructure.llamafile_options import CONTEXT_SIZE, LlamafileOptions
+
+logger = logging.getLogger(__name__)
+
+AUTO_MIN_CONTEXT_SIZE = 4096  # Smallest per-slot context chosen in auto mode
+GENERATION_RESERVE_TOKENS = 1536  # Room left for the model's answer
+CHARS_PER_TOKEN = 3  # Conservative estimate for code-heavy prompts
+
+# KV cache size of the IntentGuard-1 model (Qwen2.5-Coder-1.5B: 28 layers,
+# 2 KV heads of dimension 128) per token, for f16 keys and values.
+KV_BYTES_PER_TOKEN_F16 = 28 * 2 * (2 * 128) * 2
+# Share of the available memory that the model and KV cache may occupy
+# before the KV cache is quantized.
+MEMORY_BUDGET_FRACTION = 0.5
+QUANTIZED_CACHE_TYPE = "q8_0"
+DEFAULT_CACHE_TYPE = "f16"
+
+
+@dataclass
+class ServerSettings:
+    """
+    Fully resolved settings for one Llamafile server process.
+
+    Attributes:
+        threads: Number of threads used for generation
+        parallel_slots: Number of requests decoded at the same time
+        context_size: Context window, in tokens, of each slot
+        batch_size: Logical batch size for prompt processing, or None for the
+            server default
+        cache_type_k: Data type of the keys in the KV cache
+        cache_type_v: Data type of the values in the KV cache
+        flash_attention: Whether flash attention is enabled
+        mlock: Whether the model is locked in memory
+        mmap: Whether the model is memory-mapped
+    """
+
+    threads: int
+    parallel_slots: int
+    context_size: int
+    batch_size: Optional[int]
+    cache_type_k: str
+    cache_type_v: str
+    flash_attention: bool
+    mlock: bool
+    mmap: bool
+
+
+def _linux_physical_cores() -> Optional[int]:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            cpuinfo = f.read()
+    except OSError:
+        return None
+    cores: Set[Tuple[str, str]] = set()
+    for block in cpuinfo.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            key, _, value = line.partition(":")
+            fields[key.strip()] = value.strip()
+        if "core id" in fields:
+            cores.add((fields.get("physical id", "0"), fields["core id"]))
+    return len(cores) or None
+
+
+def _macos_physical_cores() -> Optional[int]:
+    try:
+        output = subprocess.run(
+            ["sysctl", "-n", "hw.physicalcpu"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=5,
+        ).stdout
+        return int(output.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+def physical_core_count() -> int:
+    """
+    Count the physical CPU cores this process may run on.
+
+    Hyper-threads are not counted, since token generation is bound by memory
+    bandwidth and gains nothing from sibling threads. The count is capped by
+    the CPU affinity of the process, which matters in containers.
+    """
+    system = platform.system()
+    cores: Optional[int] = None
+    if system == "Linux":
+        cores = _linux_physical_cores()
+    elif system == "Darwin":
+        cores = _macos_physical_cores()
+    logical = os.cpu_count() or 1
+    cores = min(cores or logical, logical)
+    if hasattr(os, "sched_getaffinity"):
+        cores = min(cores, len(os.sched_getaffinity(0)))
+    return max(1, cores)
+
+
+def partition_cpus(count: int) -> List[Set[int]]:
+    """
+    Split the CPUs this process may run on into disjoint, contiguous sets.
+
+    Args:
+        count: Number of sets to create
+
+    Returns:
+        count sets of nearly equal size. With fewer CPUs than sets, CPUs are
+        shared round-robin.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+    if count >= len(cpus):
+        return [{cpus[i % len(cpus)]} for i in range(count)]
+    size, extra = divmod(len(cpus), count)
+    sets = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        sets.append(set(cpus[start:end]))
+        start = end
+    return sets
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Return the memory available to new allocations, if it can be determined."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_context_size(prompt_chars: int) -> int:
+    """
+    Estimate the per-slot context needed for a prompt of the given length.
+
+    The estimate covers the prompt and the longest expected answer, rounded up
+    to a power of two and kept between AUTO_MIN_CONTEXT_SIZE and CONTEXT_SIZE.
+
+    Args:
+        prompt_chars: Total number of characters in the prompt messages
+    """
+    needed = prompt_chars // CHARS_PER_TOKEN + GENERATION_RESERVE_TOKENS
+    size = AUTO_MIN_CONTEXT_SIZE
+    while size < needed and size < CONTEXT_SIZE:
+        size *= 2
+    return min(size, CONTEXT_SIZE)
+
+
+def resolve_server_settings(
+    options: LlamafileOptions, model_path: Path, min_context_size: int = 0
+) -> ServerSettings:
+    """
+    Resolve the options left on auto into concrete server settings.
+
+    - threads: the number of physical cores
+    - context_size: at least min_context_size, from estimate_context_size()
+    - cache types: f16, or q8_0 when the model and an f16 KV cache for all
+      slots would take more than MEMORY_BUDGET_FRACTION of available memory.
+      Flash attention is switched on with a quantized cache, which the server
+      requires for quantized values.
+
+    Explicitly configured values are always kept. The resolved settings are
+    logged.
+
+    Args:
+        options: The configured server options
+        model_path: Path to the GGUF model, used to size its memory footprint
+        min_context_size: The per-slot context the current prompts need
+
+    Returns:
+        The settings to start the server with
+    """
+    parallel_slots = max(1, options.parallel_slots)
+    auto = []
+
+    threads = options.threads
+    if threads is None:
+        threads = physical_core_count()
+        auto.append("threads")
+
+    context_size = options.context_size
+    if context_size is None:
+        context_size = max(AUTO_MIN_CONTEXT_SIZE, min_context_size)
+        auto.append("context_size")
+
+    cache_type_k = options.cache_type_k
+    cache_type_v = options.cache_type_v
+    flash_attention = options.flash_attention
+    if cache_type_k is None or cache_type_v is None:
+        cache_type = DEFAULT_CACHE_TYPE
+        memory = available_memory_bytes()
+        if memory is not None:
+            try:
+                model_bytes = model_path.stat().st_size
+            except OSError:
+                model_bytes = 0
+            kv_bytes = KV_BYTES_PER_TOKEN_F16 * context_size * parallel_slots
+            if model_bytes + kv_bytes > MEMORY_BUDGET_FRACTION * memory:
+                cache_type = QUANTIZED_CACHE_TYPE
+                logger.info(
+                    "KV cache of %d MiB does not fit comfortably in %d MiB of "
+                    "available memory; quantizing it to %s",
+                    kv_bytes // 2**20,
+                    memory // 2**20,
+                    cache_type,
+                )
+        if cache_type_k is None:
+            cache_type_k = cache_type
+            auto.append("cache_type_k")
+        if cache_type_v is None:
+            cache_type_v = cache_type
+            auto.append("cache_type_v")
+    if flash_attention is None:
+        flash_attention = cache_type_v != DEFAULT_CACHE_TYPE
+        auto.append("flash_attention")
+
+    settings = ServerSettings(
+        threads=threads,
+        parallel_slots=parallel_slots,
+        context_size=context_size,
+        batch_size=options.batch_size,
+        cache_type_k=cache_type_k,
+        cache_type_v=cache_type_v,
+        flash_attention=flash_attention,
+        mlock=options.mlock,
+        mmap=options.mmap,
+    )
+    logger.info(
+        "Llamafile server settings: %s (auto: %s)", settings, ", ".join(auto) or "none"
+    )
+    return settings
@@ -0,0 +1,61 @@
+import logging
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_RESULT_KEY_PATTERN = re.compile(r'"result"\s*:\s*$')
+
+
+def _side(token: str) -> Optional[bool]:
+    """Map a candidate token to the boolean literal it starts, if any."""
+    stripped = token.strip()
+    if not stripped:
+        return None
+    if "true".startswith(stripped) or stripped.startswith("true"):
+        return True
+    if "false".startswith(stripped) or stripped.startswith("false"):
+        return False
+    return None
+
+
+def extract_true_probability(logprobs_content: List[Dict[str, Any]]) -> Optional[float]:
+    """
+    Compute the probability that the `result` field is true from token log-probabilities.
+
+    Walks the generated tokens until the first value token following a
+    `"result":` key, then compares the probability mass of the candidate tokens
+    that start the `true` literal with the mass of those that start `false`.
+    Both candidate sets come from the `top_logprobs` reported for that position
+    by an OpenAI-compatible chat completions endpoint.
+
+    Args:
+        logprobs_content: The `choices[0].logprobs.content` list of the response
+
+    Returns:
+        The normalized probability of `true`, or None if the result token or
+        its alternatives could not be found
+    """
+    generated = ""
+    for entry in logprobs_content:
+        token = entry.get("token", "")
+        if (
+            token.strip()
+            and generated.rstrip().endswith(":")
+            and _RESULT_KEY_PATTERN.search(generated)
+        ):
+            mass = {True: 0.0, False: 0.0}
+            candidates = entry.get("top_logprobs") or [entry]
+            for candidate in candidates:
+                side = _side(candidate.get("token", ""))
+                if side is not None:
+                    mass[side] += math.exp(candidate.get("logprob", -math.inf))
+            total = mass[True] + mass[False]
+            if total == 0.0:
+                logger.debug("No true/false candidates for result token %r", token)
+                return None
+            return mass[True] / total
+        generated += token
+    logger.debug("Result token not found in logprobs")
+    return None
@@ -0,0 +1,439 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from intentguard.app.judgement_cache import JudgementCache
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.domain.evaluation import Evaluation
+from intentguard.infrastructure.fs_judgement_cache import (
+    CacheStoreStats,
+    select_evictions,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(".intentguard") / "cache.sqlite3"
+LEGACY_CACHE_DIR = Path(".intentguard") / "cache"
+BUSY_TIMEOUT_SECONDS = 30.0
+# Stays below the bound-parameter limit of older SQLite builds (999)
+MAX_QUERY_PARAMETERS = 500
+MIGRATED_MARKER = "legacy_cache_migrated"
+# Access times are refreshed at most this often, so most hits do not write
+ACCESS_RESOLUTION_SECONDS = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judgements (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    accessed_at REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS judgements_accessed_at ON judgements (accessed_at);
+"""
+
+
+def _chunks(keys: List[str]) -> Iterator[List[str]]:
+    for start in range(0, len(keys), MAX_QUERY_PARAMETERS):
+        yield keys[start : start + MAX_QUERY_PARAMETERS]
+
+
+class SqliteJudgementCache(JudgementCache):
+    """
+    SQLite-based implementation of the JudgementCache interface.
+
+    All judgements are stored in a single database file, keyed by the digest
+    of their JudgementCacheKey, like the files of FsJudgementCache. The
+    database runs in WAL mode, so several processes, such as pytest-xdist
+    workers, can read while one of them writes.
+    Bulk lookups and writes each take a single query or transaction.
+
+    On first use, entries of an existing file-per-entry cache directory are
+    imported once. The directory itself is left in place.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_PATH,
+        legacy_cache_dir: Optional[Path] = LEGACY_CACHE_DIR,
+    ):
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            path: Location of the database file
+            legacy_cache_dir: FsJudgementCache directory to import entries from,
+                or None to skip the migration
+        """
+        self.path = path
+        self.legacy_cache_dir = legacy_cache_dir
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        logger.debug("Initialized SQLite judgement cache at %s", self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use. Must be called with the lock held."""
+        if self._connection is not None:
+            return self._connection
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._upgrade(connection)
+            connection.executescript(_INDEXES)
+            if self.legacy_cache_dir is not None:
+                self._migrate(connection, self.legacy_cache_dir)
+        except BaseException:
+            connection.close()
+            raise
+        self._connection = connection
+        return connection
+
+    @staticmethod
+    def _upgrade(connection: sqlite3.Connection) -> None:
+        """Add the access time column to databases created without it."""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {
+                row[1] for row in connection.execute("PRAGMA table_info(judgements)")
+            }
+            if "accessed_at" not in columns:
+                connection.execute(
+                    "ALTER TABLE judgements "
+                    "ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+                )
+                connection.execute(
+                    "UPDATE judgements SET accessed_at = ?", (time.time(),)
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection, legacy_cache_dir: Path) -> None:
+        """
+        Import the entries of a file-per-entry cache directory, once.
+
+        The import runs in a write transaction that first checks the marker,
+        so concurrent processes do not import the directory twice.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            migrated = connection.execute(
+                "SELECT 1 FROM meta WHERE name = ?", (MIGRATED_MARKER,)
+            ).fetchone()
+            if migrated is None:
+                rows = list(SqliteJudgementCache._read_legacy_entries(legacy_cache_dir))
+                connection.executemany(
+                    "INSERT OR IGNORE INTO judgements (key, value, accessed_at) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+                connection.execute(
+                    "INSERT INTO meta (name, value) VALUES (?, ?)",
+                    (MIGRATED_MARKER, str(legacy_cache_dir)),
+                )
+                if rows:
+                    logger.info(
+                        "Imported %d judgements from %s", len(rows), legacy_cache_dir
+                    )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _read_legacy_entries(
+        legacy_cache_dir: Path,
+    ) -> Iterator[Tuple[str, str, float]]:
+        try:
+            with os.scandir(legacy_cache_dir) as entries:
+                files = [entry for entry in entries if entry.is_file()]
+        except FileNotFoundError:
+            return
+        for entry in files:
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                Evaluation(**data)
+                accessed_at = entry.stat().st_mtime
+            except Exception as e:
+                logger.warning("Skipping unreadable cache file %s: %s", entry.path, e)
+                continue
+            yield entry.name, json.dumps(data), accessed_at
+
+    def _lookup(self, keys: List[str]) -> Dict[str, Evaluation]:
+        found: Dict[str, Evaluation] = {}
+        now = time.time()
+        stale: List[str] = []
+        try:
+            with self._lock:
+                connection = self._connect()
+                for chunk in _chunks(keys):
+                    placeholders = ", ".join("?" * len(chunk))
+                    rows = connection.execute(
+                        "SELECT key, value, accessed_at FROM judgements "
+                        f"WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for key, value, accessed_at in rows:
+                        try:
+                            found[key] = Evaluation(**json.loads(value))
+                        except Exception as e:
+                            logger.warning("Failed to read cache entry %s: %s", key, e)
+                            continue
+                        if accessed_at < now - ACCESS_RESOLUTION_SECONDS:
+                            stale.append(key)
+                if stale:
+                    self._record_access(connection, stale, now)
+        except sqlite3.Error as e:
+            logger.warning("Failed to read judgement cache %s: %s", self.path, e)
+        return found
+
+    def _record_access(
+        self, connection: sqlite3.Connection, keys: List[str], now: float
+    ) -> None:
+        """Refresh the access times that drive eviction. Failures are harmless."""
+        try:
+            connection.executemany(
+                "UPDATE judgements SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in keys],
+            )
+        except sqlite3.Error as e:
+            logger.debug("Could not update access times in %s: %s", self.path, e)
+
+    def _write(self, statement: str, rows: List[Tuple]) -> None:
+        """Run a statement for each row in one write transaction."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(statement, rows)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _store(self, rows: List[Tuple[str, str, float]]) -> None:
+        try:
+            self._write(
+                "INSERT OR REPLACE INTO judgements (key, value, accessed_at) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+            logger.debug("Cached %d judgements in %s", len(rows), self.path)
+        except sqlite3.Error as e:
+            logger.error("Failed to write judgement cache %s: %s", self.path, e)
+
+    def get(self, key: JudgementCacheKey) -> Optional[Evaluation]:
+        """
+        Retrieve a cached evaluation result if available.
+
+        Args:
+            key: Identifies the evaluation request
+
+        Returns:
+            The cached Evaluation if found and valid, None otherwise
+        """
+        return self._lookup([key.digest]).get(key.digest)
+
+    def get_many(self, keys: List[JudgementCacheKey]) -> List[Optional[Evaluation]]:
+        """
+        Retrieve cached evaluation results for several requests in one query.
+
+        Args:
+            keys: Identify the evaluation requests to look up
+
+        Returns:
+            A list with the cached Evaluation or None for each key, in order
+        """
+        digests = [key.digest for key in keys]
+        found = self._lookup(list(set(digests)))
+        logger.debug(
+            "Bulk cache lookup: %d of %d entries found", len(found), len(digests)
+        )
+        return [found.get(digest) for digest in digests]
+
+    def touch_many(self, keys: List[JudgementCacheKey]) -> None:
+        """
+        Refresh the access times of entries served by a cache in front of this one.
+
+        Args:
+            keys: Identify the entries that were used
+        """
+        if not keys:
+            return
+        now = time.time()
+        try:
+            self._write(
+                "UPDATE judgements SET accessed_at = ? WHERE key = ?",
+                [(now, key.digest) for key in keys],
+            )
+        except sqlite3.Error as e:
+            logger.debug("Could not update access times in %s: %s", self.path, e)
+
+    def put(self, key: JudgementCacheKey, judgement: Evaluation):
+        """
+        Store an evaluation result in the cache.
+
+        Args:
+            key: Identifies the evaluation request
+            judgement: The evaluation result to cache
+        """
+        self.put_many([key], [judgement])
+
+    def put_many(
+        self, keys: List[JudgementCacheKey], judgements: List[Evaluation]
+    ) -> None:
+        """
+        Store evaluation results for several requests in one transaction.
+
+        Args:
+            keys: Identify the evaluation requests
+            judgements: The evaluation results to cache, one per key
+        """
+        if not keys:
+            return
+        now = time.time()
+        rows = [
+            (key.digest, json.dumps(judgement.__dict__), now)
+            for key, judgement in zip(keys, judgements)
+        ]
+        self._store(rows)
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """List (key, last access time, size) of every entry."""
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    "SELECT key, accessed_at, LENGTH(key) + LENGTH(value) FROM judgements"
+                )
+                .fetchall()
+            )
+
+    def _delete(self, keys: List[str], compact: bool = True) -> int:
+        """Delete entries and, if asked, give the space back to the file system."""
+        if not keys:
+            return 0
+        self._write("DELETE FROM judgements WHERE key = ?", [(key,) for key in keys])
+        if compact:
+            self.compact()
+        return len(keys)
+
+    def compact(self) -> None:
+        """Rebuild the database file to release the space of deleted entries."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            connection.execute("VACUUM")
+
+    def store_stats(self) -> CacheStoreStats:
+        """
+        Summarize the entries in the database.
+
+        Returns:
+            The number, total size and access times of the cached entries
+        """
+        with self._lock:
+            entries, size_bytes, oldest, newest = (
+                self._connect()
+                .execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(key) + LENGTH(value)), 0), "
+                    "MIN(accessed_at), MAX(accessed_at) FROM judgements"
+                )
+                .fetchone()
+            )
+        return CacheStoreStats(
+            location=str(self.path),
+            entries=entries,
+            size_bytes=size_bytes,
+            oldest_access=oldest,
+            newest_access=newest,
+        )
+
+    def prune(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        compact: bool = False,
+    ) -> int:
+        """
+        Remove entries to stay within a size and age limit.
+
+        See select_evictions for which entries are removed. Access times are
+        refreshed at most every ACCESS_RESOLUTION_SECONDS, so the age limit is
+        only that precise.
+
+        Args:
+            max_bytes: Maximum total size to keep, or None for no size limit
+            max_age_seconds: Maximum time since the last access, or None for
+                no age limit
+            compact: Whether to rebuild the database file afterwards. VACUUM
+                locks out every other writer until it finishes, so only
+                explicit maintenance should ask for it.
+
+        Returns:
+            The number of entries removed
+        """
+        evicted = select_evictions(
+            self._entries(), max_bytes, max_age_seconds, time.time()
+        )
+        removed = self._delete(evicted, compact)
+        logger.info("Pruned %d judgements from %s", removed, self.path)
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove every entry from the cache, then compact.
+
+        The legacy directory is not imported again afterwards.
+
+        Returns:
+            The number of entries removed
+        """
+        return self._delete([key for key, _, _ in self._entries()])
+
+    def verify(self) -> Tuple[int, int]:
+        """
+        Check that every entry can be read, and remove those that cannot.
+
+        Returns:
+            The number of valid entries and the number of entries removed
+        """
+        with self._lock:
+            rows = self._connect().execute("SELECT key, value FROM judgements")
+            valid = 0
+            corrupt: List[str] = []
+            for key, value in rows:
+                try:
+                    Evaluation(**json.loads(value))
+                    valid += 1
+                except Exception as e:
+                    logger.warning("Removing unreadable cache entry %s: %s", key, e)
+                    corrupt.append(key)
+        return valid, self._delete(corrupt)
+
+    def close(self) -> None:
+        """Close the database connection. It is reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,269 @@
+import asyncio
+import dataclasses
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from intentguard.app.judgement_cache import JudgementCache
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.domain.evaluation import Evaluation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# How often a memory hit refreshes the access time of the backend entry
+DEFAULT_ACCESS_REFRESH_SECONDS = 3600.0
+
+
+@dataclass
+class TieredCacheStats:
+    """
+    Counters describing how lookups were served by a TieredJudgementCache.
+
+    Attributes:
+        memory_hits: Lookups answered by the in-memory tier
+        memory_misses: Lookups not found in the in-memory tier
+        backend_hits: Lookups passed on to the backend that it answered
+        backend_misses: Lookups passed on to the backend that it did not answer
+        evictions: Entries dropped from the in-memory tier to stay within its
+            limits
+        memory_entries: Entries currently held in memory
+        memory_bytes: Approximate size of the entries held in memory, as
+            serialized JSON
+    """
+
+    memory_hits: int = 0
+    memory_misses: int = 0
+    backend_hits: int = 0
+    backend_misses: int = 0
+    evictions: int = 0
+    memory_entries: int = 0
+    memory_bytes: int = 0
+
+
+def _copy(judgement: Evaluation) -> Evaluation:
+    """Copy a judgement so callers cannot change the one held in memory."""
+    return dataclasses.replace(judgement, metadata=dict(judgement.metadata))
+
+
+class TieredJudgementCache(JudgementCache):
+    """
+    In-process LRU cache in front of a persistent JudgementCache.
+
+    Lookups are answered from memory when possible and otherwise passed on to
+    the backend, whose hits are then kept in memory. Writes go to the backend
+    and to memory (write-through), so the backend always holds every entry.
+    The memory tier is bounded both by number of entries and by the size of
+    the entries, measured as serialized JSON; the least recently used entries
+    are evicted first.
+
+    Memory hits do not reach the backend, so its access times, which drive
+    pruning, would go stale for entries used every run. Each memory hit
+    therefore refreshes the backend access time once it is older than
+    access_refresh_seconds, in one touch_many() call per lookup.
+    """
+
+    def __init__(
+        self,
+        backend: JudgementCache,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        access_refresh_seconds: float = DEFAULT_ACCESS_REFRESH_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: The persistent cache behind the memory tier
+            max_entries: Maximum number of entries held in memory
+            max_bytes: Maximum total size of the entries held in memory
+            access_refresh_seconds: Minimum time between two refreshes of
+                the backend access time of an entry served from memory
+        """
+        self.backend = backend
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.access_refresh_seconds = access_refresh_seconds
+        self._lock = threading.Lock()
+        # Judgement, serialized size and last backend access time, by digest
+        self._entries: "OrderedDict[str, Tuple[Evaluation, int, float]]" = OrderedDict()
+        self._stats = TieredCacheStats()
+
+    @property
+    def stats(self) -> TieredCacheStats:
+        """A snapshot of the hit and miss counters of both tiers."""
+        with self._lock:
+            return dataclasses.replace(self._stats)
+
+    def clear_memory(self) -> None:
+        """Drop all entries held in memory. The backend is not affected."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.memory_entries = 0
+            self._stats.memory_bytes = 0
+
+    def _memory_get(
+        self, key: JudgementCacheKey, stale: List[JudgementCacheKey]
+    ) -> Optional[Evaluation]:
+        """Look up a key in memory, adding it to stale if the backend needs a touch."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key.digest)
+            if entry is None:
+                self._stats.memory_misses += 1
+                return None
+            judgement, size, accessed_at = entry
+            if now - accessed_at >= self.access_refresh_seconds:
+                self._entries[key.digest] = (judgement, size, now)
+                stale.append(key)
+            self._entries.move_to_end(key.digest)
+            self._stats.memory_hits += 1
+            return _copy(judgement)
+
+    def _memory_put(self, key: str, judgement: Evaluation) -> None:
+        size = len(json.dumps(judgement.__dict__))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._stats.memory_bytes -= previous[1]
+            if size > self.max_bytes or self.max_entries < 1:
+                self._stats.memory_entries = len(self._entries)
+                return
+            self._entries[key] = (_copy(judgement), size, time.time())
+            self._stats.memory_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._stats.memory_bytes > self.max_bytes
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._stats.memory_bytes -= evicted_size
+                self._stats.evictions += 1
+            self._stats.memory_entries = len(self._entries)
+
+    def _record_backend(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self._stats.backend_hits += hits
+            self._stats.backend_misses += misses
+
+    def _touch_backend(self, keys: List[JudgementCacheKey]) -> None:
+        """Refresh the backend access times of entries served from memory."""
+        if keys:
+            logger.debug("Refreshing backend access time of %d entries", len(keys))
+            self.backend.touch_many(keys)
+
+    def get(self, key: JudgementCacheKey) -> Optional[Evaluation]:
+        """
+        Retrieve a cached evaluation result from memory or the backend.
+
+        Args:
+            key: Identifies the evaluation request
+
+        Returns:
+            The cached Evaluation if found, None otherwise
+        """
+        stale: List[JudgementCacheKey] = []
+        judgement = self._memory_get(key, stale)
+        if judgement is not None:
+            self._touch_backend(stale)
+            return judgement
+        judgement = self.backend.get(key)
+        self._record_backend(int(judgement is not None), int(judgement is None))
+        if judgement is not None:
+            self._memory_put(key.digest, judgement)
+        return judgement
+
+    def get_many(self, keys: List[JudgementCacheKey]) -> List[Optional[Evaluation]]:
+        """
+        Retrieve cached evaluation results for several requests.
+
+        Keys not held in memory are looked up in the backend in one bulk call.
+
+        Args:
+            keys: Identify the evaluation requests to look up
+
+        Returns:
+            A list with the cached Evaluation or None for each key, in order
+        """
+        stale: List[JudgementCacheKey] = []
+        results = [self._memory_get(key, stale) for key in keys]
+        self._touch_backend(stale)
+        missing = [index for index, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        found = self.backend.get_many([keys[index] for index in missing])
+        hits = 0
+        for index, judgement in zip(missing, found):
+            if judgement is not None:
+                hits += 1
+                self._memory_put(keys[index].digest, judgement)
+                results[index] = judgement
+        self._record_backend(hits, len(missing) - hits)
+        return results
+
+    def put(self, key: JudgementCacheKey, judgement: Evaluation):
+        """
+        Store an evaluation result in the backend and in memory.
+
+        Args:
+            key: Identifies the evaluation request
+            judgement: The evaluation result to cache
+        """
+        self.backend.put(key, judgement)
+        self._memory_put(key.digest, judgement)
+
+    def put_many(
+        self, keys: List[JudgementCacheKey], judgements: List[Evaluation]
+    ) -> None:
+        """
+        Store evaluation results for several requests in the backend and in memory.
+
+        Args:
+            keys: Identify the evaluation requests
+            judgements: The evaluation results to cache, one per key
+        """
+        if not keys:
+            return
+        self.backend.put_many(keys, judgements)
+        for key, judgement in zip(keys, judgements):
+            self._memory_put(key.digest, judgement)
+
+    async def get_async(self, key: JudgementCacheKey) -> Optional[Evaluation]:
+        """
+        Retrieve a cached evaluation result without blocking the event loop.
+
+        Memory hits are answered directly; only backend lookups and access
+        time refreshes are awaited.
+
+        Args:
+            key: Identifies the evaluation request
+
+        Returns:
+            The cached Evaluation if found, None otherwise
+        """
+        stale: List[JudgementCacheKey] = []
+        judgement = self._memory_get(key, stale)
+        if judgement is not None:
+            if stale:
+                await asyncio.to_thread(self._touch_backend, stale)
+            return judgement
+        judgement = await self.backend.get_async(key)
+        self._record_backend(int(judgement is not None), int(judgement is None))
+        if judgement is not None:
+            self._memory_put(key.digest, judgement)
+        return judgement
+
+    async def put_async(self, key: JudgementCacheKey, judgement: Evaluation) -> None:
+        """
+        Store an evaluation result without blocking the event loop.
+
+        Args:
+            key: Identifies the evaluation request
+            judgement: The evaluation result to cache
+        """
+        await self.backend.put_async(key, judgement)
+        self._memory_put(key.digest, judgement)
@@ -0,0 +1,30 @@
+"""
+Pytest plugin that starts the IntentGuard model server during test collection.
+
+The plugin is registered through the pytest11 entry point and does nothing
+unless enabled with ``--intentguard-warmup`` or ``intentguard_warmup = true``
+in the pytest configuration.
+"""
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("intentguard")
+    group.addoption(
+        "--intentguard-warmup",
+        action="store_true",
+        default=False,
+        help="start the IntentGuard model server in the background during collection",
+    )
+    parser.addini(
+        "intentguard_warmup",
+        type="bool",
+        default=False,
+        help="start the IntentGuard model server in the background during collection",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("intentguard_warmup") or config.getini("intentguard_warmup"):
+        import intentguard
+
+        intentguard.warmup()
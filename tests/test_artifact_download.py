@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from intentguard.infrastructure import artifact_download
+from intentguard.infrastructure.artifact_download import artifact_source, download
+from intentguard.infrastructure.artifact_manifest import ArtifactManifest
+
+DATA = os.urandom(10_000)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+CHUNK_SIZE = 1024
+
+
+class _ArtifactHandler(BaseHTTPRequestHandler):
+    ranges = True
+    requested: List[str] = []
+
+    def do_GET(self):
+        requested_range = self.headers.get("Range")
+        type(self).requested.append(requested_range or "")
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)", requested_range or "")
+        if self.ranges and match:
+            start, end = int(match.group(1)), int(match.group(2))
+            body = DATA[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            body = DATA
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownload(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        self.target = self.directory / "model.gguf"
+        _ArtifactHandler.ranges = True
+        _ArtifactHandler.requested = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ArtifactHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/model.gguf"
+        self._chunk_size = patch.object(artifact_download, "CHUNK_SIZE", CHUNK_SIZE)
+        self._chunk_size.start()
+
+    def tearDown(self):
+        self._chunk_size.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def _range_requests(self):
+        return [r for r in _ArtifactHandler.requested if r != "bytes=0-0"]
+
+    def test_downloads_ranges_in_parallel_and_records_checksum(self):
+        download(self.url, self.target, SHA256, connections=4)
+
+        self.assertEqual(DATA, self.target.read_bytes())
+        self.assertEqual(10, len(self._range_requests()))
+        self.assertEqual(
+            ["model.gguf", "manifest.json"],
+            sorted(os.listdir(self.directory), reverse=True),
+        )
+        self.assertTrue(
+            ArtifactManifest(self.directory).is_verified(self.target, SHA256)
+        )
+
+    def test_interrupted_download_resumes_missing_chunks(self):
+        part = self.directory / "model.gguf.part"
+        part.write_bytes(DATA[: 3 * CHUNK_SIZE] + bytes(len(DATA) - 3 * CHUNK_SIZE))
+        (self.directory / "model.gguf.part.json").write_text(
+            json.dumps(
+                {
+                    "url": self.url,
+                    "size": len(DATA),
+                    "chunk_size": CHUNK_SIZE,
+                    "done": [0, 1, 2],
+                }
+            )
+        )
+
+        download(self.url, self.target, SHA256)
+
+        self.assertEqual(DATA, self.target.read_bytes())
+        self.assertEqual(7, len(self._range_requests()))
+        self.assertNotIn("bytes=0-1023", self._range_requests())
+        self.assertFalse(part.exists())
+
+    def test_server_without_range_support_is_streamed(self):
+        _ArtifactHandler.ranges = False
+
+        download(self.url, self.target, SHA256)
+
+        self.assertEqual(DATA, self.target.read_bytes())
+        self.assertEqual(2, len(_ArtifactHandler.requested))
+
+    def test_wrong_checksum_leaves_no_file(self):
+        with self.assertRaises(ValueError):
+            download(self.url, self.target, "0" * 64)
+
+        self.assertFalse(self.target.exists())
+        self.assertFalse((self.directory / "model.gguf.part").exists())
+
+    def test_copies_from_local_mirror(self):
+        mirror = self.directory / "mirror"
+        mirror.mkdir()
+        (mirror / "model.gguf").write_bytes(DATA)
+
+        download(
+            artifact_source(self.url, "model.gguf", str(mirror)), self.target, SHA256
+        )
+
+        self.assertEqual(DATA, self.target.read_bytes())
+        self.assertEqual([], _ArtifactHandler.requested)
+
+
+class TestArtifactSource(unittest.TestCase):
+    def test_without_mirror_uses_upstream_url(self):
+        self.assertEqual("https://a/b", artifact_source("https://a/b", "model.gguf"))
+
+    def test_mirror_url_is_joined_with_file_name(self):
+        self.assertEqual(
+            "https://mirror/ig/model.gguf",
+            artifact_source("https://a/b", "model.gguf", "https://mirror/ig/"),
+        )
+
+    def test_mirror_directory_is_a_local_path(self):
+        self.assertEqual(
+            str(Path("/share/ig") / "model.gguf"),
+            artifact_source("https://a/b", "model.gguf", "file:///share/ig"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
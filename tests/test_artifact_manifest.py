@@ -0,0 +1,106 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+from intentguard import cli
+from intentguard.infrastructure import artifact_manifest
+from intentguard.infrastructure.artifact_manifest import (
+    ArtifactManifest,
+    compute_checksum,
+)
+
+
+class TestArtifactManifest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp_dir.name)
+        self.artifact = self.directory / "model.gguf"
+        self.artifact.write_bytes(b"weights")
+        self.sha256 = hashlib.sha256(b"weights").hexdigest()
+        self.manifest = ArtifactManifest(self.directory)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _count_hashes(self):
+        return patch.object(
+            artifact_manifest, "compute_checksum", wraps=compute_checksum
+        )
+
+    def test_compute_checksum_matches_hashlib_across_buffers(self):
+        data = os.urandom(artifact_manifest.HASH_BUFFER_SIZE + 123)
+        self.artifact.write_bytes(data)
+
+        self.assertEqual(
+            hashlib.sha256(data).hexdigest(), compute_checksum(self.artifact)
+        )
+
+    def test_unchanged_file_is_hashed_only_once(self):
+        with self._count_hashes() as hashed:
+            self.assertTrue(self.manifest.verify(self.artifact, self.sha256))
+            self.assertTrue(
+                ArtifactManifest(self.directory).verify(self.artifact, self.sha256)
+            )
+
+        self.assertEqual(1, hashed.call_count)
+
+    def test_modified_file_is_hashed_again(self):
+        self.assertTrue(self.manifest.verify(self.artifact, self.sha256))
+        self.artifact.write_bytes(b"tampered")
+
+        with self._count_hashes() as hashed:
+            self.assertFalse(self.manifest.verify(self.artifact, self.sha256))
+
+        self.assertEqual(1, hashed.call_count)
+        self.assertFalse(self.manifest.is_verified(self.artifact, self.sha256))
+
+    def test_force_always_hashes(self):
+        self.manifest.verify(self.artifact, self.sha256)
+
+        with self._count_hashes() as hashed:
+            self.assertTrue(
+                self.manifest.verify(self.artifact, self.sha256, force=True)
+            )
+
+        self.assertEqual(1, hashed.call_count)
+
+    def test_different_expected_checksum_is_not_trusted(self):
+        self.manifest.verify(self.artifact, self.sha256)
+
+        self.assertFalse(self.manifest.is_verified(self.artifact, "0" * 64))
+
+    def test_corrupt_manifest_is_ignored(self):
+        self.manifest.path.write_text("not json")
+
+        self.assertTrue(self.manifest.verify(self.artifact, self.sha256))
+        self.assertTrue(self.manifest.is_verified(self.artifact, self.sha256))
+
+
+class TestVerifyCommand(unittest.TestCase):
+    def _run(self, results):
+        out = io.StringIO()
+        with patch.object(cli, "verify_artifacts", return_value=results):
+            with redirect_stdout(out):
+                code = cli.main(["verify"])
+        return code, out.getvalue()
+
+    def test_verify_succeeds_when_all_artifacts_match(self):
+        code, out = self._run({Path("a"): True, Path("b"): True})
+
+        self.assertEqual(0, code)
+        self.assertEqual(2, out.count("OK"))
+
+    def test_verify_fails_on_missing_artifact(self):
+        code, out = self._run({Path("a"): True, Path("missing-artifact"): False})
+
+        self.assertEqual(1, code)
+        self.assertIn("MISSING  missing-artifact", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
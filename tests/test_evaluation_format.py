@@ -0,0 +1,73 @@
+import json
+import unittest
+
+from intentguard.domain.evaluation import Evaluation
+from intentguard.infrastructure.evaluation_format import (
+    EVALUATION_SCHEMA,
+    parse_evaluation_text,
+    response_format,
+)
+
+
+class TestResponseFormat(unittest.TestCase):
+    def test_schema_requires_thoughts_before_result(self):
+        schema = response_format()["json_schema"]["schema"]
+
+        self.assertIs(EVALUATION_SCHEMA, schema)
+        self.assertEqual(
+            ["thoughts", "result", "explanation"], list(schema["properties"])
+        )
+        self.assertFalse(schema["additionalProperties"])
+
+
+class TestParseEvaluationText(unittest.TestCase):
+    def test_valid_json(self):
+        text = json.dumps(
+            {
+                "thoughts": 'uses ["a"] and """doc"""',
+                "result": False,
+                "explanation": "x",
+            }
+        )
+
+        self.assertEqual(
+            Evaluation(result=False, explanation="x"), parse_evaluation_text(text)
+        )
+
+    def test_legacy_unescaped_quotes_are_repaired(self):
+        text = '{"thoughts": "calls f["key"]", "result": true, "explanation": null}'
+
+        self.assertEqual(
+            Evaluation(result=True, explanation=None), parse_evaluation_text(text)
+        )
+
+    def test_surrounding_prose_and_code_fence_are_ignored(self):
+        text = (
+            "Here is my answer:\n```json\n"
+            '{"thoughts": "ok", "result": true, "explanation": null}\n```'
+            "<|eot_id|>"
+        )
+
+        self.assertEqual(
+            Evaluation(result=True, explanation=None), parse_evaluation_text(text)
+        )
+
+    def test_truncated_output_recovers_verdict_and_explanation(self):
+        text = '{"thoughts": "broken "quote", "result": false, "explanation": "Miss'
+
+        self.assertEqual(
+            Evaluation(result=False, explanation="Miss"), parse_evaluation_text(text)
+        )
+
+    def test_string_result_is_coerced(self):
+        text = '{"thoughts": "", "result": "true", "explanation": null}'
+
+        self.assertTrue(parse_evaluation_text(text).result)
+
+    def test_output_without_verdict_raises(self):
+        with self.assertRaises(ValueError):
+            parse_evaluation_text('{"thoughts": "I was cut off befo')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.domain.evaluation import Evaluation
+from intentguard.domain.judgement_options import JudgementOptions
+from intentguard.infrastructure.fs_judgement_cache import FsJudgementCache
+
+
+def _key(text: str, inference_options=InferenceOptions(temperature=0.4)):
+    return JudgementCacheKey.create(
+        "template", "model", text, [], inference_options, JudgementOptions()
+    )
+
+
+class TestFsJudgementCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = FsJudgementCache()
+        self.cache.cache_dir = Path(self._tmp_dir.name) / "cache"
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_get_many_on_missing_directory_returns_misses(self):
+        results = self.cache.get_many(
+            [_key("a"), _key("b")],
+        )
+
+        self.assertEqual([None, None], results)
+
+    def test_put_many_then_get_many_round_trips_in_order(self):
+        self.cache.put_many(
+            [_key("a"), _key("b")],
+            [
+                Evaluation(result=True, explanation=None),
+                Evaluation(result=False, explanation="b failed"),
+            ],
+        )
+
+        results = self.cache.get_many(
+            [_key("b"), _key("missing"), _key("a")],
+        )
+
+        self.assertEqual(
+            [
+                Evaluation(result=False, explanation="b failed"),
+                None,
+                Evaluation(result=True, explanation=None),
+            ],
+            results,
+        )
+        self.assertEqual(
+            Evaluation(result=True, explanation=None),
+            self.cache.get(_key("a")),
+        )
+
+    def test_entries_are_stored_under_the_key_digest(self):
+        key = _key("a")
+
+        path = self.cache._get_cache_file_path(key)
+
+        self.assertEqual(key.digest, path.name)
+
+
+class TestFsJudgementCacheMaintenance(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = FsJudgementCache()
+        self.cache.cache_dir = Path(self._tmp_dir.name) / "cache"
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _put(self, text: str, days_ago: float) -> Path:
+        prompt = _key(text)
+        self.cache.put(
+            prompt,
+            Evaluation(result=True, explanation=None),
+        )
+        path = self.cache._get_cache_file_path(prompt)
+        accessed_at = time.time() - days_ago * 86400
+        os.utime(path, (accessed_at, accessed_at))
+        return path
+
+    def test_hit_refreshes_last_access(self):
+        path = self._put("a", days_ago=10)
+
+        self.cache.get(_key("a"))
+
+        self.assertGreater(path.stat().st_mtime, time.time() - 60)
+
+    def test_touch_refreshes_last_access(self):
+        path = self._put("a", days_ago=10)
+
+        self.cache.touch_many([_key("a"), _key("missing")])
+
+        self.assertGreater(path.stat().st_mtime, time.time() - 60)
+
+    def test_prune_evicts_old_then_least_recently_used_entries(self):
+        old = self._put("old", days_ago=40)
+        stale = self._put("stale", days_ago=5)
+        fresh = self._put("fresh", days_ago=1)
+
+        removed = self.cache.prune(
+            max_bytes=fresh.stat().st_size, max_age_seconds=30 * 86400
+        )
+
+        self.assertEqual(2, removed)
+        self.assertEqual(
+            [False, False, True], [p.exists() for p in (old, stale, fresh)]
+        )
+
+    def test_stats_clear_and_verify(self):
+        self._put("a", days_ago=2)
+        self._put("b", days_ago=1)
+        (self.cache.cache_dir / "corrupt").write_text("{")
+
+        stats = self.cache.store_stats()
+        valid, removed = self.cache.verify()
+
+        self.assertEqual(3, stats.entries)
+        self.assertEqual((2, 1), (valid, removed))
+        self.assertEqual(2, self.cache.clear())
+        self.assertEqual(0, self.cache.store_stats().entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
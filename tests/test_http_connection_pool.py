@@ -0,0 +1,89 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from intentguard.infrastructure.http_connection_pool import HttpConnectionPool
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set[tuple[str, int]] = set()
+    close_after_response = False
+
+    def do_POST(self):
+        _KeepAliveHandler.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if _KeepAliveHandler.close_after_response:
+            # Close without announcing it, like a server dropping idle clients.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpConnectionPool(unittest.TestCase):
+    def setUp(self):
+        _KeepAliveHandler.connections = set()
+        _KeepAliveHandler.close_after_response = False
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.pool = HttpConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _post(self, body: str):
+        return self.pool.request(
+            "127.0.0.1", self.port, "POST", "/echo", body=body, timeout=5
+        )
+
+    def test_connection_is_reused_across_requests(self):
+        responses = [self._post(f"request {i}") for i in range(3)]
+
+        self.assertEqual(
+            [b"request 0", b"request 1", b"request 2"],
+            [response.body for response in responses],
+        )
+        self.assertEqual(1, len(_KeepAliveHandler.connections))
+
+    def test_stale_connection_is_replaced_transparently(self):
+        _KeepAliveHandler.close_after_response = True
+
+        first = self._post("first")
+        second = self._post("second")
+
+        self.assertEqual(b"first", first.body)
+        self.assertEqual(b"second", second.body)
+        self.assertEqual(2, len(_KeepAliveHandler.connections))
+
+    def test_concurrent_requests_use_separate_connections(self):
+        results: list[bytes] = []
+        lock = threading.Lock()
+
+        def worker(i: int) -> None:
+            response = self._post(f"worker {i}")
+            with lock:
+                results.append(response.body)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            sorted(f"worker {i}".encode() for i in range(4)), sorted(results)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from intentguard.domain.aggregation_mode import AggregationMode
+from intentguard.domain.evaluation import Evaluation
+from intentguard.domain.judge import Judge
+from intentguard.domain.judgement_options import JudgementOptions
+
+
+def _votes(*results: bool) -> list[Evaluation]:
+    return [
+        Evaluation(result=result, explanation=None if result else "failed")
+        for result in results
+    ]
+
+
+def _judge(mode: AggregationMode) -> Judge:
+    return Judge(JudgementOptions(aggregation_mode=mode))
+
+
+class TestJudge(unittest.TestCase):
+    def test_balanced_tie_fails(self):
+        judgement = _judge(AggregationMode.BALANCED).make_judgement(_votes(True, False))
+
+        self.assertFalse(judgement.result)
+        self.assertEqual("failed", judgement.explanation)
+
+    def test_strict_requires_unanimity(self):
+        judge = _judge(AggregationMode.STRICT)
+
+        self.assertTrue(judge.make_judgement(_votes(True, True, True)).result)
+        self.assertFalse(judge.make_judgement(_votes(True, True, False)).result)
+
+    def test_relaxed_requires_one_positive(self):
+        judge = _judge(AggregationMode.RELAXED)
+
+        self.assertTrue(judge.make_judgement(_votes(False, False, True)).result)
+        self.assertFalse(judge.make_judgement(_votes(False, False, False)).result)
+
+    def test_balanced_is_decided_once_majority_is_reached(self):
+        judge = _judge(AggregationMode.BALANCED)
+
+        self.assertFalse(judge.is_decided(_votes(True), 3))
+        self.assertFalse(judge.is_decided(_votes(True, False), 3))
+        self.assertTrue(judge.is_decided(_votes(True, True), 3))
+        self.assertTrue(judge.is_decided(_votes(False, False), 3))
+        self.assertTrue(judge.is_decided(_votes(False, False), 4))
+        self.assertFalse(judge.is_decided(_votes(True, True), 4))
+
+    def test_strict_is_decided_by_first_negative(self):
+        judge = _judge(AggregationMode.STRICT)
+
+        self.assertTrue(judge.is_decided(_votes(False), 5))
+        self.assertFalse(judge.is_decided(_votes(True, True, True, True), 5))
+
+    def test_relaxed_is_decided_by_first_positive(self):
+        judge = _judge(AggregationMode.RELAXED)
+
+        self.assertTrue(judge.is_decided(_votes(True), 5))
+        self.assertFalse(judge.is_decided(_votes(False, False, False, False), 5))
+
+    def test_make_judgement_records_vote_counts(self):
+        judgement = _judge(AggregationMode.BALANCED).make_judgement(
+            _votes(True, False, True)
+        )
+
+        self.assertEqual({"votes": 3, "positive_votes": 2}, judgement.metadata)
+
+    def test_verdict_confidence_grows_with_agreeing_votes(self):
+        judge = _judge(AggregationMode.BALANCED)
+
+        one = judge.verdict_confidence(_votes(True), 9)
+        three = judge.verdict_confidence(_votes(True, True, True), 9)
+        split = judge.verdict_confidence(_votes(True, False), 9)
+
+        self.assertLess(one, three)
+        self.assertGreater(three, 0.95)
+        self.assertAlmostEqual(0.5, split)
+        self.assertEqual(1.0, judge.verdict_confidence(_votes(True) * 5, 9))
+
+    def test_probability_threshold_scores_instead_of_counting(self):
+        judge = Judge(JudgementOptions(probability_threshold=0.5))
+        evaluations = [
+            Evaluation(
+                result=True, explanation=None, metadata={"true_probability": 0.55}
+            ),
+            Evaluation(
+                result=False, explanation="failed", metadata={"true_probability": 0.3}
+            ),
+        ]
+
+        judgement = judge.make_judgement(evaluations)
+
+        self.assertFalse(judgement.result)
+        self.assertAlmostEqual(0.425, judgement.metadata["score"])
+        self.assertEqual("failed", judgement.explanation)
+        self.assertFalse(judge.is_decided(evaluations[:1], 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+from intentguard import cli
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.domain.evaluation import Evaluation
+from intentguard.domain.judgement_options import JudgementOptions
+from intentguard.infrastructure.fs_judgement_cache import FsJudgementCache
+from intentguard.infrastructure.judgement_cache_config import (
+    MAX_SIZE_ENV_VAR,
+    JudgementCacheConfig,
+    load_judgement_cache_config,
+    parse_size,
+)
+
+
+class TestJudgementCacheConfig(unittest.TestCase):
+    def test_parse_size_accepts_binary_suffixes(self):
+        self.assertEqual(512, parse_size("512"))
+        self.assertEqual(500 * 1024**2, parse_size("500M"))
+        self.assertEqual(2 * 1024**3, parse_size("2GiB"))
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+    def test_load_reads_environment(self):
+        config = load_judgement_cache_config(
+            {
+                "INTENTGUARD_CACHE_BACKEND": "SQLite",
+                "INTENTGUARD_CACHE_MAX_SIZE": "1K",
+                "INTENTGUARD_CACHE_MAX_AGE_DAYS": "7",
+            }
+        )
+
+        self.assertEqual(JudgementCacheConfig("sqlite", 1024, 7.0), config)
+        self.assertEqual(7 * 86400, config.max_age_seconds)
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            load_judgement_cache_config({"INTENTGUARD_CACHE_BACKEND": "redis"})
+
+
+class TestCacheCommand(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = FsJudgementCache()
+        self.cache.cache_dir = Path(self._tmp_dir.name) / "cache"
+        self.cache.put(
+            JudgementCacheKey.create(
+                "template",
+                "model",
+                "a",
+                [],
+                InferenceOptions(temperature=0.4),
+                JudgementOptions(),
+            ),
+            Evaluation(result=True, explanation=None),
+        )
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _run(self, *argv: str):
+        output = io.StringIO()
+        with (
+            patch.object(cli, "create_persistent_cache", return_value=self.cache),
+            redirect_stdout(output),
+        ):
+            code = cli.main(["cache", "--backend", "fs", *argv])
+        return code, output.getvalue()
+
+    def test_stats_reports_entries(self):
+        code, output = self._run("stats")
+
+        self.assertEqual(0, code)
+        self.assertIn("Entries:       1", output)
+
+    def test_prune_requires_a_limit(self):
+        with patch.dict("os.environ", {}, clear=True):
+            code, _ = self._run("prune")
+
+        self.assertEqual(2, code)
+
+    def test_prune_removes_entries_beyond_the_limit(self):
+        code, output = self._run("prune", "--max-size", "0")
+
+        self.assertEqual(0, code)
+        self.assertIn("Removed 1 entries", output)
+        self.assertEqual(0, self.cache.store_stats().entries)
+
+    def test_importing_the_cli_builds_no_default_providers(self):
+        script = (
+            "import intentguard, intentguard.cli\n"
+            "built = ('cache_config', 'judgement_cache', 'llamafile')\n"
+            "print([name for name in built if name in vars(intentguard)])\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, MAX_SIZE_ENV_VAR: "lots"},
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual("[]", result.stdout.strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
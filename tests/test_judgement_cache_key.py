@@ -0,0 +1,111 @@
+import unittest
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.app.sampling_options import SamplingOptions
+from intentguard.domain.aggregation_mode import AggregationMode
+from intentguard.domain.code_object import CodeObject
+from intentguard.domain.judgement_options import JudgementOptions
+
+CODE = [CodeObject(code="def f():\n    return 1\n", name="f")]
+INFERENCE = InferenceOptions(temperature=0.4)
+
+
+def _key(
+    template_version: str = "template",
+    model_id: str = "model",
+    expectation: str = "f returns 1",
+    code_objects=CODE,
+    inference_options=INFERENCE,
+    judgement_options=JudgementOptions(),
+    sampling_options=None,
+) -> JudgementCacheKey:
+    return JudgementCacheKey.create(
+        template_version,
+        model_id,
+        expectation,
+        code_objects,
+        inference_options,
+        judgement_options,
+        sampling_options,
+    )
+
+
+class TestJudgementCacheKey(unittest.TestCase):
+    def test_identical_requests_share_a_digest(self):
+        self.assertEqual(_key().digest, _key().digest)
+
+    def test_code_objects_are_hashed_by_name_and_code(self):
+        renamed = [CodeObject(code=CODE[0].code, name="g")]
+        edited = [CodeObject(code="def f():\n    return 2\n", name="f")]
+
+        self.assertNotEqual(_key().digest, _key(code_objects=renamed).digest)
+        self.assertNotEqual(_key().digest, _key(code_objects=edited).digest)
+
+    def test_model_and_template_are_part_of_the_key(self):
+        self.assertNotEqual(_key().digest, _key(model_id="other").digest)
+        self.assertNotEqual(_key().digest, _key(template_version="other").digest)
+
+    def test_default_options_are_left_out(self):
+        explicit_defaults = JudgementOptions(
+            aggregation_mode=JudgementOptions().aggregation_mode
+        )
+
+        self.assertEqual(
+            _key().digest, _key(judgement_options=explicit_defaults).digest
+        )
+
+    def test_non_default_options_change_the_key(self):
+        self.assertNotEqual(
+            _key().digest,
+            _key(
+                inference_options=InferenceOptions(temperature=0.4, max_tokens=64)
+            ).digest,
+        )
+        self.assertNotEqual(
+            _key().digest,
+            _key(
+                judgement_options=JudgementOptions(
+                    aggregation_mode=AggregationMode.STRICT
+                )
+            ).digest,
+        )
+
+    def test_vote_budget_changes_the_key(self):
+        self.assertNotEqual(
+            _key(sampling_options=SamplingOptions(evaluation_budget=3)).digest,
+            _key(sampling_options=SamplingOptions(evaluation_budget=5)).digest,
+        )
+
+    def test_stopping_rules_change_the_key(self):
+        budget = SamplingOptions(evaluation_budget=5)
+        rules = [
+            SamplingOptions(evaluation_budget=5, early_exit=False),
+            SamplingOptions(evaluation_budget=5, target_confidence=0.9),
+            SamplingOptions(
+                evaluation_budget=5, target_confidence=0.9, min_evaluations=3
+            ),
+        ]
+
+        digests = {_key(sampling_options=rule).digest for rule in [budget, *rules]}
+        self.assertEqual(4, len(digests))
+
+    def test_vote_keys_ignore_judgement_and_sampling_options(self):
+        strict = _key(
+            judgement_options=JudgementOptions(aggregation_mode=AggregationMode.STRICT),
+            sampling_options=SamplingOptions(
+                evaluation_budget=5, target_confidence=0.9, min_evaluations=3
+            ),
+        )
+
+        self.assertEqual(
+            _key().vote_key(INFERENCE, 0).digest, strict.vote_key(INFERENCE, 0).digest
+        )
+        self.assertNotEqual(
+            _key().vote_key(INFERENCE, 0).digest, _key().vote_key(INFERENCE, 1).digest
+        )
+        self.assertNotEqual(_key().digest, _key().vote_key(INFERENCE, 0).digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
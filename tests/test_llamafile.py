@@ -0,0 +1,349 @@
+import json
+import math
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.message import Message
+from intentguard.infrastructure import llamafile
+from intentguard.infrastructure.http_connection_pool import HttpResponse
+from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_options import (
+    CONTEXT_SIZE,
+    LlamafileOptions,
+)
+from intentguard.infrastructure.llamafile_prompt_factory import LlamafilePromptFactory
+from intentguard.infrastructure.llamafile_tuning import (
+    AUTO_MIN_CONTEXT_SIZE,
+    ServerSettings,
+)
+
+
+class TestLlamafileCommand(unittest.TestCase):
+    def test_single_slot_command_has_no_parallel_flags(self):
+        provider = Llamafile(LlamafileOptions(context_size=32768))
+        provider._port = 12345
+
+        command = provider._build_command(Path("llamafile.exe"), Path("model.gguf"))
+
+        self.assertNotIn("--parallel", command)
+        self.assertEqual("32768", command[command.index("-c") + 1])
+
+    def test_auto_context_grows_with_required_context(self):
+        provider = Llamafile(LlamafileOptions())
+        provider._port = 12345
+
+        small = provider._build_command(Path("llamafile.exe"), Path("model.gguf"))
+        provider._min_context_size = 16384
+        large = provider._build_command(Path("llamafile.exe"), Path("model.gguf"))
+
+        self.assertEqual(str(AUTO_MIN_CONTEXT_SIZE), small[small.index("-c") + 1])
+        self.assertEqual("16384", large[large.index("-c") + 1])
+        self.assertIn("--threads", small)
+
+    def test_auto_context_leaves_room_for_code_up_front(self):
+        provider = Llamafile(LlamafileOptions())
+
+        small = provider._required_context_size([Message(content="x", role="user")])
+
+        self.assertEqual(8192, small)
+        self.assertEqual(
+            0,
+            Llamafile(LlamafileOptions(context_size=4096))._required_context_size([]),
+        )
+        self.assertEqual(
+            CONTEXT_SIZE,
+            Llamafile(LlamafileOptions(daemon=True))._required_context_size([]),
+        )
+
+    def test_tuning_flags_follow_settings(self):
+        provider = Llamafile(LlamafileOptions(prompt_cache=False))
+        provider._port = 12345
+        settings = ServerSettings(
+            threads=6,
+            parallel_slots=1,
+            context_size=4096,
+            batch_size=512,
+            cache_type_k="q8_0",
+            cache_type_v="q8_0",
+            flash_attention=True,
+            mlock=True,
+            mmap=False,
+        )
+
+        command = provider._build_command(
+            Path("llamafile.exe"), Path("model.gguf"), settings
+        )
+
+        self.assertEqual(
+            [
+                "--threads",
+                "6",
+                "--batch-size",
+                "512",
+                "--cache-type-k",
+                "q8_0",
+                "--cache-type-v",
+                "q8_0",
+                "--flash-attn",
+                "on",
+                "--mlock",
+                "--no-mmap",
+            ],
+            command[command.index("--threads") :],
+        )
+
+    def test_parallel_slots_enable_continuous_batching(self):
+        provider = Llamafile(LlamafileOptions(parallel_slots=4, context_size=8192))
+        provider._port = 12345
+
+        command = provider._build_command(Path("llamafile.exe"), Path("model.gguf"))
+
+        self.assertEqual("4", command[command.index("--parallel") + 1])
+        self.assertIn("--cont-batching", command)
+        self.assertEqual(str(4 * 8192), command[command.index("-c") + 1])
+
+
+class TestLlamafilePromptFactory(unittest.TestCase):
+    def test_fast_prompt_keeps_system_prompt_and_extends_user_message(self):
+        factory = LlamafilePromptFactory()
+
+        regular = factory.create_prompt("x is fine", [])
+        fast = factory.create_fast_prompt("x is fine", [])
+
+        self.assertEqual(regular[0], fast[0])
+        self.assertTrue(fast[1].content.startswith(regular[1].content))
+        self.assertIn("without the `thoughts` field", fast[1].content)
+
+
+class TestLlamafileWarmup(unittest.TestCase):
+    def test_warmup_starts_server_in_background_once(self):
+        provider = Llamafile()
+        release = threading.Event()
+        started = []
+
+        def ensure_process(min_context_size=0):
+            started.append((threading.current_thread(), min_context_size))
+            release.wait(5)
+
+        with (
+            patch.object(provider, "_ensure_process", side_effect=ensure_process),
+            patch("intentguard.infrastructure.llamafile.preload_file"),
+        ):
+            provider.warmup()
+            provider.warmup()
+            release.set()
+            assert provider._warmup_thread is not None
+            provider._warmup_thread.join(5)
+
+        self.assertEqual(1, len(started))
+        thread, min_context_size = started[0]
+        self.assertIsNot(threading.current_thread(), thread)
+        # Sized for a small prompt, so the first request does not restart it
+        self.assertEqual(
+            provider._required_context_size([Message(content="x", role="user")]),
+            min_context_size,
+        )
+
+    def test_warmup_failure_is_left_for_first_request(self):
+        provider = Llamafile()
+
+        with (
+            patch.object(provider, "_ensure_process", side_effect=OSError("boom")),
+            patch("intentguard.infrastructure.llamafile.preload_file"),
+            self.assertLogs("intentguard.infrastructure.llamafile", "WARNING"),
+        ):
+            provider.warmup()
+            assert provider._warmup_thread is not None
+            provider._warmup_thread.join(5)
+
+        self.assertIsNone(provider._process)
+
+
+class _ScriptedPool:
+    def __init__(self, responses: dict[str, list[HttpResponse]]):
+        self.responses = responses
+        self.requests: list[tuple[str, dict]] = []
+
+    def request(self, host, port, method, path, body=None, headers=None, timeout=None):
+        self.requests.append((path, json.loads(body)))
+        return self.responses[path].pop(0)
+
+    def close(self, host=None, port=None):
+        pass
+
+
+def _ok(body: dict) -> HttpResponse:
+    return HttpResponse(status=200, reason="OK", body=json.dumps(body).encode())
+
+
+class TestLlamafileSlotPreparation(unittest.TestCase):
+    def setUp(self):
+        self.provider = Llamafile(LlamafileOptions(parallel_slots=2))
+        self.provider._port = 12345
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        lock_file = Path(self._tmp_dir.name) / "slots.lock"
+        self._lock_file = patch.object(llamafile, "SLOTS_LOCK_FILE", lock_file)
+        self._lock_file.start()
+
+    def tearDown(self):
+        self._lock_file.stop()
+        self._tmp_dir.cleanup()
+
+    def test_snapshot_is_restored_when_available(self):
+        pool = _ScriptedPool(
+            {
+                "/slots/0?action=restore": [_ok({})],
+                "/slots/1?action=restore": [_ok({})],
+            }
+        )
+        self.provider._connection_pool = pool
+
+        self.provider._prepare_slots()
+
+        self.assertEqual(
+            ["/slots/0?action=restore", "/slots/1?action=restore"],
+            [path for path, _ in pool.requests],
+        )
+
+    def test_slot_is_primed_and_saved_when_restore_fails(self):
+        missing = HttpResponse(status=400, reason="Bad Request", body=b"{}")
+        completion = _ok({"choices": [{"message": {"content": "{"}}]})
+        pool = _ScriptedPool(
+            {
+                "/slots/0?action=restore": [missing],
+                "/slots/1?action=restore": [_ok({})],
+                "/v1/chat/completions": [completion],
+                "/slots/0?action=save": [_ok({})],
+            }
+        )
+        self.provider._connection_pool = pool
+
+        self.provider._prepare_slots()
+
+        paths = [path for path, _ in pool.requests]
+        self.assertEqual(
+            [
+                "/slots/0?action=restore",
+                "/v1/chat/completions",
+                "/slots/0?action=save",
+                "/slots/1?action=restore",
+            ],
+            paths,
+        )
+        priming = pool.requests[1][1]
+        self.assertEqual(0, priming["id_slot"])
+        self.assertEqual("system", priming["messages"][0]["role"])
+        self.assertEqual(
+            pool.requests[0][1]["filename"], pool.requests[2][1]["filename"]
+        )
+
+
+def _token(token: str, alternatives: dict[str, float] | None = None) -> dict:
+    alternatives = alternatives or {token: 1.0}
+    return {
+        "token": token,
+        "logprob": math.log(alternatives.get(token, 1.0)),
+        "top_logprobs": [
+            {"token": alternative, "logprob": math.log(probability)}
+            for alternative, probability in alternatives.items()
+        ],
+    }
+
+
+class TestLlamafileResponseParsing(unittest.TestCase):
+    def test_payload_requests_logprobs_only_when_enabled(self):
+        provider = Llamafile()
+        plain = provider._build_payload([], InferenceOptions(temperature=0.4))
+        scored = provider._build_payload(
+            [], InferenceOptions(temperature=0.4, logprobs=True)
+        )
+
+        self.assertNotIn("logprobs", plain)
+        self.assertTrue(plain["cache_prompt"])
+        self.assertEqual("json_schema", plain["response_format"]["type"])
+        self.assertTrue(scored["logprobs"])
+
+    def test_payload_omits_schema_when_constrained_decoding_is_disabled(self):
+        provider = Llamafile(LlamafileOptions(constrained_decoding=False))
+
+        payload = provider._build_payload([], InferenceOptions(temperature=0.4))
+
+        self.assertNotIn("response_format", payload)
+
+    def test_parse_evaluation_extracts_true_probability(self):
+        content = json.dumps(
+            {"thoughts": "ok", "result": True, "explanation": None}
+        ).replace(": ", ":")
+        tokens = [
+            _token('{"thoughts":"ok","result":'),
+            _token("true", {"true": 0.6, "false": 0.2, "tr": 0.1, "x": 0.1}),
+            _token(',"explanation":null}'),
+        ]
+        response = {
+            "choices": [
+                {"message": {"content": content}, "logprobs": {"content": tokens}}
+            ]
+        }
+
+        evaluation = Llamafile._parse_evaluation(response)
+
+        self.assertTrue(evaluation.result)
+        self.assertAlmostEqual(
+            (0.6 + 0.1) / 0.9, evaluation.metadata["true_probability"]
+        )
+
+    def test_parse_evaluation_without_logprobs_has_no_probability(self):
+        response = {
+            "choices": [
+                {
+                    "message": {
+                        "content": '{"thoughts": "", "result": false, "explanation": "no"}'
+                    }
+                }
+            ]
+        }
+
+        evaluation = Llamafile._parse_evaluation(response)
+
+        self.assertFalse(evaluation.result)
+        self.assertNotIn("true_probability", evaluation.metadata)
+
+
+class TestProvisionArtifacts(unittest.TestCase):
+    def test_concurrent_callers_provision_one_at_a_time(self):
+        active = []
+        overlaps = []
+
+        def ensure_file(url, path, sha256, mirror=None, connections=None):
+            active.append(path)
+            if len(active) > 1:
+                overlaps.append(list(active))
+            time.sleep(0.01)
+            active.remove(path)
+
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            patch.object(
+                llamafile, "PROVISION_LOCK_FILE", Path(tmp_dir) / "provision.lock"
+            ),
+            patch.object(llamafile, "ensure_file", side_effect=ensure_file) as ensure,
+        ):
+            threads = [
+                threading.Thread(target=llamafile.provision_artifacts) for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(8, ensure.call_count)
+        self.assertEqual([], overlaps)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from intentguard.infrastructure import llamafile_config, llamafile_tuning
+from intentguard.infrastructure.llamafile_config import load_llamafile_options
+from intentguard.infrastructure.llamafile_options import (
+    CONTEXT_SIZE,
+    LlamafileOptions,
+)
+from intentguard.infrastructure.llamafile_tuning import (
+    AUTO_MIN_CONTEXT_SIZE,
+    KV_BYTES_PER_TOKEN_F16,
+    estimate_context_size,
+    resolve_server_settings,
+)
+
+
+class TestLoadLlamafileOptions(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp_dir.name)
+        self.nested = self.project / "src" / "pkg"
+        self.nested.mkdir(parents=True)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_defaults_without_configuration(self):
+        self.assertEqual(
+            LlamafileOptions(), load_llamafile_options(self.nested, environ={})
+        )
+
+    def test_pyproject_table_is_found_upward_and_env_overrides_it(self):
+        (self.project / "pyproject.toml").write_text(
+            "[tool.intentguard.llamafile]\n"
+            "parallel-slots = 4\n"
+            "threads = 8\n"
+            'cache_type_k = "q8_0"\n'
+            "mlock = true\n"
+        )
+
+        options = load_llamafile_options(
+            self.nested,
+            environ={
+                "INTENTGUARD_LLAMAFILE_THREADS": "auto",
+                "INTENTGUARD_LLAMAFILE_CONTEXT_SIZE": "8192",
+                "INTENTGUARD_LLAMAFILE_MMAP": "false",
+            },
+        )
+
+        self.assertEqual(
+            LlamafileOptions(
+                parallel_slots=4,
+                threads=None,
+                context_size=8192,
+                cache_type_k="q8_0",
+                mlock=True,
+                mmap=False,
+            ),
+            options,
+        )
+
+    def test_warns_when_pyproject_table_cannot_be_parsed(self):
+        (self.project / "pyproject.toml").write_text(
+            "[tool.intentguard.llamafile]\nthreads = 8\n"
+        )
+
+        with (
+            patch.object(llamafile_config, "tomllib", None),
+            self.assertLogs(llamafile_config.logger, "WARNING") as logs,
+        ):
+            options = load_llamafile_options(self.nested, environ={})
+
+        self.assertEqual(LlamafileOptions(), options)
+        self.assertIn("install tomli", logs.output[0])
+
+    def test_invalid_values_are_rejected(self):
+        with self.assertRaises(ValueError):
+            load_llamafile_options(
+                self.nested, environ={"INTENTGUARD_LLAMAFILE_MLOCK": "maybe"}
+            )
+        (self.project / "pyproject.toml").write_text(
+            '[tool.intentguard.llamafile]\nparallel_slots = "many"\n'
+        )
+        with self.assertRaises(ValueError):
+            load_llamafile_options(self.nested, environ={})
+
+
+class TestResolveServerSettings(unittest.TestCase):
+    def test_estimate_context_size_is_bounded_power_of_two(self):
+        self.assertEqual(AUTO_MIN_CONTEXT_SIZE, estimate_context_size(0))
+        self.assertEqual(16384, estimate_context_size(30000))
+        self.assertEqual(CONTEXT_SIZE, estimate_context_size(10**7))
+
+    def test_auto_settings_use_physical_cores_and_f16_cache(self):
+        with (
+            patch.object(llamafile_tuning, "physical_core_count", return_value=32),
+            patch.object(
+                llamafile_tuning, "available_memory_bytes", return_value=64 * 2**30
+            ),
+            self.assertLogs(llamafile_tuning.logger, "INFO") as logs,
+        ):
+            settings = resolve_server_settings(
+                LlamafileOptions(), Path("missing.gguf"), 8192
+            )
+
+        self.assertEqual(32, settings.threads)
+        self.assertEqual(8192, settings.context_size)
+        self.assertEqual(("f16", "f16"), (settings.cache_type_k, settings.cache_type_v))
+        self.assertFalse(settings.flash_attention)
+        self.assertIn("threads", logs.output[-1])
+
+    def test_kv_cache_is_quantized_when_memory_is_tight(self):
+        kv_bytes = KV_BYTES_PER_TOKEN_F16 * 4096 * 2
+        with patch.object(
+            llamafile_tuning, "available_memory_bytes", return_value=kv_bytes
+        ):
+            settings = resolve_server_settings(
+                LlamafileOptions(parallel_slots=2, threads=4),
+                Path("missing.gguf"),
+            )
+
+        self.assertEqual(4, settings.threads)
+        self.assertEqual(
+            ("q8_0", "q8_0"), (settings.cache_type_k, settings.cache_type_v)
+        )
+        self.assertTrue(settings.flash_attention)
+
+    def test_explicit_options_are_kept(self):
+        with patch.object(llamafile_tuning, "available_memory_bytes", return_value=1):
+            settings = resolve_server_settings(
+                LlamafileOptions(
+                    context_size=2048,
+                    cache_type_k="f16",
+                    cache_type_v="f16",
+                    flash_attention=False,
+                ),
+                Path("missing.gguf"),
+                16384,
+            )
+
+        self.assertEqual(2048, settings.context_size)
+        self.assertEqual(("f16", "f16"), (settings.cache_type_k, settings.cache_type_v))
+        self.assertFalse(settings.flash_attention)
+
+
+if __name__ == "__main__":
+    unittest.main()
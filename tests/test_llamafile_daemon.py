@@ -0,0 +1,332 @@
+import dataclasses
+import os
+import signal
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from intentguard.infrastructure import llamafile_daemon
+from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_daemon import (
+    CLIENTS_DIR,
+    DaemonClient,
+    DaemonState,
+    live_clients,
+    read_state,
+    run_daemon,
+    write_state,
+)
+from intentguard.infrastructure.llamafile_options import CONTEXT_SIZE, LlamafileOptions
+from intentguard.infrastructure.llamafile_tuning import ServerSettings
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Runs the real daemon entry point with the llamafile server replaced by a stub
+# that reports the port given as the first argument.
+STUB_DAEMON = """
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from intentguard.infrastructure import llamafile_daemon
+from intentguard.infrastructure.llamafile_tuning import ServerSettings
+
+port = int(sys.argv.pop(1))
+
+
+class StubServer:
+    def __init__(self, options):
+        self.options = options
+        self._process = self._port = self._settings = None
+
+    def _ensure_process(self, min_context_size=0):
+        self._process = SimpleNamespace(pid=424242)
+        self._port = port
+        self._settings = ServerSettings(4, 1, max(min_context_size, 4096), None,
+                                        "f16", "f16", False, False, True)
+
+    def shutdown(self):
+        pass
+
+
+with (
+    patch("intentguard.infrastructure.llamafile.Llamafile", StubServer),
+    patch.object(llamafile_daemon, "POLL_INTERVAL_SECONDS", 0.05),
+):
+    sys.exit(llamafile_daemon.main(sys.argv[1:]))
+"""
+
+SETTINGS = ServerSettings(
+    threads=4,
+    parallel_slots=1,
+    context_size=8192,
+    batch_size=None,
+    cache_type_k="f16",
+    cache_type_v="f16",
+    flash_attention=False,
+    mlock=False,
+    mmap=True,
+)
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _FakeProcess:
+    pid = 424242
+
+    def poll(self):
+        return None
+
+
+class _FakeServerProvider:
+    instances: List["_FakeServerProvider"] = []
+
+    def __init__(self, options):
+        self.options = options
+        self._process = None
+        self._port = None
+        self._settings = None
+        self.shut_down = False
+        _FakeServerProvider.instances.append(self)
+
+    def _ensure_process(self, min_context_size=0):
+        self._process = _FakeProcess()
+        self._port = 23456
+        self._settings = SETTINGS
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _publish(self, context_size=8192):
+        state = DaemonState(
+            pid=os.getpid(),
+            server_pid=os.getpid(),
+            port=self.port,
+            settings=dataclasses.asdict(
+                dataclasses.replace(SETTINGS, context_size=context_size)
+            ),
+        )
+        write_state(state)
+        return state
+
+
+class TestDaemonClient(DaemonTestCase):
+    def test_attaches_to_running_daemon_and_registers(self):
+        published = self._publish()
+        client = DaemonClient()
+
+        with patch.object(DaemonClient, "_spawn") as spawn:
+            state = client.attach(LlamafileOptions(daemon=True), 4096)
+
+        spawn.assert_not_called()
+        self.assertEqual(published, state)
+        self.assertEqual([client.client_id], live_clients())
+
+        client.detach()
+        self.assertEqual([], live_clients())
+
+    def test_spawns_when_no_daemon_is_running(self):
+        client = DaemonClient()
+        spawned = DaemonState(pid=1, server_pid=2, port=3, settings={})
+
+        with patch.object(DaemonClient, "_spawn", return_value=spawned) as spawn:
+            state = client.attach(LlamafileOptions(daemon=True), 4096)
+
+        spawn.assert_called_once()
+        self.assertIs(spawned, state)
+
+    def test_replaces_daemon_with_too_small_context(self):
+        self._publish(context_size=4096)
+        client = DaemonClient()
+
+        with (
+            patch.object(llamafile_daemon, "_stop_daemon") as stop,
+            patch.object(DaemonClient, "_spawn") as spawn,
+        ):
+            client.attach(LlamafileOptions(daemon=True), 16384)
+
+        stop.assert_called_once()
+        spawn.assert_called_once_with(LlamafileOptions(daemon=True), 16384)
+
+    def test_keeps_too_small_daemon_used_by_other_clients(self):
+        published = self._publish(context_size=4096)
+        other = DaemonClient()
+        other._register()
+        client = DaemonClient()
+
+        with (
+            patch.object(llamafile_daemon, "_stop_daemon") as stop,
+            patch.object(DaemonClient, "_spawn") as spawn,
+        ):
+            state = client.attach(LlamafileOptions(daemon=True), 16384)
+
+        stop.assert_not_called()
+        spawn.assert_not_called()
+        self.assertEqual(published, state)
+
+    def test_failed_attach_unregisters_client(self):
+        client = DaemonClient()
+
+        with patch.object(DaemonClient, "_spawn", side_effect=Exception("boom")):
+            with self.assertRaises(Exception):
+                client.attach(LlamafileOptions(daemon=True), 0)
+
+        self.assertEqual([], live_clients())
+
+    def test_clients_of_exited_processes_are_pruned(self):
+        CLIENTS_DIR.mkdir(parents=True)
+        (CLIENTS_DIR / f"{os.getpid()}-alive").touch()
+        (CLIENTS_DIR / "999999-gone").touch()
+
+        with patch.object(
+            llamafile_daemon, "pid_alive", side_effect=lambda pid: pid == os.getpid()
+        ):
+            clients = live_clients()
+
+        self.assertEqual([f"{os.getpid()}-alive"], clients)
+        self.assertEqual(clients, os.listdir(CLIENTS_DIR))
+
+
+class TestDaemonSpawn(DaemonTestCase):
+    def _attach_to_stub_daemon(self, client, environ=None):
+        port = self.port
+        daemon_command = DaemonClient._daemon_command
+
+        def stub_command(options, min_context_size):
+            command = daemon_command(options, min_context_size)
+            return [sys.executable, "-c", STUB_DAEMON, str(port), *command[3:]]
+
+        with (
+            patch.dict(os.environ, {"PYTHONPATH": str(REPO_ROOT), **(environ or {})}),
+            patch.object(DaemonClient, "_daemon_command", side_effect=stub_command),
+            patch.object(llamafile_daemon, "POLL_INTERVAL_SECONDS", 0.05),
+        ):
+            return client.attach(
+                LlamafileOptions(daemon=True, daemon_idle_timeout=0), 8192
+            )
+
+    def test_spawned_daemon_publishes_while_client_holds_the_lock(self):
+        client = DaemonClient()
+        state = self._attach_to_stub_daemon(client)
+
+        try:
+            self.assertEqual(self.port, state.port)
+            self.assertEqual(8192, state.settings["context_size"])
+            self.assertEqual(state, read_state())
+        finally:
+            client.detach()
+            daemon = client._daemon
+            assert daemon is not None
+            self.assertEqual(0, daemon.wait(timeout=30))
+        self.assertIsNone(read_state())
+
+    def test_daemon_exits_after_last_client_despite_client_environment(self):
+        client = DaemonClient()
+        self._attach_to_stub_daemon(
+            client,
+            {"INTENTGUARD_WARMUP": "1", "INTENTGUARD_LLAMAFILE_DAEMON": "1"},
+        )
+
+        client.detach()
+
+        daemon = client._daemon
+        assert daemon is not None
+        self.assertEqual(0, daemon.wait(timeout=10))
+        self.assertEqual([], live_clients())
+
+
+class TestLlamafileDaemonMode(DaemonTestCase):
+    def test_provider_attaches_and_shutdown_only_detaches(self):
+        self._publish()
+        provider = Llamafile(LlamafileOptions(daemon=True, context_size=8192))
+
+        provider._ensure_process()
+
+        self.assertEqual(self.port, provider._port)
+        self.assertEqual(SETTINGS, provider._settings)
+        self.assertTrue(provider._is_running())
+        self.assertIsNone(provider._process)
+
+        provider.shutdown()
+
+        self.assertFalse(provider._is_running())
+        self.assertEqual([], live_clients())
+        self.assertIsNotNone(read_state())
+
+    def test_automatic_context_attaches_with_full_context_size(self):
+        state = self._publish(context_size=CONTEXT_SIZE)
+        provider = Llamafile(LlamafileOptions(daemon=True))
+        assert provider._daemon is not None
+
+        with patch.object(provider._daemon, "attach", return_value=state) as attach:
+            provider._start_process(0)
+
+        attach.assert_called_once_with(provider.options, CONTEXT_SIZE)
+        provider.shutdown()
+
+
+class TestRunDaemon(DaemonTestCase):
+    def test_publishes_server_and_exits_when_idle(self):
+        previous_handler = signal.getsignal(signal.SIGTERM)
+        published = []
+        _FakeServerProvider.instances = []
+
+        def record_state(state):
+            published.append(state)
+            write_state(state)
+
+        try:
+            with (
+                patch(
+                    "intentguard.infrastructure.llamafile.Llamafile",
+                    _FakeServerProvider,
+                ),
+                patch.object(llamafile_daemon, "POLL_INTERVAL_SECONDS", 0.01),
+                patch(
+                    "intentguard.infrastructure.llamafile_daemon.write_state",
+                    side_effect=record_state,
+                ),
+            ):
+                run_daemon(LlamafileOptions(daemon=True, daemon_idle_timeout=0), 0)
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+        (provider,) = _FakeServerProvider.instances
+        self.assertFalse(provider.options.daemon)
+        self.assertEqual(23456, published[0].port)
+        self.assertEqual(_FakeProcess.pid, published[0].server_pid)
+        self.assertTrue(provider.shut_down)
+        self.assertIsNone(read_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,18 @@
+import asyncio
 import json
+import threading
+import time
 import unittest
+from concurrent.futures import CancelledError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import ClassVar
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
+from intentguard.app.cancellation import CancellationToken
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.message import Message
 from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_options import LlamafileOptions
 
 
 class _FakeResponse:
@@ -22,8 +31,11 @@ class _FakeHTTPConnection:
     def __init__(self, *_args, **_kwargs):
         self._response = None
 
-    def request(self, *_args, **_kwargs):
-        self._response = self.responses.pop(0)
+    def request(self, method, path, *_args, **_kwargs):
+        if path == "/health":
+            self._response = _FakeResponse(200, "OK", {"status": "ok"})
+        else:
+            self._response = self.responses.pop(0)
 
     def getresponse(self):
         return self._response
@@ -61,6 +73,105 @@ class TestLlamafileHttpRetry(unittest.TestCase):
 
         self.assertEqual(response["choices"][0]["message"]["content"], "ok")
 
+    def test_async_retries_when_model_is_loading(self):
+        bodies = [
+            (
+                "503 Service Unavailable",
+                {"error": {"message": "Loading model", "code": 503}},
+            ),
+            ("200 OK", {"choices": [{"message": {"content": "ok"}}]}),
+        ]
+
+        async def handle(reader, writer):
+            head = await reader.readuntil(b"\r\n\r\n")
+            if head.startswith(b"GET /health"):
+                status, body = "200 OK", {"status": "ok"}
+            else:
+                status, body = bodies.pop(0)
+            encoded = json.dumps(body).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Length: {len(encoded)}\r\n\r\n".encode()
+                + encoded
+            )
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            provider = Llamafile()
+            provider._port = server.sockets[0].getsockname()[1]
+            async with server:
+                with patch(
+                    "intentguard.infrastructure.llamafile.asyncio.sleep",
+                    new=AsyncMock(),
+                ):
+                    return await provider._send_http_request_async({"messages": []})
+
+        response = asyncio.run(run())
+
+        self.assertEqual(response["choices"][0]["message"]["content"], "ok")
+
+
+class _HangingHandler(BaseHTTPRequestHandler):
+    posts = 0
+    disconnected = threading.Event()
+
+    def do_POST(self):
+        type(self).posts += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        # Generate until the client goes away, like a server decoding tokens.
+        self.connection.settimeout(5)
+        if not self.connection.recv(1):
+            type(self).disconnected.set()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLlamafileCancellation(unittest.TestCase):
+    def setUp(self):
+        _HangingHandler.posts = 0
+        _HangingHandler.disconnected = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _HangingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_cancel_aborts_running_request_without_retry(self):
+        provider = Llamafile(LlamafileOptions(context_size=4096))
+        provider._port = self.server.server_address[1]
+        cancellation = CancellationToken()
+        threading.Timer(0.1, cancellation.cancel).start()
+        start = time.monotonic()
+
+        with patch.object(provider, "_ensure_process"):
+            with self.assertRaises(CancelledError):
+                provider.predict_cancellable(
+                    [Message(content="x", role="user")],
+                    InferenceOptions(temperature=0.4),
+                    cancellation,
+                )
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(_HangingHandler.disconnected.wait(2))
+        self.assertEqual(1, _HangingHandler.posts)
+
+    def test_cancelled_token_sends_no_request(self):
+        provider = Llamafile(LlamafileOptions(context_size=4096))
+        cancellation = CancellationToken()
+        cancellation.cancel()
+
+        with self.assertRaises(CancelledError):
+            provider.predict_cancellable(
+                [Message(content="x", role="user")],
+                InferenceOptions(temperature=0.4),
+                cancellation,
+            )
+
+        self.assertEqual(0, _HangingHandler.posts)
+
 
 if __name__ == "__main__":
     unittest.main()
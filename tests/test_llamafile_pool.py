@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import unittest
+from typing import List
+from unittest.mock import patch
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.domain.evaluation import Evaluation
+from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_options import LlamafileOptions
+from intentguard.infrastructure.llamafile_pool import LlamafilePool
+from intentguard.infrastructure.llamafile_tuning import ServerSettings, partition_cpus
+
+
+class _FakeWorker:
+    def __init__(self, running: bool = True):
+        self.running = running
+        self.exited = False
+        self.warmups = 0
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def _is_running(self, min_context_size: int = 0) -> bool:
+        return self.running
+
+    def _discard_exited_process(self) -> bool:
+        if not self.exited:
+            return False
+        self.exited = False
+        self.running = False
+        return True
+
+    def warmup(self, prime: bool = True) -> None:
+        self.warmups += 1
+
+    def predict(self, prompt, inference_options) -> Evaluation:
+        self.calls += 1
+        self.release.wait(5)
+        return Evaluation(result=True, explanation=None)
+
+    async def predict_async(self, prompt, inference_options) -> Evaluation:
+        self.calls += 1
+        return Evaluation(result=True, explanation=None)
+
+
+class _AliveProcess:
+    def __init__(self, exited: bool = False):
+        self.exited = exited
+
+    def poll(self):
+        return 1 if self.exited else None
+
+
+def _pool_with(workers: List[_FakeWorker]) -> LlamafilePool:
+    pool = LlamafilePool(workers=len(workers), options=LlamafileOptions(threads=1))
+    pool._workers = workers  # type: ignore[assignment]
+    pool._in_flight = [0] * len(workers)
+    return pool
+
+
+class TestLlamafilePool(unittest.TestCase):
+    def test_rejects_empty_pool(self):
+        with self.assertRaises(ValueError):
+            LlamafilePool(workers=0, options=LlamafileOptions())
+
+    def test_dispatch_does_not_wait_for_a_booting_worker(self):
+        pool = LlamafilePool(workers=2, options=LlamafileOptions(context_size=4096))
+        booting, healthy = pool.workers
+        healthy._process = _AliveProcess()  # type: ignore[assignment]
+        healthy._settings = ServerSettings(
+            1, 1, 4096, None, "f16", "f16", False, False, True
+        )
+        booting._process = _AliveProcess(exited=True)  # type: ignore[assignment]
+        picked: List[int] = []
+
+        with booting._process_lock:
+            thread = threading.Thread(target=lambda: picked.append(pool._acquire()))
+            thread.start()
+            thread.join(1)
+            self.assertFalse(thread.is_alive())
+        booting._process = healthy._process = None
+
+        self.assertEqual([1], picked)
+
+    def test_divides_automatic_threads_between_workers(self):
+        with patch(
+            "intentguard.infrastructure.llamafile_pool.physical_core_count",
+            return_value=8,
+        ):
+            pool = LlamafilePool(workers=4, options=LlamafileOptions(daemon=True))
+
+        for worker in pool.workers:
+            self.assertEqual(2, worker.options.threads)
+            self.assertFalse(worker.options.daemon)
+            self.assertIsNone(worker.cpu_set)
+
+    def test_pinned_workers_get_disjoint_cpu_sets(self):
+        with patch(
+            "intentguard.infrastructure.llamafile_pool.partition_cpus",
+            return_value=[{0, 1}, {2, 3}],
+        ):
+            pool = LlamafilePool(workers=2, options=LlamafileOptions(), pin_cpus=True)
+
+        self.assertEqual([{0, 1}, {2, 3}], [w.cpu_set for w in pool.workers])
+        self.assertEqual([2, 2], [w.options.threads for w in pool.workers])
+
+    def test_requests_spread_round_robin_when_idle(self):
+        workers = [_FakeWorker(), _FakeWorker(), _FakeWorker()]
+        pool = _pool_with(workers)
+
+        for _ in range(6):
+            pool.predict([], InferenceOptions(temperature=0.4))
+
+        self.assertEqual([2, 2, 2], [w.calls for w in workers])
+        self.assertEqual([0, 0, 0], pool._in_flight)
+
+    def test_busy_worker_is_skipped(self):
+        workers = [_FakeWorker(), _FakeWorker()]
+        workers[0].release.clear()
+        pool = _pool_with(workers)
+        blocked = threading.Thread(
+            target=pool.predict, args=([], InferenceOptions(temperature=0.4))
+        )
+        blocked.start()
+        while workers[0].calls == 0:
+            pass
+
+        pool.predict([], InferenceOptions(temperature=0.4))
+        pool.predict([], InferenceOptions(temperature=0.4))
+
+        self.assertEqual(2, workers[1].calls)
+        workers[0].release.set()
+        blocked.join()
+
+    def test_crashed_worker_is_restarted_and_avoided(self):
+        workers = [_FakeWorker(), _FakeWorker()]
+        workers[0].exited = True
+        pool = _pool_with(workers)
+
+        pool.predict([], InferenceOptions(temperature=0.4))
+        pool.predict([], InferenceOptions(temperature=0.4))
+
+        self.assertEqual(1, workers[0].warmups)
+        self.assertEqual(0, workers[0].calls)
+        self.assertEqual(2, workers[1].calls)
+
+    def test_predict_async_dispatches_to_worker(self):
+        workers = [_FakeWorker(), _FakeWorker()]
+        pool = _pool_with(workers)
+
+        async def run():
+            return await asyncio.gather(
+                pool.predict_async([], InferenceOptions(temperature=0.4)),
+                pool.predict_async([], InferenceOptions(temperature=0.4)),
+            )
+
+        results = asyncio.run(run())
+
+        self.assertTrue(all(e.result for e in results))
+        self.assertEqual([1, 1], [w.calls for w in workers])
+
+
+class TestCpuPinning(unittest.TestCase):
+    def test_partition_cpus_splits_contiguously(self):
+        with patch("os.sched_getaffinity", return_value={0, 1, 2, 3, 4}, create=True):
+            self.assertEqual([{0, 1, 2}, {3, 4}], partition_cpus(2))
+            self.assertEqual(
+                [{0}, {1}, {2}, {3}, {4}, {0}],
+                partition_cpus(6),
+            )
+
+    def test_server_process_is_pinned(self):
+        provider = Llamafile(LlamafileOptions(), cpu_set={2, 3})
+
+        class _Process:
+            pid = 1234
+
+        with patch("os.sched_setaffinity", create=True) as set_affinity:
+            provider._pin_process(_Process())  # type: ignore[arg-type]
+
+        set_affinity.assert_called_once_with(1234, {2, 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from intentguard.infrastructure.llamafile_readiness import (
+    ReadinessState,
+    ServerReadiness,
+    ServerStartupError,
+    health_status,
+)
+
+
+class _LoadingHandler(BaseHTTPRequestHandler):
+    statuses: List[int] = []
+
+    def do_GET(self):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _ExitedProcess:
+    def poll(self):
+        return 3
+
+
+class TestServerReadiness(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _LoadingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_waits_through_loading_phase(self):
+        _LoadingHandler.statuses = [503, 503, 200]
+        readiness = ServerReadiness()
+        states = []
+        original = readiness._set_state
+
+        def record(state):
+            states.append(state)
+            original(state)
+
+        readiness._set_state = record  # type: ignore[method-assign]
+        readiness.reset(ReadinessState.STARTING)
+
+        readiness.wait_ready(self.port, None, timeout=5)
+
+        self.assertEqual(ReadinessState.READY, readiness.state)
+        self.assertIn(ReadinessState.LOADING, states)
+
+    def test_concurrent_callers_share_one_probe(self):
+        _LoadingHandler.statuses = [503] * 5 + [200]
+        readiness = ServerReadiness()
+        errors = []
+
+        def wait():
+            try:
+                readiness.wait_ready(self.port, None, timeout=5)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=wait) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual(ReadinessState.READY, readiness.state)
+
+    def test_exited_process_fails_fast(self):
+        readiness = ServerReadiness()
+
+        with self.assertRaisesRegex(ServerStartupError, "exited with status 3"):
+            readiness.wait_ready(self.port, _ExitedProcess(), timeout=5)  # type: ignore[arg-type]
+
+        self.assertEqual(ReadinessState.FAILED, readiness.state)
+
+    def test_times_out_while_loading(self):
+        _LoadingHandler.statuses = [503]
+        readiness = ServerReadiness()
+
+        with self.assertRaises(ServerStartupError):
+            readiness.wait_ready(self.port, None, timeout=0.2)
+
+    def test_health_status_of_unreachable_server(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        self.assertIsNone(health_status(port, timeout=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
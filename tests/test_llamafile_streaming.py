@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.infrastructure.chat_stream import ChatStream
+from intentguard.infrastructure.llamafile import Llamafile
+
+_DELTAS = ['{"result": ', "false", ', "explanation": "No', ' retries"', ', "extra": "']
+_TRAILING = "never read"
+
+
+def _chunked_event_stream() -> bytes:
+    events = [
+        {"choices": [{"delta": {"content": delta}, "finish_reason": None}]}
+        for delta in [*_DELTAS, _TRAILING]
+    ]
+    body = b""
+    for event in events:
+        data = f"data: {json.dumps(event)}\n\n".encode()
+        body += f"{len(data):x}\r\n".encode() + data + b"\r\n"
+    return body + b"0\r\n\r\n"
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.write(_chunked_event_stream())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestChatStream(unittest.TestCase):
+    def test_stops_once_verdict_is_complete(self):
+        stream = ChatStream()
+        lines = _chunked_event_stream().split(b"\r\n")
+        events = [line for line in lines if line.startswith(b"data:")]
+
+        consumed = 0
+        for line in events:
+            consumed += 1
+            if stream.feed_line(line):
+                break
+
+        self.assertTrue(stream.stopped_early)
+        self.assertEqual(4, consumed)
+        self.assertEqual('{"result": false, "explanation": "No retries"', stream.text)
+
+    def test_true_verdict_stops_without_explanation(self):
+        stream = ChatStream()
+        event = {"choices": [{"delta": {"content": '{"result": true'}}]}
+
+        self.assertTrue(stream.feed_line(f"data: {json.dumps(event)}".encode()))
+
+    def test_done_marker_finishes_stream(self):
+        stream = ChatStream()
+
+        self.assertFalse(stream.feed_line(b": keep-alive"))
+        self.assertTrue(stream.feed_line(b"data: [DONE]"))
+        self.assertFalse(stream.stopped_early)
+
+
+class TestLlamafileStreaming(unittest.TestCase):
+    def _payload(self):
+        provider = Llamafile()
+        return provider, provider._build_payload(
+            [], InferenceOptions(temperature=0.4, verdict_first=True, max_tokens=64)
+        )
+
+    def test_verdict_first_payload_streams_short_schema(self):
+        _, payload = self._payload()
+
+        self.assertTrue(payload["stream"])
+        self.assertEqual(64, payload["max_tokens"])
+        schema = payload["response_format"]["json_schema"]["schema"]
+        self.assertEqual(["result", "explanation"], list(schema["properties"]))
+
+    def test_sync_stream_stops_at_verdict(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            provider, payload = self._payload()
+            provider._port = server.server_address[1]
+
+            response = provider._stream_http_request(payload)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        evaluation = Llamafile._parse_evaluation(response)
+        self.assertFalse(evaluation.result)
+        self.assertEqual("No retries", evaluation.explanation)
+        self.assertNotIn(_TRAILING, response["choices"][0]["message"]["content"])
+
+    def test_async_stream_stops_at_verdict(self):
+        async def handle(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                + _chunked_event_stream()
+            )
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            provider, payload = self._payload()
+            provider._port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await provider._stream_http_request_async(payload)
+
+        response = asyncio.run(run())
+
+        evaluation = Llamafile._parse_evaluation(response)
+        self.assertFalse(evaluation.result)
+        self.assertEqual("No retries", evaluation.explanation)
+        self.assertNotIn(_TRAILING, response["choices"][0]["message"]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,363 @@
+import asyncio
+import dataclasses
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.message import Message
+from intentguard.infrastructure.llamafile import Llamafile
+from intentguard.infrastructure.llamafile_options import LlamafileOptions
+from intentguard.infrastructure.llamafile_readiness import ServerStartupError
+from intentguard.infrastructure.llamafile_supervisor import ServerSupervisor
+from intentguard.infrastructure.llamafile_tuning import ServerSettings
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"status": "ok"}'
+        self.send_response(200 if self.path == "/health" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _FakeProcess:
+    def __init__(self, status=None):
+        self.status = status
+
+    def poll(self):
+        return self.status
+
+    def kill(self):
+        self.status = -9
+
+
+class _FakeProvider:
+    def __init__(self, port, keep_warm=None):
+        self.options = LlamafileOptions(keep_warm=keep_warm)
+        self._process = _FakeProcess()
+        self._port = port
+        self._attached = False
+        self._min_context_size = 4096
+        self._process_lock = threading.Lock()
+        self.restarted_with = []
+
+    def _stop_process(self):
+        self._process = None
+        self._port = None
+
+    def _ensure_process(self, min_context_size=0):
+        self.restarted_with.append(min_context_size)
+        self._process = _FakeProcess()
+        self._port = 1
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestServerSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_healthy_server_is_left_running(self):
+        provider = _FakeProvider(self.port)
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+
+        self.assertTrue(supervisor.check())
+        supervisor.report_failure(TimeoutError("slow"))
+
+        self.assertEqual([], provider.restarted_with)
+        metrics = supervisor.metrics
+        self.assertEqual(0, metrics.restarts)
+        self.assertEqual(1, metrics.retried_requests)
+
+    def test_exited_server_is_restarted(self):
+        provider = _FakeProvider(self.port)
+        provider._process = _FakeProcess(status=1)
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+
+        self.assertFalse(supervisor.check())
+
+        self.assertEqual([4096], provider.restarted_with)
+        metrics = supervisor.metrics
+        self.assertEqual(1, metrics.crashes)
+        self.assertEqual(1, metrics.restarts)
+        self.assertGreaterEqual(metrics.downtime_seconds, 0.0)
+
+    def test_unresponsive_server_is_restarted_after_repeated_failures(self):
+        provider = _FakeProvider(_closed_port())
+        supervisor = ServerSupervisor(provider, hung_after=3)  # type: ignore[arg-type]
+
+        supervisor.check()
+        supervisor.check()
+        self.assertEqual([], provider.restarted_with)
+        supervisor.check()
+
+        self.assertEqual([4096], provider.restarted_with)
+        metrics = supervisor.metrics
+        self.assertEqual(3, metrics.failed_health_checks)
+        self.assertEqual(1, metrics.hangs)
+
+    def test_failed_request_and_health_check_restart_at_once(self):
+        provider = _FakeProvider(_closed_port())
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+
+        supervisor.report_failure(ConnectionResetError())
+
+        self.assertEqual([4096], provider.restarted_with)
+
+    def test_stopped_server_is_not_started(self):
+        provider = _FakeProvider(self.port)
+        provider._stop_process()
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+
+        self.assertTrue(supervisor.check())
+        self.assertEqual([], provider.restarted_with)
+
+
+class TestExclusive(unittest.TestCase):
+    def test_waits_for_requests_in_flight_and_holds_back_new_ones(self):
+        supervisor = ServerSupervisor(_FakeProvider(1))  # type: ignore[arg-type]
+        in_flight = threading.Event()
+        finish = threading.Event()
+        events = []
+
+        def request():
+            with supervisor.track_request():
+                in_flight.set()
+                finish.wait(5)
+                events.append("in-flight request done")
+
+        def new_request():
+            with supervisor.track_request():
+                events.append("new request started")
+
+        threading.Thread(target=request).start()
+        in_flight.wait(5)
+        threading.Timer(0.1, finish.set).start()
+
+        with supervisor.track_request(), supervisor.exclusive(timeout=5):
+            events.append("restart")
+            late = threading.Thread(target=new_request)
+            late.start()
+            late.join(0.1)
+            self.assertTrue(late.is_alive())
+        late.join(5)
+
+        self.assertEqual(
+            ["in-flight request done", "restart", "new request started"], events
+        )
+
+    def test_threads_waiting_to_be_exclusive_do_not_block_each_other(self):
+        supervisor = ServerSupervisor(_FakeProvider(1))  # type: ignore[arg-type]
+        ready = threading.Barrier(2)
+        restarts = []
+
+        def restart():
+            with supervisor.track_request():
+                ready.wait(5)
+                with supervisor.exclusive(timeout=5):
+                    restarts.append(threading.get_ident())
+
+        threads = [threading.Thread(target=restart) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(2, len(restarts))
+
+    def test_async_request_resizing_the_server_does_not_wait_for_itself(self):
+        provider = Llamafile(LlamafileOptions())
+        provider._process = _FakeProcess()  # type: ignore[assignment]
+        provider._settings = ServerSettings(
+            4, 1, 4096, None, "f16", "f16", False, False, True
+        )
+
+        def start(min_context_size):
+            provider._settings = dataclasses.replace(
+                provider._settings, context_size=min_context_size
+            )
+
+        async def send(payload):
+            return {"choices": [{"message": {"content": '{"result": true}'}}]}
+
+        with (
+            patch("intentguard.infrastructure.llamafile.INFERENCE_TIMEOUT_SECONDS", 3),
+            patch.object(provider, "_start_process", side_effect=start) as restart,
+            patch.object(provider, "_send_http_request_async", side_effect=send),
+            patch.object(provider, "_stream_http_request_async", side_effect=send),
+        ):
+            started = time.monotonic()
+            evaluation = asyncio.run(
+                provider.predict_async(
+                    [Message(content="x", role="user")],
+                    InferenceOptions(temperature=0.4),
+                )
+            )
+
+        self.assertTrue(evaluation.result)
+        restart.assert_called_once()
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_async_request_waits_for_exclusive_without_blocking_the_loop(self):
+        supervisor = ServerSupervisor(_FakeProvider(1))  # type: ignore[arg-type]
+        holding = threading.Event()
+        release = threading.Event()
+
+        def restart():
+            with supervisor.exclusive(timeout=5):
+                holding.set()
+                release.wait(5)
+
+        async def main():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while not release.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            async def request():
+                async with supervisor.track_request_async():
+                    return ticks
+
+            ticker = asyncio.ensure_future(tick())
+            waiting = asyncio.ensure_future(request())
+            await asyncio.sleep(0.1)
+            self.assertFalse(waiting.done())
+            release.set()
+            ticks_at_start = await waiting
+            await ticker
+            return ticks_at_start
+
+        thread = threading.Thread(target=restart)
+        thread.start()
+        holding.wait(5)
+        self.assertGreater(asyncio.run(main()), 1)
+        thread.join(5)
+
+
+class TestKeepWarm(unittest.TestCase):
+    def test_idle_server_is_shut_down_after_keep_warm(self):
+        provider = _FakeProvider(1, keep_warm=0)
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+        supervisor.server_started(2.5)
+
+        self.assertTrue(supervisor.shutdown_if_idle())
+
+        self.assertIsNone(provider._process)
+        metrics = supervisor.metrics
+        self.assertEqual(1, metrics.idle_shutdowns)
+        self.assertEqual(1, metrics.starts)
+        self.assertEqual(2.5, metrics.startup_seconds)
+
+    def test_server_is_kept_while_a_request_is_in_flight(self):
+        provider = _FakeProvider(1, keep_warm=0)
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+        supervisor.server_started(0.0)
+
+        with supervisor.track_request():
+            self.assertFalse(supervisor.shutdown_if_idle())
+
+        self.assertIsNotNone(provider._process)
+
+    def test_server_is_kept_without_keep_warm(self):
+        provider = _FakeProvider(1)
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+        supervisor.server_started(0.0)
+
+        self.assertFalse(supervisor.shutdown_if_idle())
+        self.assertIsNotNone(provider._process)
+
+    def test_warm_and_idle_time_are_measured(self):
+        provider = _FakeProvider(1)
+        supervisor = ServerSupervisor(provider)  # type: ignore[arg-type]
+        clock = [100.0]
+
+        with patch(
+            "intentguard.infrastructure.llamafile_supervisor.time.monotonic",
+            side_effect=lambda: clock[0],
+        ):
+            supervisor.server_started(1.0)
+            clock[0] = 103.0
+            with supervisor.track_request():
+                clock[0] = 108.0
+            clock[0] = 110.0
+            supervisor.server_stopped()
+            clock[0] = 200.0
+            metrics = supervisor.metrics
+
+        self.assertEqual(10.0, metrics.warm_seconds)
+        self.assertEqual(5.0, metrics.idle_seconds)
+
+
+class TestLlamafileRetry(unittest.TestCase):
+    def test_failed_request_is_retried_without_killing_the_server(self):
+        provider = Llamafile(LlamafileOptions(context_size=4096))
+        responses = [
+            ConnectionResetError("reset"),
+            {"choices": [{"message": {"content": '{"result": true}'}}]},
+        ]
+
+        def send(payload):
+            response = responses.pop(0)
+            if isinstance(response, BaseException):
+                raise response
+            return response
+
+        with (
+            patch.object(provider, "_ensure_process"),
+            patch.object(provider, "_send_http_request", side_effect=send),
+            patch.object(provider, "shutdown") as shutdown,
+            patch.object(provider._supervisor, "report_failure") as report,
+            patch("intentguard.infrastructure.llamafile.time.sleep") as sleep,
+        ):
+            evaluation = provider.predict(
+                [Message(content="x", role="user")], InferenceOptions(temperature=0.4)
+            )
+
+        self.assertTrue(evaluation.result)
+        shutdown.assert_not_called()
+        report.assert_called_once()
+        sleep.assert_called_once()
+
+    def test_startup_timeout_is_not_retried(self):
+        provider = Llamafile(LlamafileOptions(context_size=4096))
+        startup_error = ServerStartupError("failed to start within 120 seconds")
+
+        with (
+            patch.object(
+                provider, "_ensure_process", side_effect=startup_error
+            ) as ensure,
+            patch.object(provider._supervisor, "report_failure") as report,
+        ):
+            with self.assertRaises(ServerStartupError):
+                provider.predict(
+                    [Message(content="x", role="user")],
+                    InferenceOptions(temperature=0.4),
+                )
+
+        ensure.assert_called_once()
+        report.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
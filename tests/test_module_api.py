@@ -1,9 +1,17 @@
+import asyncio
+import threading
+import time
 import unittest
+from concurrent.futures import CancelledError
+from unittest.mock import patch
 
 import intentguard as ig
+from intentguard.app.async_inference_provider import AsyncInferenceProvider
+from intentguard.app.cancellation import CancellationToken
 from intentguard.app.inference_options import InferenceOptions
 from intentguard.app.inference_provider import InferenceProvider
 from intentguard.app.judgement_cache import JudgementCache
+from intentguard.app.judgement_cache_key import JudgementCacheKey
 from intentguard.app.message import Message
 from intentguard.app.prompt_factory import PromptFactory
 from intentguard.domain.code_object import CodeObject
@@ -27,34 +35,200 @@ class FakeInferenceProvider(InferenceProvider):
         return self.result
 
 
+class SequenceInferenceProvider(InferenceProvider):
+    def __init__(self, results: list[bool]) -> None:
+        self.results = list(results)
+
+    def predict(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        result = self.results.pop(0)
+        return Evaluation(result=result, explanation=None if result else "failed")
+
+
+class ConcurrencyTrackingProvider(InferenceProvider):
+    def __init__(self) -> None:
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def predict(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return Evaluation(result=True, explanation=None)
+
+
+class CancellableProvider(InferenceProvider):
+    """Answers the first vote once all have started; the rest run until cancelled."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.aborted = 0
+        self._lock = threading.Lock()
+        self._started = threading.Barrier(3)
+
+    def predict(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        raise AssertionError("concurrent votes must be cancellable")
+
+    def predict_cancellable(
+        self,
+        prompt: list[Message],
+        inference_options: InferenceOptions,
+        cancellation: CancellationToken,
+    ) -> Evaluation:
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        self._started.wait(5)
+        if first:
+            return Evaluation(result=True, explanation=None)
+        aborted = threading.Event()
+        cancellation.register(aborted.set)
+        if not aborted.wait(5):
+            return Evaluation(result=True, explanation=None)
+        with self._lock:
+            self.aborted += 1
+        raise CancelledError()
+
+
+class FakeAsyncInferenceProvider(InferenceProvider, AsyncInferenceProvider):
+    def __init__(self, result: Evaluation) -> None:
+        self.result = result
+        self.sync_calls = 0
+        self.async_calls = 0
+        self.completed = 0
+        self.active = 0
+        self.max_active = 0
+
+    def predict(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        self.sync_calls += 1
+        return self.result
+
+    async def predict_async(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        self.async_calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.active -= 1
+        self.completed += 1
+        return self.result
+
+
 class FakePromptFactory(PromptFactory):
     def create_prompt(
         self, expectation: str, code_objects: list[CodeObject]
     ) -> list[Message]:
         return [Message(content=expectation, role="user")]
 
+    def create_fast_prompt(
+        self, expectation: str, code_objects: list[CodeObject]
+    ) -> list[Message]:
+        return [Message(content=f"{expectation} (fast)", role="user")]
+
 
 class NoopJudgementCache(JudgementCache):
-    def get(
-        self,
-        prompt: list[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-    ) -> Evaluation | None:
+    def get(self, key: JudgementCacheKey) -> Evaluation | None:
         return None
 
-    def put(
-        self,
-        prompt: list[Message],
-        inference_options: InferenceOptions,
-        judgement_options: JudgementOptions,
-        judgement: Evaluation,
-    ) -> None:
+    def put(self, key: JudgementCacheKey, judgement: Evaluation) -> None:
         pass
 
 
+class RecordingJudgementCache(NoopJudgementCache):
+    def __init__(self) -> None:
+        self.get_many_calls: list[int] = []
+        self.stored: dict[JudgementCacheKey, Evaluation] = {}
+
+    def get_many(self, keys: list[JudgementCacheKey]) -> list[Evaluation | None]:
+        self.get_many_calls.append(len(keys))
+        return [self.stored.get(key) for key in keys]
+
+    def put(self, key: JudgementCacheKey, judgement: Evaluation) -> None:
+        self.stored[key] = judgement
+
+
+def _cache_key(
+    expectation: str,
+    inference_options: InferenceOptions = InferenceOptions(temperature=0.4),
+    options: ig.IntentGuardOptions = ig.IntentGuardOptions(),
+) -> JudgementCacheKey:
+    return ig.IntentGuard._cache_key(
+        expectation,
+        CodeObject.from_dict({"subject": sample_subject}),
+        inference_options,
+        JudgementOptions(),
+        options,
+    )
+
+
+def _vote_keys(expectation: str, count: int) -> list[JudgementCacheKey]:
+    key = _cache_key(expectation)
+    return [
+        key.vote_key(InferenceOptions(temperature=0.4), sample)
+        for sample in range(count)
+    ]
+
+
+class PromptEchoProvider(InferenceProvider):
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self._lock = threading.Lock()
+
+    def predict(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        with self._lock:
+            self.prompts.append(prompt[0].content)
+        return Evaluation(result="pass" in prompt[0].content, explanation="echo")
+
+
+class TwoPhaseProvider(InferenceProvider):
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, InferenceOptions]] = []
+        self._lock = threading.Lock()
+
+    def predict(
+        self, prompt: list[Message], inference_options: InferenceOptions
+    ) -> Evaluation:
+        content = prompt[0].content
+        with self._lock:
+            self.calls.append((content, inference_options))
+        passed = "pass" in content
+        if content.endswith("(fast)"):
+            return Evaluation(result=passed, explanation=None if passed else "short")
+        return Evaluation(result=passed, explanation=None if passed else "reasoned")
+
+
+class DictJudgementCache(NoopJudgementCache):
+    def __init__(self) -> None:
+        self.entries: dict[str, Evaluation] = {}
+
+    def get(self, key: JudgementCacheKey) -> Evaluation | None:
+        return self.entries.get(key.digest)
+
+    def put(self, key: JudgementCacheKey, judgement: Evaluation) -> None:
+        self.entries[key.digest] = judgement
+
+
 class ModuleApiTests(unittest.TestCase):
     def setUp(self) -> None:
+        ig.IntentGuard._install_default_providers()
         self.original_inference_provider = ig.IntentGuard._inference_provider
         self.original_prompt_factory = ig.IntentGuard._prompt_factory
         self.original_judgement_cache = ig.IntentGuard._judgement_cache_provider
@@ -97,7 +271,7 @@ class ModuleApiTests(unittest.TestCase):
 
     def test_default_options_affect_module_level_calls(self) -> None:
         ig.set_default_options(
-            ig.IntentGuardOptions(num_evaluations=3, temperature=0.2)
+            ig.IntentGuardOptions(num_evaluations=3, temperature=0.2, early_exit=False)
         )
 
         ig.test_code("sample should pass", {"subject": sample_subject})
@@ -140,7 +314,7 @@ class ModuleApiTests(unittest.TestCase):
 
     def test_empty_instance_uses_updated_defaults(self) -> None:
         ig.set_default_options(
-            ig.IntentGuardOptions(num_evaluations=4, temperature=0.3)
+            ig.IntentGuardOptions(num_evaluations=4, temperature=0.3, early_exit=False)
         )
         guard = ig.IntentGuard()
 
@@ -152,6 +326,420 @@ class ModuleApiTests(unittest.TestCase):
             [options.temperature for options in self.provider.inference_options],
         )
 
+    def test_votes_run_concurrently_up_to_max_concurrency(self) -> None:
+        provider = ConcurrencyTrackingProvider()
+        ig.IntentGuard.set_inference_provider(provider)
+
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(
+                num_evaluations=5, max_concurrency=3, early_exit=False
+            ),
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(5, provider.calls)
+        self.assertEqual(3, provider.max_active)
+
+    def test_votes_run_sequentially_by_default(self) -> None:
+        provider = ConcurrencyTrackingProvider()
+        ig.IntentGuard.set_inference_provider(provider)
+
+        ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(num_evaluations=3, early_exit=False),
+        )
+
+        self.assertEqual(3, provider.calls)
+        self.assertEqual(1, provider.max_active)
+
+    def test_module_test_code_async_uses_native_coroutine(self) -> None:
+        provider = FakeAsyncInferenceProvider(Evaluation(result=True, explanation=None))
+        ig.IntentGuard.set_inference_provider(provider)
+
+        evaluation = asyncio.run(
+            ig.test_code_async(
+                "sample should pass",
+                {"subject": sample_subject},
+                options=ig.IntentGuardOptions(
+                    num_evaluations=4, max_concurrency=2, early_exit=False
+                ),
+            )
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(4, provider.async_calls)
+        self.assertEqual(0, provider.sync_calls)
+        self.assertEqual(2, provider.max_active)
+
+    def test_module_test_code_async_falls_back_to_sync_provider(self) -> None:
+        evaluation = asyncio.run(
+            ig.test_code_async(
+                "sample should pass",
+                {"subject": sample_subject},
+                options=ig.IntentGuardOptions(num_evaluations=3, early_exit=False),
+            )
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(3, len(self.provider.inference_options))
+
+    def test_module_assert_code_async_raises_existing_format_when_false(
+        self,
+    ) -> None:
+        self.provider.result = Evaluation(result=False, explanation="sample failed")
+
+        with self.assertRaises(AssertionError) as cm:
+            asyncio.run(
+                ig.assert_code_async("sample should pass", {"subject": sample_subject})
+            )
+
+        self.assertEqual(
+            'Expected "sample should pass" to be true, but it was false.\n'
+            "Explanation: sample failed",
+            str(cm.exception),
+        )
+
+    def test_module_test_many_deduplicates_and_keeps_input_order(self) -> None:
+        provider = PromptEchoProvider()
+        cache = RecordingJudgementCache()
+        ig.IntentGuard.set_inference_provider(provider)
+        ig.IntentGuard.set_judgement_cache_provider(cache)
+        options = ig.IntentGuardOptions(
+            num_evaluations=3, max_concurrency=4, early_exit=False
+        )
+        cache.stored[_cache_key("cached should fail", options=options)] = Evaluation(
+            result=True, explanation=None
+        )
+
+        evaluations = ig.test_many(
+            [
+                ("a should pass", {"subject": sample_subject}),
+                ("b should fail", {"subject": sample_subject}),
+                ("a should pass", {"subject": sample_subject}),
+                ("cached should fail", {"subject": sample_subject}),
+            ],
+            options=options,
+        )
+
+        self.assertEqual(
+            [True, False, True, True],
+            [evaluation.result for evaluation in evaluations],
+        )
+        self.assertEqual([3, 6], cache.get_many_calls)
+        self.assertEqual(
+            ["a should pass"] * 3 + ["b should fail"] * 3, sorted(provider.prompts)
+        )
+        self.assertEqual(
+            {
+                _cache_key("a should pass", options=options),
+                _cache_key("b should fail", options=options),
+                _cache_key("cached should fail", options=options),
+                *_vote_keys("a should pass", 3),
+                *_vote_keys("b should fail", 3),
+            },
+            set(cache.stored),
+        )
+
+    def test_early_exit_skips_votes_that_cannot_change_the_verdict(self) -> None:
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(num_evaluations=5),
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(3, len(self.provider.inference_options))
+
+    def test_strict_mode_stops_at_first_negative_vote(self) -> None:
+        self.provider.result = Evaluation(result=False, explanation="sample failed")
+
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(num_evaluations=5, aggregation_mode="strict"),
+        )
+
+        self.assertFalse(evaluation.result)
+        self.assertEqual("sample failed", evaluation.explanation)
+        self.assertEqual(1, len(self.provider.inference_options))
+
+    def test_adaptive_sampling_stops_once_confident(self) -> None:
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(
+                early_exit=False,
+                target_confidence=0.95,
+                min_evaluations=3,
+                max_evaluations=9,
+            ),
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(3, len(self.provider.inference_options))
+        self.assertEqual(3, evaluation.metadata["votes"])
+        self.assertGreaterEqual(evaluation.metadata["confidence"], 0.95)
+
+    def test_adaptive_sampling_uses_full_budget_for_split_votes(self) -> None:
+        provider = SequenceInferenceProvider([True, False] * 5)
+        ig.IntentGuard.set_inference_provider(provider)
+
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(target_confidence=0.95, max_evaluations=6),
+        )
+
+        self.assertFalse(evaluation.result)
+        self.assertEqual(6, evaluation.metadata["votes"])
+
+    def test_logprob_threshold_requests_logprobs_and_scores(self) -> None:
+        self.provider.result = Evaluation(
+            result=True, explanation=None, metadata={"true_probability": 0.7}
+        )
+
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(logprob_threshold=0.8),
+        )
+
+        self.assertFalse(evaluation.result)
+        self.assertEqual(0.7, evaluation.metadata["score"])
+        self.assertEqual([True], [o.logprobs for o in self.provider.inference_options])
+
+    def test_fast_mode_uses_verdict_first_prompt_and_options(self) -> None:
+        cache = RecordingJudgementCache()
+        ig.IntentGuard.set_judgement_cache_provider(cache)
+
+        ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(fast_mode=True, max_tokens=48),
+        )
+
+        self.assertEqual(
+            [InferenceOptions(temperature=0.4, verdict_first=True, max_tokens=48)],
+            self.provider.inference_options,
+        )
+        self.assertIn(
+            _cache_key(
+                "sample should pass",
+                InferenceOptions(temperature=0.4, verdict_first=True, max_tokens=48),
+            ),
+            cache.stored,
+        )
+
+    def test_two_phase_skips_explanation_for_passing_verdict(self) -> None:
+        provider = TwoPhaseProvider()
+        ig.IntentGuard.set_inference_provider(provider)
+
+        evaluation = ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(num_evaluations=3, two_phase=True),
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(
+            [
+                (
+                    "sample should pass (fast)",
+                    InferenceOptions(
+                        temperature=0.4, verdict_first=True, max_tokens=64
+                    ),
+                )
+            ]
+            * 2,
+            provider.calls,
+        )
+
+    def test_two_phase_explains_failure_once_and_caches_it(self) -> None:
+        provider = TwoPhaseProvider()
+        ig.IntentGuard.set_inference_provider(provider)
+        ig.IntentGuard.set_judgement_cache_provider(DictJudgementCache())
+        options = ig.IntentGuardOptions(num_evaluations=3, two_phase=True)
+
+        first = ig.test_code("sample should fail", {"subject": sample_subject}, options)
+        calls_after_first = list(provider.calls)
+        second = ig.test_code(
+            "sample should fail", {"subject": sample_subject}, options
+        )
+
+        self.assertFalse(first.result)
+        self.assertEqual("reasoned", first.explanation)
+        self.assertEqual(first, second)
+        self.assertEqual(
+            ["sample should fail (fast)"] * 2 + ["sample should fail"],
+            [content for content, _ in calls_after_first],
+        )
+        self.assertEqual(InferenceOptions(temperature=0.4), calls_after_first[-1][1])
+        self.assertEqual(calls_after_first, provider.calls)
+
+    def test_two_phase_test_many_and_async_explain_failures(self) -> None:
+        provider = TwoPhaseProvider()
+        ig.IntentGuard.set_inference_provider(provider)
+        options = ig.IntentGuardOptions(two_phase=True)
+
+        many = ig.test_many(
+            [
+                ("sample should pass", {"subject": sample_subject}),
+                ("sample should fail", {"subject": sample_subject}),
+            ],
+            options,
+        )
+        async_result = asyncio.run(
+            ig.test_code_async(
+                "sample should fail", {"subject": sample_subject}, options
+            )
+        )
+
+        self.assertEqual([None, "reasoned"], [e.explanation for e in many])
+        self.assertEqual("reasoned", async_result.explanation)
+
+    def test_cached_votes_are_reused_for_larger_budgets_and_other_modes(
+        self,
+    ) -> None:
+        provider = SequenceInferenceProvider([True, False, True, False, False])
+        ig.IntentGuard.set_inference_provider(provider)
+        ig.IntentGuard.set_judgement_cache_provider(DictJudgementCache())
+
+        def run(**options: object) -> Evaluation:
+            return ig.test_code(
+                "sample should pass",
+                {"subject": sample_subject},
+                options=ig.IntentGuardOptions(early_exit=False, **options),  # type: ignore[arg-type]
+            )
+
+        three = run(num_evaluations=3)
+        five = run(num_evaluations=5)
+        relaxed = run(num_evaluations=5, aggregation_mode="relaxed")
+
+        self.assertTrue(three.result)
+        self.assertFalse(five.result)
+        self.assertEqual(5, five.metadata["votes"])
+        self.assertTrue(relaxed.result)
+        self.assertEqual([], provider.results)
+
+    def test_test_many_and_async_reuse_cached_votes(self) -> None:
+        provider = FakeAsyncInferenceProvider(Evaluation(result=True, explanation=None))
+        ig.IntentGuard.set_inference_provider(provider)
+        ig.IntentGuard.set_judgement_cache_provider(DictJudgementCache())
+        ig.test_code(
+            "sample should pass",
+            {"subject": sample_subject},
+            options=ig.IntentGuardOptions(num_evaluations=3, early_exit=False),
+        )
+
+        many = ig.test_many(
+            [("sample should pass", {"subject": sample_subject})],
+            ig.IntentGuardOptions(num_evaluations=5, aggregation_mode="strict"),
+        )
+        async_result = asyncio.run(
+            ig.test_code_async(
+                "sample should pass",
+                {"subject": sample_subject},
+                ig.IntentGuardOptions(num_evaluations=7, aggregation_mode="strict"),
+            )
+        )
+
+        self.assertEqual(5, provider.sync_calls)
+        self.assertEqual(2, provider.async_calls)
+        self.assertEqual(5, many[0].metadata["votes"])
+        self.assertEqual(7, async_result.metadata["votes"])
+
+    def test_max_tokens_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            ig.IntentGuardOptions(max_tokens=0)
+
+    def test_max_tokens_requires_verdict_first_votes(self) -> None:
+        with self.assertRaises(ValueError):
+            ig.IntentGuardOptions(max_tokens=64)
+
+        ig.IntentGuardOptions(two_phase=True, max_tokens=64)
+
+    def test_max_evaluations_requires_target_confidence(self) -> None:
+        with self.assertRaises(ValueError):
+            ig.IntentGuardOptions(max_evaluations=6)
+
+    def test_min_evaluations_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            ig.IntentGuardOptions(target_confidence=0.95, min_evaluations=0)
+
+    def test_min_evaluations_must_fit_the_vote_budget(self) -> None:
+        with self.assertRaises(ValueError):
+            ig.IntentGuardOptions(
+                target_confidence=0.95, min_evaluations=4, max_evaluations=3
+            )
+        with self.assertRaises(ValueError):
+            ig.IntentGuardOptions(
+                num_evaluations=3, target_confidence=0.95, min_evaluations=4
+            )
+
+        ig.IntentGuardOptions(
+            target_confidence=0.95, min_evaluations=3, max_evaluations=3
+        )
+
+    def test_async_early_exit_cancels_outstanding_votes(self) -> None:
+        provider = FakeAsyncInferenceProvider(Evaluation(result=True, explanation=None))
+        ig.IntentGuard.set_inference_provider(provider)
+
+        evaluation = asyncio.run(
+            ig.test_code_async(
+                "sample should pass",
+                {"subject": sample_subject},
+                options=ig.IntentGuardOptions(
+                    num_evaluations=5, aggregation_mode="relaxed"
+                ),
+            )
+        )
+
+        self.assertTrue(evaluation.result)
+        self.assertEqual(1, provider.completed)
+        self.assertEqual(0, provider.active)
+
+    def test_sync_early_exit_aborts_running_votes(self) -> None:
+        options = ig.IntentGuardOptions(
+            num_evaluations=3, max_concurrency=3, aggregation_mode="relaxed"
+        )
+
+        for run in (ig.test_code, ig.test_many):
+            provider = CancellableProvider()
+            ig.IntentGuard.set_inference_provider(provider)
+            start = time.monotonic()
+
+            if run is ig.test_code:
+                result = ig.test_code(
+                    "sample should pass", {"subject": sample_subject}, options=options
+                ).result
+            else:
+                (evaluation,) = ig.test_many(
+                    [("sample should pass", {"subject": sample_subject})],
+                    options=options,
+                )
+                result = evaluation.result
+
+            self.assertTrue(result)
+            self.assertLess(time.monotonic() - start, 2)
+            deadline = time.monotonic() + 2
+            while provider.aborted < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual((3, 2), (provider.calls, provider.aborted))
+
+    def test_module_warmup_delegates_to_provider(self) -> None:
+        with patch.object(self.provider, "warmup") as warmup:
+            ig.warmup()
+
+        warmup.assert_called_once_with()
+
+    def test_default_warmup_is_a_no_op(self) -> None:
+        ig.warmup()
+
+        self.assertEqual([], self.provider.inference_options)
+
     def test_options_repr_includes_configured_values(self) -> None:
         options = ig.IntentGuardOptions(num_evaluations=7, temperature=0.1)
 
@@ -160,6 +748,14 @@ class ModuleApiTests(unittest.TestCase):
             repr(options),
         )
 
+    def test_options_repr_includes_non_default_concurrency(self) -> None:
+        options = ig.IntentGuardOptions(num_evaluations=3, max_concurrency=3)
+
+        self.assertEqual(
+            "IntentGuardOptions(num_evaluations=3, temperature=0.4, max_concurrency=3)",
+            repr(options),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,233 @@
+import json
+from contextlib import closing
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.domain.evaluation import Evaluation
+from intentguard.domain.judgement_options import JudgementOptions
+from intentguard.infrastructure.fs_judgement_cache import FsJudgementCache
+from intentguard.infrastructure.sqlite_judgement_cache import SqliteJudgementCache
+
+
+def _key(text: str, inference_options=InferenceOptions(temperature=0.4)):
+    return JudgementCacheKey.create(
+        "template", "model", text, [], inference_options, JudgementOptions()
+    )
+
+
+class TestSqliteJudgementCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp_dir.name)
+        self.legacy_dir = self.directory / "cache"
+        self.cache = SqliteJudgementCache(
+            self.directory / "cache.sqlite3", legacy_cache_dir=self.legacy_dir
+        )
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp_dir.cleanup()
+
+    def test_put_many_then_get_many_round_trips_in_order(self):
+        self.cache.put_many(
+            [_key("a"), _key("b")],
+            [
+                Evaluation(result=True, explanation=None, metadata={"votes": 3}),
+                Evaluation(result=False, explanation="b failed"),
+            ],
+        )
+
+        results = self.cache.get_many(
+            [_key("b"), _key("missing"), _key("a"), _key("b")],
+        )
+
+        self.assertEqual(
+            [
+                Evaluation(result=False, explanation="b failed"),
+                None,
+                Evaluation(result=True, explanation=None, metadata={"votes": 3}),
+                Evaluation(result=False, explanation="b failed"),
+            ],
+            results,
+        )
+
+    def test_put_overwrites_existing_entry(self):
+        prompt = _key("a")
+        for result in (True, False):
+            self.cache.put(
+                prompt,
+                Evaluation(result=result, explanation=None),
+            )
+
+        self.assertEqual(
+            Evaluation(result=False, explanation=None),
+            self.cache.get(prompt),
+        )
+
+    def test_database_uses_wal_mode(self):
+        self.cache.get(_key("a"))
+
+        with closing(sqlite3.connect(self.cache.path)) as connection:
+            (mode,) = connection.execute("PRAGMA journal_mode").fetchone()
+
+        self.assertEqual("wal", mode)
+
+    def test_legacy_directory_is_imported_once(self):
+        legacy = FsJudgementCache()
+        legacy.cache_dir = self.legacy_dir
+        legacy.put(
+            _key("a"),
+            Evaluation(result=True, explanation="from files"),
+        )
+        (self.legacy_dir / "broken").write_text("{")
+
+        self.assertEqual(
+            Evaluation(result=True, explanation="from files"),
+            self.cache.get(_key("a")),
+        )
+
+        self.cache.close()
+        legacy.put(
+            _key("b"),
+            Evaluation(result=True, explanation=None),
+        )
+        self.assertIsNone(self.cache.get(_key("b")))
+
+    def test_concurrent_writers_do_not_lose_entries(self):
+        other = SqliteJudgementCache(self.cache.path, legacy_cache_dir=None)
+        self.addCleanup(other.close)
+        prompts = [[_key(f"{i}-{j}") for j in range(20)] for i in range(4)]
+
+        def write(cache, batch):
+            for prompt in batch:
+                cache.put(
+                    prompt,
+                    Evaluation(result=True, explanation=None),
+                )
+
+        threads = [
+            threading.Thread(target=write, args=(cache, batch))
+            for cache, batch in zip([self.cache, other] * 2, prompts)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        results = self.cache.get_many(
+            [prompt for batch in prompts for prompt in batch],
+        )
+        self.assertNotIn(None, results)
+
+    def test_unreadable_entry_is_a_miss(self):
+        prompt = _key("a")
+        self.cache.put(
+            prompt,
+            Evaluation(result=True, explanation=None),
+        )
+        with closing(sqlite3.connect(self.cache.path)) as connection:
+            connection.execute(
+                "UPDATE judgements SET value = ?", (json.dumps({"bogus": 1}),)
+            )
+            connection.commit()
+
+        with self.assertLogs(
+            "intentguard.infrastructure.sqlite_judgement_cache", "WARNING"
+        ):
+            self.assertIsNone(self.cache.get(prompt))
+
+    def test_prune_evicts_by_access_time(self):
+        for text in ("old", "new"):
+            self.cache.put(
+                _key(text),
+                Evaluation(result=True, explanation=None),
+            )
+        old_key = _key("old").digest
+        with closing(sqlite3.connect(self.cache.path)) as connection:
+            connection.execute(
+                "UPDATE judgements SET accessed_at = ? WHERE key = ?",
+                (time.time() - 40 * 86400, old_key),
+            )
+            connection.commit()
+
+        removed = self.cache.prune(max_age_seconds=30 * 86400)
+
+        self.assertEqual(1, removed)
+        self.assertIsNone(self.cache.get(_key("old")))
+        self.assertIsNotNone(self.cache.get(_key("new")))
+
+    def test_prune_compacts_only_when_asked(self):
+        for text in ("a", "b"):
+            self.cache.put(_key(text), Evaluation(result=True, explanation=None))
+
+        with patch.object(self.cache, "compact") as compact:
+            self.cache.prune(max_bytes=0)
+            compact.assert_not_called()
+
+            self.cache.put(_key("c"), Evaluation(result=True, explanation=None))
+            self.cache.prune(max_bytes=0, compact=True)
+            compact.assert_called_once_with()
+
+    def test_stale_access_time_is_refreshed_on_hit(self):
+        prompt = _key("a")
+        self.cache.put(
+            prompt,
+            Evaluation(result=True, explanation=None),
+        )
+        with closing(sqlite3.connect(self.cache.path)) as connection:
+            connection.execute("UPDATE judgements SET accessed_at = 0")
+            connection.commit()
+
+        self.cache.get(prompt)
+
+        self.assertGreater(self.cache.store_stats().oldest_access, time.time() - 60)
+
+    def test_touch_refreshes_access_time(self):
+        self.cache.put(_key("a"), Evaluation(result=True, explanation=None))
+        with closing(sqlite3.connect(self.cache.path)) as connection:
+            connection.execute("UPDATE judgements SET accessed_at = 0")
+            connection.commit()
+
+        self.cache.touch_many([_key("a"), _key("missing")])
+
+        self.assertGreater(self.cache.store_stats().oldest_access, time.time() - 60)
+
+    def test_clear_does_not_import_legacy_directory_again(self):
+        legacy = FsJudgementCache()
+        legacy.cache_dir = self.legacy_dir
+        legacy.put(
+            _key("a"),
+            Evaluation(result=True, explanation=None),
+        )
+
+        self.assertEqual(1, self.cache.clear())
+        self.cache.close()
+
+        self.assertEqual(0, self.cache.store_stats().entries)
+
+    def test_database_without_access_times_is_upgraded(self):
+        with closing(sqlite3.connect(self.cache.path)) as connection:
+            connection.execute(
+                "CREATE TABLE judgements (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            connection.execute(
+                "INSERT INTO judgements VALUES (?, ?)",
+                ("k", json.dumps({"result": True, "explanation": None})),
+            )
+            connection.commit()
+
+        stats = self.cache.store_stats()
+
+        self.assertEqual(1, stats.entries)
+        self.assertGreater(stats.oldest_access, time.time() - 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
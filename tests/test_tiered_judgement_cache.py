@@ -0,0 +1,177 @@
+import asyncio
+import unittest
+from typing import Dict, List, Optional
+
+from intentguard.app.inference_options import InferenceOptions
+from intentguard.app.judgement_cache import JudgementCache
+from intentguard.app.judgement_cache_key import JudgementCacheKey
+from intentguard.domain.evaluation import Evaluation
+from intentguard.domain.judgement_options import JudgementOptions
+from intentguard.infrastructure.tiered_judgement_cache import TieredJudgementCache
+
+
+def _key(text: str) -> JudgementCacheKey:
+    return JudgementCacheKey.create(
+        "template", "model", text, [], InferenceOptions(0.4), JudgementOptions()
+    )
+
+
+class CountingCache(JudgementCache):
+    def __init__(self) -> None:
+        self.entries: Dict[str, Evaluation] = {}
+        self.gets = 0
+        self.bulk_lookups: List[int] = []
+        self.touches: List[List[str]] = []
+
+    def get(self, key: JudgementCacheKey) -> Optional[Evaluation]:
+        self.gets += 1
+        return self.entries.get(key.digest)
+
+    def get_many(self, keys: List[JudgementCacheKey]) -> List[Optional[Evaluation]]:
+        self.bulk_lookups.append(len(keys))
+        return [self.entries.get(key.digest) for key in keys]
+
+    def put(self, key: JudgementCacheKey, judgement: Evaluation) -> None:
+        self.entries[key.digest] = judgement
+
+    def touch_many(self, keys: List[JudgementCacheKey]) -> None:
+        self.touches.append([key.digest for key in keys])
+
+
+class TestTieredJudgementCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.backend = CountingCache()
+        self.cache = TieredJudgementCache(self.backend, max_entries=2)
+
+    def _get(self, text: str) -> Optional[Evaluation]:
+        return self.cache.get(_key(text))
+
+    def test_repeated_lookup_is_served_from_memory(self) -> None:
+        self.backend.entries[_key("a").digest] = Evaluation(
+            result=True, explanation=None
+        )
+
+        first = self._get("a")
+        second = self._get("a")
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.backend.gets)
+        stats = self.cache.stats
+        self.assertEqual((1, 1), (stats.memory_hits, stats.memory_misses))
+        self.assertEqual((1, 0), (stats.backend_hits, stats.backend_misses))
+
+    def test_put_writes_through_to_backend(self) -> None:
+        judgement = Evaluation(result=False, explanation="no")
+
+        self.cache.put(_key("a"), judgement)
+
+        self.assertEqual(judgement, self.backend.entries[_key("a").digest])
+        self.assertEqual(judgement, self._get("a"))
+        self.assertEqual(0, self.backend.gets)
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        for text in ("a", "b"):
+            self.cache.put(
+                _key(text),
+                Evaluation(result=True, explanation=None),
+            )
+        self._get("a")
+        self.cache.put(
+            _key("c"),
+            Evaluation(result=True, explanation=None),
+        )
+
+        self.assertEqual(1, self.cache.stats.evictions)
+        self.assertEqual(2, self.cache.stats.memory_entries)
+
+        self._get("a")
+        self._get("b")
+
+        self.assertEqual(1, self.backend.gets)
+
+    def test_byte_limit_bounds_memory(self) -> None:
+        cache = TieredJudgementCache(self.backend, max_bytes=100)
+
+        cache.put(
+            _key("big"),
+            Evaluation(result=False, explanation="x" * 200),
+        )
+
+        self.assertEqual(0, cache.stats.memory_entries)
+        self.assertIn(_key("big").digest, self.backend.entries)
+
+    def test_get_many_only_asks_backend_for_memory_misses(self) -> None:
+        self.backend.entries[_key("b").digest] = Evaluation(
+            result=False, explanation=None
+        )
+        self.cache.put(
+            _key("a"),
+            Evaluation(result=True, explanation=None),
+        )
+
+        results = self.cache.get_many(
+            [_key("a"), _key("b"), _key("c")],
+        )
+
+        self.assertEqual(
+            [True, False, None], [r.result if r else None for r in results]
+        )
+        self.assertEqual([2], self.backend.bulk_lookups)
+        stats = self.cache.stats
+        self.assertEqual((1, 1), (stats.backend_hits, stats.backend_misses))
+
+    def test_returned_judgement_cannot_change_cached_entry(self) -> None:
+        self.cache.put(
+            _key("a"),
+            Evaluation(result=True, explanation=None, metadata={"votes": 1}),
+        )
+
+        judgement = self._get("a")
+        assert judgement is not None
+        judgement.metadata["votes"] = 99
+
+        self.assertEqual(
+            Evaluation(result=True, explanation=None, metadata={"votes": 1}),
+            self._get("a"),
+        )
+
+    def test_async_memory_hit_skips_backend(self) -> None:
+        self.cache.put(
+            _key("a"),
+            Evaluation(result=True, explanation=None),
+        )
+
+        judgement = asyncio.run(self.cache.get_async(_key("a")))
+
+        self.assertEqual(Evaluation(result=True, explanation=None), judgement)
+        self.assertEqual(0, self.backend.gets)
+
+    def test_memory_hits_refresh_backend_access_time_when_stale(self) -> None:
+        cache = TieredJudgementCache(self.backend, access_refresh_seconds=0)
+        for text in ("a", "b"):
+            cache.put(_key(text), Evaluation(result=True, explanation=None))
+
+        cache.get(_key("a"))
+        cache.get_many([_key("a"), _key("b"), _key("c")])
+        asyncio.run(cache.get_async(_key("b")))
+
+        self.assertEqual(
+            [
+                [_key("a").digest],
+                [_key("a").digest, _key("b").digest],
+                [_key("b").digest],
+            ],
+            self.backend.touches,
+        )
+
+    def test_memory_hits_within_refresh_interval_skip_backend(self) -> None:
+        self.cache.put(_key("a"), Evaluation(result=True, explanation=None))
+
+        self._get("a")
+        self.cache.get_many([_key("a")])
+
+        self.assertEqual([], self.backend.touches)
+
+
+if __name__ == "__main__":
+    unittest.main()
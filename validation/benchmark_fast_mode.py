@@ -0,0 +1,107 @@
+import argparse
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+import intentguard as ig
+from validation.validate import (
+    _build_validation_params,
+    configure_validation_intentguard,
+    load_test_dataset,
+)
+
+logger = logging.getLogger(__name__)
+
+CONFIGURATIONS: Dict[str, ig.IntentGuardOptions] = {
+    "standard": ig.IntentGuardOptions(num_evaluations=3, temperature=0.4),
+    "fast": ig.IntentGuardOptions(num_evaluations=3, temperature=0.4, fast_mode=True),
+    "fast-64": ig.IntentGuardOptions(
+        num_evaluations=3, temperature=0.4, fast_mode=True, max_tokens=64
+    ),
+}
+
+
+def benchmark_configuration(
+    name: str, options: ig.IntentGuardOptions, max_examples: Optional[int] = None
+) -> Dict[str, float]:
+    dataset = load_test_dataset()
+    total_examples = (
+        min(len(dataset), max_examples) if max_examples is not None else len(dataset)
+    )
+    guard = ig.IntentGuard(options)
+
+    outcomes: List[Tuple[bool, bool]] = []
+    elapsed = 0.0
+    for example_index, example in enumerate(
+        tqdm(dataset, total=total_examples, desc=name)
+    ):
+        if max_examples is not None and example_index >= max_examples:
+            break
+
+        try:
+            expectation = example["assertion"]["assertionText"]
+            params = _build_validation_params(example, example_index)
+            expected_result = example["explanation"] is None
+            start = time.perf_counter()
+            result = guard.test_code(expectation, params).result
+            elapsed += time.perf_counter() - start
+            outcomes.append((expected_result, result))
+        except Exception:
+            logger.exception("Error while processing example %d", example_index)
+
+    if not outcomes:
+        raise ValueError(f"Benchmark {name} did not process any examples")
+
+    true_positives = sum(1 for gt, pred in outcomes if gt and pred)
+    predicted_positives = sum(1 for _, pred in outcomes if pred)
+    actual_positives = sum(1 for gt, _ in outcomes if gt)
+    return {
+        "examples": len(outcomes),
+        "accuracy": sum(1 for gt, pred in outcomes if gt == pred) / len(outcomes),
+        "precision": true_positives / predicted_positives if predicted_positives else 0,
+        "recall": true_positives / actual_positives if actual_positives else 0,
+        "seconds_per_assertion": elapsed / len(outcomes),
+        "assertions_per_minute": 60 * len(outcomes) / elapsed if elapsed else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare throughput and accuracy of fast mode against the "
+        "standard chain-of-thought mode on the validation set."
+    )
+    parser.add_argument("--max-examples", type=int, default=None)
+    parser.add_argument(
+        "--configurations",
+        nargs="+",
+        choices=sorted(CONFIGURATIONS),
+        default=list(CONFIGURATIONS),
+    )
+    args = parser.parse_args()
+
+    configure_validation_intentguard()
+    ig.warmup()
+
+    results = {
+        name: benchmark_configuration(name, CONFIGURATIONS[name], args.max_examples)
+        for name in args.configurations
+    }
+
+    header = f"{'configuration':<14}{'accuracy':>10}{'precision':>11}{'recall':>8}{'s/assert':>10}{'assert/min':>12}"
+    print(header)
+    for name, metrics in results.items():
+        print(
+            f"{name:<14}"
+            f"{metrics['accuracy']:>10.3f}"
+            f"{metrics['precision']:>11.3f}"
+            f"{metrics['recall']:>8.3f}"
+            f"{metrics['seconds_per_assertion']:>10.2f}"
+            f"{metrics['assertions_per_minute']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()